@@ -0,0 +1,133 @@
+"""
+ベンチマーク結果（JSON）をベースラインと比較する。
+
+bpy に依存しないので、Blender の外からでも使える。
+
+    python benchmarks/compare.py results.json baseline.json --threshold 0.2
+
+各ケースの最小時間（min）で比べ、
+  現在 / ベースライン > 1 + threshold  を劣化
+  現在 / ベースライン < 1 - threshold  を改善
+とする。どちらも min_time 秒未満のケースは計測誤差が大きいので判定しない。
+劣化が1件でもあれば終了コード 1 を返す。
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+RESULTS_VERSION = 1
+
+# これより短いケースは比較しない（タイマーの分解能・ノイズ）
+DEFAULT_MIN_TIME = 1e-4
+DEFAULT_THRESHOLD = 0.2
+
+
+@dataclass
+class Comparison:
+    case: str
+    baseline: Optional[float]
+    current: Optional[float]
+    status: str  # "regression" / "improved" / "ok" / "noise" / "new" / "missing"
+
+    @property
+    def ratio(self) -> Optional[float]:
+        if not self.baseline or self.current is None:
+            return None
+        return self.current / self.baseline
+
+
+def load_results(filepath: str) -> Dict[str, dict]:
+    """結果ファイルの results（ケース名 → 統計）を返す。"""
+    with open(filepath, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != RESULTS_VERSION:
+        raise ValueError(f"未対応の結果ファイルです: {filepath}")
+    return data.get("results", {})
+
+
+def compare_results(
+    current: Dict[str, dict],
+    baseline: Dict[str, dict],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_time: float = DEFAULT_MIN_TIME,
+) -> List[Comparison]:
+    out: List[Comparison] = []
+    for case in sorted(set(current) | set(baseline)):
+        cur = current.get(case, {}).get("min")
+        base = baseline.get(case, {}).get("min")
+        if base is None:
+            out.append(Comparison(case, None, cur, "new"))
+            continue
+        if cur is None:
+            out.append(Comparison(case, base, None, "missing"))
+            continue
+        if max(cur, base) < min_time or base <= 0:
+            status = "noise"
+        elif cur > base * (1.0 + threshold):
+            status = "regression"
+        elif cur < base * (1.0 - threshold):
+            status = "improved"
+        else:
+            status = "ok"
+        out.append(Comparison(case, base, cur, status))
+    return out
+
+
+def has_regression(comparisons: List[Comparison]) -> bool:
+    return any(c.status == "regression" for c in comparisons)
+
+
+def _fmt_time(value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    if value < 1e-3:
+        return f"{value * 1e6:.1f}us"
+    if value < 1.0:
+        return f"{value * 1e3:.2f}ms"
+    return f"{value:.3f}s"
+
+
+def format_comparisons(comparisons: List[Comparison], verbose: bool = False) -> str:
+    """表形式の文字列。verbose=False なら ok / noise の行は省く。"""
+    rows = [c for c in comparisons if verbose or c.status not in ("ok", "noise")]
+    if not rows:
+        return "差分のあるケースはありません"
+
+    width = max(len(c.case) for c in rows)
+    lines = [f"{'case':<{width}}  {'baseline':>10}  {'current':>10}  {'ratio':>7}  status"]
+    for c in rows:
+        ratio = f"{c.ratio:.2f}x" if c.ratio is not None else "-"
+        lines.append(
+            f"{c.case:<{width}}  {_fmt_time(c.baseline):>10}  {_fmt_time(c.current):>10}  {ratio:>7}  {c.status}"
+        )
+
+    counts: Dict[str, int] = {}
+    for c in comparisons:
+        counts[c.status] = counts.get(c.status, 0) + 1
+    lines.append(", ".join(f"{k} {v}" for k, v in sorted(counts.items())))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="ベンチマーク結果をベースラインと比較する")
+    parser.add_argument("current", help="今回の結果 JSON")
+    parser.add_argument("baseline", help="ベースラインの結果 JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="劣化とみなす増加率（0.2 = 20%%）")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME,
+                        help="これより短いケースは判定しない（秒）")
+    parser.add_argument("--verbose", action="store_true", help="変化のないケースも表示する")
+    args = parser.parse_args(argv)
+
+    comparisons = compare_results(
+        load_results(args.current), load_results(args.baseline), args.threshold, args.min_time
+    )
+    print(format_comparisons(comparisons, args.verbose))
+    return 1 if has_regression(comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Blender 無しで core/ を動かすための、bpy / bmesh のフェイク（NumPy 配列ベース）。
+
+core/ の全モジュールがトップレベルで bpy / bmesh を import するため、
+PID・差分・展開・保存形式などを通常の CPython でテスト・計測できなかった。
+
+    from benchmarks import fake_blender
+    fake_blender.install()          # sys.modules に bpy / bmesh を登録する
+    import hide_set_manager          # 以降は通常どおり import できる
+    hide_set_manager.register()     # Scene.hm_edit_sets などを付ける
+
+対象は core/pid.py・core/bmesh_ops.py・core/diff.py とその周辺が使う範囲
+（Mesh の属性 / foreach_get・foreach_set、BMesh の要素列と int レイヤー、
+PropertyGroup / CollectionProperty、ハンドラとタイマー）。
+UI（レイアウトの描画、bpy.ops）は対象外。
+"""
+
+import sys
+
+from . import fake_bmesh, fake_bpy
+from .fake_bmesh import set_edit_mode
+from .fake_bpy import flush_updates
+from .meshes import grid_mesh, link_object, mesh_from_faces, stamp_pids
+
+__all__ = [
+    "install",
+    "reset",
+    "is_installed",
+    "flush_updates",
+    "set_edit_mode",
+    "grid_mesh",
+    "link_object",
+    "mesh_from_faces",
+    "stamp_pids",
+]
+
+
+def is_installed() -> bool:
+    return getattr(sys.modules.get("bpy"), "_hm_fake", False)
+
+
+def install() -> None:
+    """
+    フェイクの bpy / bmesh を sys.modules に登録する。
+    本物の bpy が既に読み込まれている（Blender 内で実行している）場合は何もしない。
+    """
+    if "bpy" in sys.modules:
+        return
+
+    bpy = fake_bpy.build_module()
+    bmesh = fake_bmesh.build_module()
+    sys.modules.update({
+        "bpy": bpy,
+        "bpy.types": bpy.types,
+        "bpy.props": bpy.props,
+        "bpy.app": bpy.app,
+        "bpy.app.handlers": bpy.app.handlers,
+        "bpy.app.timers": bpy.app.timers,
+        "bpy.utils": bpy.utils,
+        "bmesh": bmesh,
+        "bmesh.types": bmesh.types,
+    })
+
+
+def reset() -> None:
+    """bpy.data / bpy.context を空に戻す（アドオンのキャッシュは呼び出し側で捨てる）。"""
+    fake_bpy.reset()
@@ -0,0 +1,417 @@
+"""
+bmesh のフェイク（core/ が使う範囲だけ）。
+
+BMesh は Mesh のトポロジーと、頂点 / 辺 / 面ごとの hide / select / int レイヤーを
+NumPy 配列のコピーとして持つ。要素（BMVert など）は (列, インデックス) だけを持つ
+軽いプロキシで、反復のたびに作る（本物の BMesh も Python ラッパーを都度作る）。
+
+- 要素列の [] は ensure_lookup_table() の後でないと IndexError（本物と同じ）
+- link_faces は面 → 頂点 / 辺 の CSR を最初に使ったときに作る
+- hide_set は本物（BM_vert / BM_edge / BM_face_hide_set）と同じく接続要素へ広げ、
+  「接続面が全て隠れた辺」「接続辺が全て隠れた頂点」を隠す
+- from_mesh は Mesh の INT 属性を同じドメインの int レイヤーとして読み込み、to_mesh で書き戻す
+"""
+
+import types
+from typing import Dict, List
+
+import numpy as np
+
+from . import fake_bpy
+
+# 要素列 → (Mesh のドメイン, 非表示属性, 選択属性)
+_SEQ_DOMAINS = {
+    "verts": ("POINT", ".hide_vert", ".select_vert"),
+    "edges": ("EDGE", ".hide_edge", ".select_edge"),
+    "faces": ("FACE", ".hide_poly", ".select_poly"),
+}
+
+
+class BMLayer:
+    __slots__ = ("name", "values", "seq")
+
+    def __init__(self, name: str, values: np.ndarray, seq: "BMElemSeq"):
+        self.name = name
+        self.values = values
+        self.seq = seq
+
+
+class BMLayerCollection:
+    def __init__(self, seq: "BMElemSeq"):
+        self._seq = seq
+        self._layers: Dict[str, BMLayer] = {}
+
+    def get(self, name: str, default=None):
+        return self._layers.get(name, default)
+
+    def new(self, name: str) -> BMLayer:
+        layer = BMLayer(name, np.zeros(len(self._seq), dtype=np.int32), self._seq)
+        self._layers[name] = layer
+        return layer
+
+    def remove(self, layer: BMLayer) -> None:
+        self._layers.pop(layer.name, None)
+
+    def keys(self):
+        return self._layers.keys()
+
+    def values(self):
+        return self._layers.values()
+
+    def __getitem__(self, name: str) -> BMLayer:
+        return self._layers[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._layers
+
+    def __len__(self) -> int:
+        return len(self._layers)
+
+
+class BMLayerAccess:
+    def __init__(self, seq: "BMElemSeq"):
+        self.int = BMLayerCollection(seq)
+
+
+class BMElem:
+    __slots__ = ("_seq", "index")
+
+    def __init__(self, seq: "BMElemSeq", index: int):
+        self._seq = seq
+        self.index = index
+
+    @property
+    def bm(self) -> "BMesh":
+        return self._seq.bm
+
+    @property
+    def hide(self) -> bool:
+        return bool(self._seq.hide[self.index])
+
+    @hide.setter
+    def hide(self, value: bool) -> None:
+        self._seq.hide[self.index] = value
+
+    @property
+    def select(self) -> bool:
+        return bool(self._seq.select[self.index])
+
+    @select.setter
+    def select(self, value: bool) -> None:
+        self._seq.select[self.index] = value
+
+    @property
+    def is_valid(self) -> bool:
+        return self._seq.bm.is_valid
+
+    def hide_set(self, hide: bool) -> None:
+        self._seq.hide[self.index] = hide
+
+    def select_set(self, select: bool) -> None:
+        self._seq.select[self.index] = select
+
+    def _check_layer(self, layer: BMLayer) -> None:
+        if layer.seq is not self._seq:
+            raise KeyError(f"別の要素列のレイヤーです: {layer.name}")
+
+    def __getitem__(self, layer: BMLayer) -> int:
+        self._check_layer(layer)
+        return int(layer.values[self.index])
+
+    def __setitem__(self, layer: BMLayer, value: int) -> None:
+        self._check_layer(layer)
+        layer.values[self.index] = value
+
+    def __eq__(self, other) -> bool:
+        return type(other) is type(self) and other._seq is self._seq and other.index == self.index
+
+    def __hash__(self) -> int:
+        return hash((id(self._seq), self.index))
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.index}>"
+
+
+class BMVert(BMElem):
+    __slots__ = ()
+
+    @property
+    def co(self):
+        return self.bm.co[self.index]
+
+    @property
+    def link_faces(self) -> List["BMFace"]:
+        return self.bm._faces_of("verts", self.index)
+
+    def hide_set(self, hide: bool) -> None:
+        # 頂点＋接続辺＋接続面
+        bm = self.bm
+        bm.verts.hide[self.index] = hide
+        bm.edges.hide[bm._vert_edges(self.index)] = hide
+        bm.faces.hide[bm._link_face_indices("verts", self.index)] = hide
+
+
+class BMEdge(BMElem):
+    __slots__ = ()
+
+    @property
+    def verts(self) -> List[BMVert]:
+        seq = self.bm.verts
+        return [BMVert(seq, int(i)) for i in self.bm.edge_verts[self.index]]
+
+    @property
+    def link_faces(self) -> List["BMFace"]:
+        return self.bm._faces_of("edges", self.index)
+
+    def hide_set(self, hide: bool) -> None:
+        # 接続面＋辺。隠すときは両端の頂点を flush、表示するときは両端も表示
+        bm = self.bm
+        bm.faces.hide[bm._link_face_indices("edges", self.index)] = hide
+        bm.edges.hide[self.index] = hide
+        for v in bm.edge_verts[self.index].tolist():
+            if hide:
+                bm._flush_vert_hide(v)
+            else:
+                bm.verts.hide[v] = False
+
+
+class BMLoop:
+    __slots__ = ("_bm", "_loop")
+
+    def __init__(self, bm: "BMesh", loop: int):
+        self._bm = bm
+        self._loop = loop
+
+    @property
+    def vert(self) -> BMVert:
+        return BMVert(self._bm.verts, int(self._bm.loop_vert[self._loop]))
+
+    @property
+    def edge(self) -> BMEdge:
+        return BMEdge(self._bm.edges, int(self._bm.loop_edge[self._loop]))
+
+
+class BMFace(BMElem):
+    __slots__ = ()
+
+    def _loop_range(self) -> range:
+        bm = self.bm
+        start = int(bm.loop_start[self.index])
+        return range(start, start + int(bm.loop_total[self.index]))
+
+    @property
+    def loops(self) -> List[BMLoop]:
+        return [BMLoop(self.bm, l) for l in self._loop_range()]
+
+    @property
+    def verts(self) -> List[BMVert]:
+        return [loop.vert for loop in self.loops]
+
+    @property
+    def edges(self) -> List[BMEdge]:
+        return [loop.edge for loop in self.loops]
+
+    def hide_set(self, hide: bool) -> None:
+        # 隠すときは構成辺 → 構成頂点の順に flush、表示するときは構成辺・頂点も表示
+        bm = self.bm
+        loops = self._loop_range()
+        edges = bm.loop_edge[loops.start:loops.stop].tolist()
+        verts = bm.loop_vert[loops.start:loops.stop].tolist()
+        bm.faces.hide[self.index] = hide
+        if not hide:
+            bm.edges.hide[edges] = False
+            bm.verts.hide[verts] = False
+            return
+        for e in edges:
+            bm._flush_edge_hide(e)
+        for v in verts:
+            bm._flush_vert_hide(v)
+
+
+class BMElemSeq:
+    def __init__(self, bm: "BMesh", kind: str, elem_type, size: int):
+        self.bm = bm
+        self.kind = kind
+        self._elem_type = elem_type
+        self.hide = np.zeros(size, dtype=bool)
+        self.select = np.zeros(size, dtype=bool)
+        self.layers = BMLayerAccess(self)
+        self._table = False
+
+    def __len__(self) -> int:
+        return len(self.hide)
+
+    def __iter__(self):
+        make = self._elem_type
+        return (make(self, i) for i in range(len(self.hide)))
+
+    def __getitem__(self, index):
+        if not self._table:
+            raise IndexError(
+                "BMElemSeq[index]: outdated internal index table, run ensure_lookup_table() first"
+            )
+        if isinstance(index, slice):
+            return [self._elem_type(self, i) for i in range(len(self.hide))[index]]
+        if index < 0:
+            index += len(self.hide)
+        if not 0 <= index < len(self.hide):
+            raise IndexError(f"BMElemSeq[index]: index {index} out of range")
+        return self._elem_type(self, index)
+
+    def ensure_lookup_table(self) -> None:
+        self._table = True
+
+    def index_update(self) -> None:
+        pass
+
+
+class BMesh:
+    def __init__(self):
+        self.is_valid = True
+        self._load_topology(None)
+
+    def _load_topology(self, me) -> None:
+        def _copy(name, shape, dtype):
+            if me is None:
+                return np.zeros(shape, dtype=dtype)
+            return getattr(me, name).copy()
+
+        self.co = _copy("co", (0, 3), np.float32)
+        self.edge_verts = _copy("edge_verts", (0, 2), np.int32)
+        self.loop_start = _copy("loop_start", 0, np.int32)
+        self.loop_total = _copy("loop_total", 0, np.int32)
+        self.loop_vert = _copy("loop_vert", 0, np.int32)
+        self.loop_edge = _copy("loop_edge", 0, np.int32)
+        self.verts = BMElemSeq(self, "verts", BMVert, len(self.co))
+        self.edges = BMElemSeq(self, "edges", BMEdge, len(self.edge_verts))
+        self.faces = BMElemSeq(self, "faces", BMFace, len(self.loop_start))
+        # 頂点 / 辺 → 面、頂点 → 辺 の CSR（link_faces / hide_set 用、最初に使ったときに作る）
+        self._link: Dict[str, object] = {}
+
+    def _csr(self, kind: str):
+        csr = self._link.get(kind)
+        if csr is None:
+            if kind == "vert_edges":
+                targets = self.edge_verts.ravel()
+                size = len(self.verts)
+                values = np.repeat(np.arange(len(self.edge_verts), dtype=np.int32), 2)
+            else:
+                targets = self.loop_vert if kind == "verts" else self.loop_edge
+                size = len(self.verts) if kind == "verts" else len(self.edges)
+                values = np.repeat(np.arange(len(self.loop_start), dtype=np.int32), self.loop_total)
+            order = np.argsort(targets, kind="stable")
+            offsets = np.zeros(size + 1, dtype=np.int64)
+            np.cumsum(np.bincount(targets, minlength=size), out=offsets[1:])
+            csr = self._link[kind] = (offsets, values[order])
+        return csr
+
+    def _link_face_indices(self, kind: str, index: int) -> np.ndarray:
+        """接続面のインデックス（同じ面を2回含む辺 / 頂点では重複あり）。"""
+        offsets, faces = self._csr(kind)
+        return faces[offsets[index]:offsets[index + 1]]
+
+    def _vert_edges(self, index: int) -> np.ndarray:
+        offsets, edges = self._csr("vert_edges")
+        return edges[offsets[index]:offsets[index + 1]]
+
+    def _link_lists(self, kind: str) -> List[List[int]]:
+        """_csr(kind) を要素ごとの list にしたもの（数個の要素を NumPy で引くと遅いので flush 用）。"""
+        key = kind + ".lists"
+        lists = self._link.get(key)
+        if lists is None:
+            offsets, values = self._csr(kind)
+            values = values.tolist()
+            bounds = offsets.tolist()
+            lists = self._link[key] = [values[a:b] for a, b in zip(bounds, bounds[1:])]
+        return lists
+
+    def _flush_edge_hide(self, index: int) -> None:
+        """接続面が全て隠れていれば辺を隠し、そうでなければ表示する（面の無い辺は隠す）。"""
+        hide = self.faces.hide
+        self.edges.hide[index] = all(hide[f] for f in self._link_lists("edges")[index])
+
+    def _flush_vert_hide(self, index: int) -> None:
+        """接続辺が全て隠れていれば頂点を隠し、そうでなければ表示する。"""
+        hide = self.edges.hide
+        self.verts.hide[index] = all(hide[e] for e in self._link_lists("vert_edges")[index])
+
+    def _faces_of(self, kind: str, index: int) -> List[BMFace]:
+        seq = self.faces
+        return [BMFace(seq, f) for f in dict.fromkeys(self._link_face_indices(kind, index).tolist())]
+
+    def from_mesh(self, me) -> None:
+        self._load_topology(me)
+        for kind, (domain, hide_name, select_name) in _SEQ_DOMAINS.items():
+            seq = getattr(self, kind)
+            for name, target in ((hide_name, seq.hide), (select_name, seq.select)):
+                attr = me.attributes.get(name)
+                if attr is not None:
+                    target[:] = attr.values
+            for attr in me.attributes:
+                if attr.domain == domain and attr.data_type == "INT" and not attr.name.startswith("."):
+                    layer = seq.layers.int.new(attr.name)
+                    layer.values[:] = attr.values
+
+    def to_mesh(self, me) -> None:
+        for name in ("co", "edge_verts", "loop_start", "loop_total", "loop_vert", "loop_edge"):
+            setattr(me, name, getattr(self, name).copy())
+        for kind, (domain, hide_name, select_name) in _SEQ_DOMAINS.items():
+            seq = getattr(self, kind)
+            for name, flags in ((hide_name, seq.hide), (select_name, seq.select)):
+                # Blender と同じく、全て False のフラグ属性は持たない
+                attr = me.attributes.get(name)
+                if flags.any():
+                    if attr is None or len(attr.values) != len(flags):
+                        attr = me.attributes.new(name, "BOOLEAN", domain)
+                    attr.values[:] = flags
+                elif attr is not None:
+                    me.attributes.remove(attr)
+            for layer in seq.layers.int.values():
+                attr = me.attributes.get(layer.name)
+                if attr is None or len(attr.values) != len(layer.values):
+                    attr = me.attributes.new(layer.name, "INT", domain)
+                attr.values[:] = layer.values
+
+    def free(self) -> None:
+        self.is_valid = False
+
+
+def new() -> BMesh:
+    return BMesh()
+
+
+def from_edit_mesh(me) -> BMesh:
+    if me.edit_bmesh is None:
+        raise ValueError(f"編集モードのメッシュではありません: {me.name}")
+    return me.edit_bmesh
+
+
+def update_edit_mesh(me, loop_triangles: bool = True, destructive: bool = True) -> None:
+    fake_bpy.tag_update(me, geometry=True)
+
+
+def set_edit_mode(obj, edit: bool) -> None:
+    """オブジェクトを編集モードに入れる / 出す（mode_set 相当。出るときに BMesh を書き戻す）。"""
+    me = obj.data
+    if edit and obj.mode != "EDIT":
+        bm = BMesh()
+        bm.from_mesh(me)
+        me.edit_bmesh = bm
+        obj.mode = "EDIT"
+    elif not edit and obj.mode == "EDIT":
+        me.edit_bmesh.to_mesh(me)
+        me.edit_bmesh = None
+        obj.mode = "OBJECT"
+        fake_bpy.tag_update(me, geometry=True)
+
+
+def build_module() -> types.ModuleType:
+    bmesh = types.ModuleType("bmesh")
+    bmesh._hm_fake = True
+    bmesh.types = types.ModuleType("bmesh.types")
+    for cls in (BMesh, BMVert, BMEdge, BMFace, BMLoop, BMElemSeq, BMLayerCollection):
+        setattr(bmesh.types, cls.__name__, cls)
+    bmesh.new = new
+    bmesh.from_edit_mesh = from_edit_mesh
+    bmesh.update_edit_mesh = update_edit_mesh
+    return bmesh
@@ -0,0 +1,688 @@
+"""
+bpy のフェイク（core/ が使う範囲だけ）。
+
+- bpy.props / PropertyGroup / CollectionProperty : 注釈からプロパティを作る記述子。
+  コレクションは foreach_get / foreach_set / path_from_id / id_data に対応する
+- ID（Object / Mesh / Scene）: カスタムプロパティ（obj["key"]）、as_pointer、session_uid。
+  削除した ID の name を読むと ReferenceError
+- Mesh : 頂点 / 辺 / 面 / ループのトポロジーと属性を NumPy 配列で持つ。
+  vertices.foreach_set("hide", ...) などは Blender 4.x と同じく ".hide_vert" 属性に読み書きする
+- bpy.app.handlers / bpy.app.timers : リストと登録表。
+  Mesh.update() などで溜まった更新通知は flush_updates() で depsgraph_update_post に流す
+  （Blender ではイベントループが行う処理なので、テストや計測のハーネスが呼ぶ）
+
+実際の Blender との違い
+- トポロジーを変える操作（押し出し等）は無い
+- BMElem.hide_set() の接続要素への伝播は本物と同じだが、選択状態は連動させない
+"""
+
+import itertools
+import sys
+import types
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# ----------------------------------------------------------------------
+# プロパティ
+# ----------------------------------------------------------------------
+_PROP_DEFAULTS = {
+    "INT": 0,
+    "FLOAT": 0.0,
+    "BOOLEAN": False,
+    "STRING": "",
+}
+
+
+class _PropertyDef:
+    """bpy.props.*Property の戻り値。インスタンスごとの値を持つ記述子として働く。"""
+
+    def __init__(self, kind: str, **kwargs):
+        self.kind = kind
+        self.kwargs = kwargs
+        self.name = ""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def _find_name(self, owner_type) -> str:
+        if not self.name:
+            for klass in owner_type.__mro__:
+                for key, value in vars(klass).items():
+                    if value is self:
+                        self.name = key
+                        return key
+        return self.name
+
+    def _default(self, instance):
+        if self.kind == "COLLECTION":
+            return Collection(self.kwargs["type"], instance, self._find_name(type(instance)))
+        if "default" in self.kwargs:
+            return self.kwargs["default"]
+        if self.kind == "ENUM":
+            items = self.kwargs.get("items") or [("", "", "")]
+            return items[0][0]
+        return _PROP_DEFAULTS.get(self.kind)
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        values = instance.__dict__.setdefault("_props", {})
+        key = id(self)
+        if key not in values:
+            values[key] = self._default(instance)
+        return values[key]
+
+    def __set__(self, instance, value):
+        if self.kind == "COLLECTION":
+            raise AttributeError("コレクションプロパティには代入できません")
+        instance.__dict__.setdefault("_props", {})[id(self)] = value
+
+
+def _prop_factory(kind: str):
+    def factory(**kwargs):
+        return _PropertyDef(kind, **kwargs)
+    factory.__name__ = f"{kind.title()}Property"
+    return factory
+
+
+props = types.ModuleType("bpy.props")
+props.IntProperty = _prop_factory("INT")
+props.FloatProperty = _prop_factory("FLOAT")
+props.BoolProperty = _prop_factory("BOOLEAN")
+props.StringProperty = _prop_factory("STRING")
+props.EnumProperty = _prop_factory("ENUM")
+props.CollectionProperty = _prop_factory("COLLECTION")
+props.PointerProperty = _prop_factory("POINTER")
+
+
+def _bind_annotations(cls) -> None:
+    """クラス本体の注釈（name: bpy.props.XProperty()）を記述子としてクラスへ付ける。"""
+    for name, value in list(vars(cls).get("__annotations__", {}).items()):
+        if isinstance(value, _PropertyDef):
+            value.name = name
+            setattr(cls, name, value)
+
+
+# ----------------------------------------------------------------------
+# 構造体 / カスタムプロパティ
+# ----------------------------------------------------------------------
+_pointers = itertools.count(0x1000, 0x10)
+
+
+class _Struct:
+    """as_pointer とカスタムプロパティ（obj["key"]）を持つ RNA 構造体。"""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _bind_annotations(cls)
+
+    def _idprops(self) -> dict:
+        return self.__dict__.setdefault("_idprops_data", {})
+
+    def as_pointer(self) -> int:
+        ptr = self.__dict__.get("_pointer")
+        if ptr is None:
+            ptr = self.__dict__["_pointer"] = next(_pointers)
+        return ptr
+
+    def get(self, key, default=None):
+        return self._idprops().get(key, default)
+
+    def keys(self):
+        return self._idprops().keys()
+
+    def __getitem__(self, key):
+        return self._idprops()[key]
+
+    def __setitem__(self, key, value):
+        self._idprops()[key] = value
+
+    def __delitem__(self, key):
+        del self._idprops()[key]
+
+    def __contains__(self, key):
+        return key in self._idprops()
+
+
+class PropertyGroup(_Struct):
+    name: props.StringProperty(default="")
+
+    def __init__(self, collection: Optional["Collection"] = None):
+        self._collection = collection
+
+    @property
+    def id_data(self):
+        return self._collection.id_data if self._collection is not None else None
+
+    def path_from_id(self) -> str:
+        c = self._collection
+        return f"{c.path_from_id()}[{c._items.index(self)}]"
+
+
+class Collection:
+    """CollectionProperty の値。"""
+
+    def __init__(self, item_type, owner, name: str):
+        self._type = item_type
+        self._owner = owner
+        self._name = name
+        self._items: List[PropertyGroup] = []
+
+    @property
+    def id_data(self):
+        return self._owner.id_data
+
+    def path_from_id(self) -> str:
+        if isinstance(self._owner, ID):
+            return self._name
+        return f"{self._owner.path_from_id()}.{self._name}"
+
+    def add(self):
+        item = self._type(self)
+        self._items.append(item)
+        return item
+
+    def remove(self, index: int) -> None:
+        del self._items[index]
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def foreach_get(self, attr: str, out) -> None:
+        values = [getattr(it, attr) for it in self._items]
+        out[:] = np.asarray(values, dtype=np.asarray(out).dtype)
+
+    def foreach_set(self, attr: str, values) -> None:
+        values = np.asarray(values).ravel().tolist()
+        if len(values) != len(self._items):
+            raise RuntimeError("foreach_set: 要素数が一致しません")
+        for it, value in zip(self._items, values):
+            setattr(it, attr, value)
+
+
+# ----------------------------------------------------------------------
+# ID
+# ----------------------------------------------------------------------
+_session_uids = itertools.count(1)
+
+
+class ID(_Struct):
+    def __init__(self, name: str):
+        self._name = name
+        self._removed = False
+        self.session_uid = next(_session_uids)
+
+    @property
+    def name(self) -> str:
+        if self._removed:
+            raise ReferenceError(f"削除された ID です: {self._name}")
+        return self._name
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self._name = value
+
+    @property
+    def id_data(self):
+        return self
+
+    @property
+    def original(self):
+        return self
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self._name!r}>"
+
+
+class _AttributeData:
+    __slots__ = ("_attr",)
+
+    def __init__(self, attr):
+        self._attr = attr
+
+    def __len__(self) -> int:
+        return len(self._attr.values)
+
+    def foreach_get(self, key: str, out) -> None:
+        if key != "value":
+            raise AttributeError(key)
+        np.copyto(out, self._attr.values, casting="unsafe")
+
+    def foreach_set(self, key: str, values) -> None:
+        if key != "value":
+            raise AttributeError(key)
+        values = np.asarray(values).ravel()
+        if len(values) != len(self._attr.values):
+            raise RuntimeError("foreach_set: 要素数が一致しません")
+        self._attr.values[:] = values
+
+
+class Attribute:
+    _DTYPES = {"INT": np.int32, "BOOLEAN": bool, "FLOAT": np.float32}
+
+    def __init__(self, name: str, data_type: str, domain: str, size: int):
+        self.name = name
+        self.data_type = data_type
+        self.domain = domain
+        self.values = np.zeros(size, dtype=self._DTYPES[data_type])
+
+    @property
+    def data(self) -> _AttributeData:
+        return _AttributeData(self)
+
+
+class AttributeGroup:
+    def __init__(self, mesh: "Mesh"):
+        self._mesh = mesh
+        self._attrs: Dict[str, Attribute] = {}
+
+    def get(self, name: str, default=None):
+        return self._attrs.get(name, default)
+
+    def new(self, name: str, type: str, domain: str) -> Attribute:
+        attr = Attribute(name, type, domain, self._mesh._domain_size(domain))
+        self._attrs[name] = attr
+        return attr
+
+    def remove(self, attr: Attribute) -> None:
+        self._attrs.pop(attr.name, None)
+
+    def __getitem__(self, name: str) -> Attribute:
+        return self._attrs[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._attrs
+
+    def __iter__(self):
+        return iter(list(self._attrs.values()))
+
+    def __len__(self) -> int:
+        return len(self._attrs)
+
+
+# ドメイン → (非表示属性, 選択属性)
+_FLAG_ATTRS = {
+    "POINT": (".hide_vert", ".select_vert"),
+    "EDGE": (".hide_edge", ".select_edge"),
+    "FACE": (".hide_poly", ".select_poly"),
+}
+
+
+class _MeshDomain:
+    """me.vertices / me.edges / me.polygons / me.loops（foreach_get / foreach_set のみ）。"""
+
+    def __init__(self, mesh: "Mesh", domain: str, arrays: Dict[str, str]):
+        self._mesh = mesh
+        self._domain = domain
+        # RNA の属性名 → Mesh の配列属性名
+        self._arrays = arrays
+
+    def __len__(self) -> int:
+        return self._mesh._domain_size(self._domain)
+
+    def _flag_attr(self, key: str, create: bool) -> Optional[Attribute]:
+        hide_name, select_name = _FLAG_ATTRS[self._domain]
+        name = hide_name if key == "hide" else select_name
+        attr = self._mesh.attributes.get(name)
+        if attr is None and create:
+            attr = self._mesh.attributes.new(name, "BOOLEAN", self._domain)
+        return attr
+
+    def _source(self, key: str) -> np.ndarray:
+        if key in ("hide", "select") and self._domain in _FLAG_ATTRS:
+            attr = self._flag_attr(key, create=False)
+            return attr.values if attr is not None else np.zeros(len(self), dtype=bool)
+        if key == "index":
+            return np.arange(len(self))
+        return getattr(self._mesh, self._arrays[key])
+
+    def foreach_get(self, key: str, out) -> None:
+        np.copyto(out, self._source(key).reshape(np.shape(out)), casting="unsafe")
+
+    def foreach_set(self, key: str, values) -> None:
+        values = np.asarray(values).ravel()
+        if key in ("hide", "select") and self._domain in _FLAG_ATTRS:
+            attr = self._flag_attr(key, create=True)
+            attr.values[:] = values
+            return
+        target = getattr(self._mesh, self._arrays[key])
+        target.reshape(-1)[:] = values
+
+
+class Mesh(ID):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.co = np.zeros((0, 3), dtype=np.float32)
+        self.edge_verts = np.zeros((0, 2), dtype=np.int32)
+        self.loop_start = np.zeros(0, dtype=np.int32)
+        self.loop_total = np.zeros(0, dtype=np.int32)
+        self.loop_vert = np.zeros(0, dtype=np.int32)
+        self.loop_edge = np.zeros(0, dtype=np.int32)
+        self.attributes = AttributeGroup(self)
+        self.vertices = _MeshDomain(self, "POINT", {"co": "co"})
+        self.edges = _MeshDomain(self, "EDGE", {"vertices": "edge_verts"})
+        self.polygons = _MeshDomain(self, "FACE", {"loop_start": "loop_start", "loop_total": "loop_total"})
+        self.loops = _MeshDomain(self, "CORNER", {"vertex_index": "loop_vert", "edge_index": "loop_edge"})
+        # 編集モード中の BMesh（fake_bmesh.from_edit_mesh が返す）
+        self.edit_bmesh = None
+
+    @property
+    def is_editmode(self) -> bool:
+        return self.edit_bmesh is not None
+
+    def _domain_size(self, domain: str) -> int:
+        return {
+            "POINT": len(self.co),
+            "EDGE": len(self.edge_verts),
+            "FACE": len(self.loop_start),
+            "CORNER": len(self.loop_vert),
+        }[domain]
+
+    def update(self, calc_edges: bool = False, calc_edges_loose: bool = False) -> None:
+        tag_update(self, geometry=True)
+
+    def copy(self) -> "Mesh":
+        me = data.meshes.new(self._name)
+        for name in ("co", "edge_verts", "loop_start", "loop_total", "loop_vert", "loop_edge"):
+            setattr(me, name, getattr(self, name).copy())
+        for attr in self.attributes:
+            me.attributes.new(attr.name, attr.data_type, attr.domain).values[:] = attr.values
+        return me
+
+
+class Object(ID):
+    def __init__(self, name: str, object_data=None):
+        super().__init__(name)
+        self.data = object_data
+        self.type = "MESH" if isinstance(object_data, Mesh) else "EMPTY"
+        self.mode = "OBJECT"
+        self._hidden = False
+        self._selected = False
+
+    def hide_get(self) -> bool:
+        return self._hidden
+
+    def hide_set(self, state: bool) -> None:
+        self._hidden = bool(state)
+        tag_update(self, geometry=False)
+
+    def select_get(self) -> bool:
+        return self._selected
+
+    def select_set(self, state: bool) -> None:
+        self._selected = bool(state)
+
+    def update_from_editmode(self) -> bool:
+        me = self.data
+        if isinstance(me, Mesh) and me.edit_bmesh is not None:
+            me.edit_bmesh.to_mesh(me)
+            return True
+        return False
+
+
+class _SceneObjects:
+    def __init__(self, scene: "Scene"):
+        self._scene = scene
+
+    def link(self, obj: Object) -> None:
+        if obj not in self._scene.objects:
+            self._scene.objects.append(obj)
+
+    def unlink(self, obj: Object) -> None:
+        self._scene.objects.remove(obj)
+
+
+class _SceneCollection:
+    def __init__(self, scene: "Scene"):
+        self.objects = _SceneObjects(scene)
+
+
+class Scene(ID):
+    """hm_edit_sets などはアドオンの register() がクラスに付ける。"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.objects: List[Object] = []
+        self.collection = _SceneCollection(self)
+
+
+class Operator(_Struct):
+    """オペレーター。execute(context) を直接呼んで使う（report は reports に溜める）。"""
+
+    bl_options = set()
+
+    def __init__(self, **kwargs):
+        self.reports = []
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def report(self, type, message: str) -> None:
+        self.reports.append((set(type), message))
+
+
+class Panel(_Struct):
+    pass
+
+
+class UIList(_Struct):
+    pass
+
+
+class Context:
+    def __init__(self, scene: Scene):
+        self.scene = scene
+        self.window = None
+        self.window_manager = None
+
+    @property
+    def view_layer(self):
+        return None
+
+    @property
+    def selected_objects(self) -> List[Object]:
+        return [o for o in self.scene.objects if o.select_get()]
+
+    @property
+    def objects_in_mode(self) -> List[Object]:
+        return [o for o in self.scene.objects if o.mode == "EDIT"]
+
+    @property
+    def mode(self) -> str:
+        return "EDIT_MESH" if self.objects_in_mode else "OBJECT"
+
+
+bpy_types = types.ModuleType("bpy.types")
+for _cls in (ID, Mesh, Object, Scene, PropertyGroup, Operator, Panel, UIList, Attribute, Context):
+    setattr(bpy_types, _cls.__name__, _cls)
+
+
+# ----------------------------------------------------------------------
+# bpy.data
+# ----------------------------------------------------------------------
+class _IDCollection:
+    def __init__(self, id_type):
+        self._type = id_type
+        self._by_name: Dict[str, ID] = {}
+
+    def _unique_name(self, name: str) -> str:
+        if name not in self._by_name:
+            return name
+        for i in itertools.count(1):
+            candidate = f"{name}.{i:03d}"
+            if candidate not in self._by_name:
+                return candidate
+
+    def new(self, name: str, *args) -> ID:
+        idd = self._type(self._unique_name(name), *args)
+        self._by_name[idd.name] = idd
+        return idd
+
+    def remove(self, idd: ID) -> None:
+        self._by_name.pop(idd._name, None)
+        idd._removed = True
+        for scene in data.scenes:
+            if idd in scene.objects:
+                scene.objects.remove(idd)
+
+    def rename(self, idd: ID, name: str) -> None:
+        """ID の名前を変える（data 側の名前表も更新する）。"""
+        self._by_name.pop(idd._name, None)
+        idd.name = self._unique_name(name)
+        self._by_name[idd.name] = idd
+        # 本物も名前の変更で ID の更新通知が出る
+        tag_update(idd, geometry=False)
+
+    def get(self, name: str, default=None):
+        return self._by_name.get(name, default)
+
+    def __getitem__(self, name: str):
+        return self._by_name[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def __iter__(self):
+        return iter(list(self._by_name.values()))
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+
+class BlendData:
+    def __init__(self):
+        self.objects = _IDCollection(Object)
+        self.meshes = _IDCollection(Mesh)
+        self.scenes = _IDCollection(Scene)
+
+
+# ----------------------------------------------------------------------
+# bpy.app（handlers / timers）と更新通知
+# ----------------------------------------------------------------------
+handlers = types.ModuleType("bpy.app.handlers")
+for _name in ("depsgraph_update_post", "undo_post", "redo_post", "load_post"):
+    setattr(handlers, _name, [])
+
+
+def persistent(func):
+    return func
+
+
+handlers.persistent = persistent
+
+timers = types.ModuleType("bpy.app.timers")
+_timers: List = []
+
+
+def _timer_register(func, first_interval: float = 0.0, persistent: bool = False) -> None:
+    if func not in _timers:
+        _timers.append(func)
+
+
+def _timer_unregister(func) -> None:
+    _timers.remove(func)
+
+
+def _timer_is_registered(func) -> bool:
+    return func in _timers
+
+
+timers.register = _timer_register
+timers.unregister = _timer_unregister
+timers.is_registered = _timer_is_registered
+
+app = types.ModuleType("bpy.app")
+app.handlers = handlers
+app.timers = timers
+app.version = (5, 0, 0)
+app.version_string = "5.0.0 (fake)"
+app.background = True
+
+
+class DepsgraphUpdate:
+    __slots__ = ("id", "is_updated_geometry", "is_updated_transform", "is_updated_shading")
+
+    def __init__(self, idd: ID, geometry: bool):
+        self.id = idd
+        self.is_updated_geometry = geometry
+        self.is_updated_transform = False
+        self.is_updated_shading = False
+
+
+class Depsgraph:
+    def __init__(self, updates: List[DepsgraphUpdate]):
+        self.updates = updates
+
+
+# ID のポインタ → (ID, ジオメトリ更新か)
+_pending_updates: Dict[int, List] = {}
+
+
+def tag_update(idd: ID, geometry: bool) -> None:
+    entry = _pending_updates.setdefault(idd.as_pointer(), [idd, False])
+    entry[1] = entry[1] or geometry
+
+
+def flush_updates() -> None:
+    """溜まった更新通知を depsgraph_update_post に流し、登録済みのタイマーを1回ずつ実行する。"""
+    if _pending_updates:
+        updates = [DepsgraphUpdate(idd, geometry) for idd, geometry in _pending_updates.values()]
+        _pending_updates.clear()
+        depsgraph = Depsgraph(updates)
+        for handler in list(handlers.depsgraph_update_post):
+            handler(context.scene, depsgraph)
+
+    for func in list(_timers):
+        _timers.remove(func)
+        interval = func()
+        if interval is not None:
+            _timers.append(func)
+
+
+# ----------------------------------------------------------------------
+# bpy.utils
+# ----------------------------------------------------------------------
+utils = types.ModuleType("bpy.utils")
+utils.register_class = lambda cls: None
+utils.unregister_class = lambda cls: None
+
+
+# ----------------------------------------------------------------------
+# モジュールの組み立て
+# ----------------------------------------------------------------------
+data: BlendData = BlendData()
+context: Context = Context(data.scenes.new("Scene"))
+
+
+def reset() -> None:
+    """bpy.data / bpy.context を空の状態（シーン1つ）に戻す。"""
+    global data, context
+    data = BlendData()
+    context = Context(data.scenes.new("Scene"))
+    _pending_updates.clear()
+    _timers.clear()
+    module = sys.modules.get("bpy")
+    if module is not None and getattr(module, "_hm_fake", False):
+        module.data = data
+        module.context = context
+
+
+def build_module() -> types.ModuleType:
+    bpy = types.ModuleType("bpy")
+    bpy._hm_fake = True
+    bpy.types = bpy_types
+    bpy.props = props
+    bpy.app = app
+    bpy.utils = utils
+    bpy.data = data
+    bpy.context = context
+    return bpy
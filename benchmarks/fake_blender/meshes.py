@@ -0,0 +1,70 @@
+"""
+フェイクの Mesh を作るヘルパー（グリッド・任意の面からのメッシュ・PIDの付与）。
+"""
+
+import math
+
+import numpy as np
+
+from . import fake_bpy
+
+_DOMAINS = {"VERT": "POINT", "EDGE": "EDGE", "FACE": "FACE"}
+_PID_ATTRS = {"VERT": "hm_vid", "EDGE": "hm_eid", "FACE": "hm_fid"}
+
+
+def mesh_from_faces(name: str, co: np.ndarray, loop_vert: np.ndarray, loop_total: np.ndarray):
+    """面（ループ列）から辺を求めて Mesh を作る（Mesh.update(calc_edges=True) 相当）。"""
+    loop_vert = np.asarray(loop_vert, dtype=np.int64)
+    loop_total = np.asarray(loop_total, dtype=np.int64)
+    num_v = len(co)
+
+    loop_start = np.zeros(len(loop_total), dtype=np.int64)
+    if len(loop_total):
+        np.cumsum(loop_total[:-1], out=loop_start[1:])
+    loop_face = np.repeat(np.arange(len(loop_total)), loop_total)
+    local = np.arange(len(loop_vert)) - loop_start[loop_face]
+    nxt = loop_vert[loop_start[loop_face] + (local + 1) % loop_total[loop_face]]
+
+    a = np.minimum(loop_vert, nxt)
+    b = np.maximum(loop_vert, nxt)
+    keys, loop_edge = np.unique(a * num_v + b, return_inverse=True)
+
+    me = fake_bpy.data.meshes.new(name)
+    me.co = np.asarray(co, dtype=np.float32).reshape(-1, 3)
+    me.edge_verts = np.stack([keys // num_v, keys % num_v], axis=1).astype(np.int32)
+    me.loop_start = loop_start.astype(np.int32)
+    me.loop_total = loop_total.astype(np.int32)
+    me.loop_vert = loop_vert.astype(np.int32)
+    me.loop_edge = loop_edge.astype(np.int32)
+    return me
+
+
+def grid_mesh(name: str, vert_target: int):
+    """約 vert_target 頂点の四角形グリッド。"""
+    side = max(2, int(round(math.sqrt(vert_target))))
+    ix, iy = np.meshgrid(np.arange(side), np.arange(side))
+    co = np.zeros((side * side, 3), dtype=np.float32)
+    co[:, 0] = ix.ravel() / side
+    co[:, 1] = iy.ravel() / side
+
+    q = side - 1
+    base = (np.arange(q)[None, :] + np.arange(q)[:, None] * side).ravel()
+    loops = np.stack([base, base + 1, base + side + 1, base + side], axis=1).ravel()
+    return mesh_from_faces(name, co, loops, np.full(q * q, 4))
+
+
+def stamp_pids(me, scene) -> None:
+    """全要素に連続したPIDを振る（hm_next_elem_id も進める）。"""
+    next_pid = int(scene.hm_next_elem_id)
+    for etype, name in _PID_ATTRS.items():
+        attr = me.attributes.get(name) or me.attributes.new(name, "INT", _DOMAINS[etype])
+        size = len(attr.values)
+        attr.values[:] = np.arange(next_pid, next_pid + size)
+        next_pid += size
+    scene.hm_next_elem_id = next_pid
+
+
+def link_object(scene, name: str, me):
+    obj = fake_bpy.data.objects.new(name, me)
+    scene.collection.objects.link(obj)
+    return obj
@@ -0,0 +1,337 @@
+"""
+core/ のマイクロベンチマーク（Blender 不要。フェイクの bpy / bmesh で動かす）。
+
+    python -m benchmarks.micro --out micro.json [--baseline micro_base.json --threshold 0.2] \
+        [--sizes 10000,100000,1000000] [--bmesh-limit 200000] [--repeat 5] [--filter pid,diff]
+
+NumPy で作ったグリッドメッシュに対して
+- PID の割り当て / 重複検出 / 圧縮、パック配列のエンコード
+- 配列パス（mesh_arrays / array_apply / expansion / diff / reverse_index）
+- BMesh パス（pid / pid_cache / bmesh_ops / toggle / diff の編集モード）
+- オペレーターの execute（bpy.ops を通さずに直接呼ぶ）
+を計測し、run_benchmarks.py と同じ形式の JSON に書く（比較は compare.py）。
+
+BMesh パスはフェイクの要素プロキシを Python で反復するので、本物の BMesh とは
+絶対値が違う。--bmesh-limit を超える頂点数では計測しない。
+結果は同じマシン・同じフェイクどうしで比べること（Blender の結果とは比べない）。
+"""
+
+import argparse
+import platform
+import sys
+import time
+import traceback
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks import fake_blender
+
+fake_blender.install()
+
+import bpy  # noqa: E402
+
+import hide_set_manager  # noqa: E402
+from hide_set_manager.core.array_apply import apply_hide_arrays  # noqa: E402
+from hide_set_manager.core.bmesh_ops import bmesh_session, hide_members_on_bmesh  # noqa: E402
+from hide_set_manager.core.diff import compute_hide_set_diff, sync_hide_set_saved_hidden  # noqa: E402
+from hide_set_manager.core.expansion import EXPAND_RINGS, ExpansionRule  # noqa: E402
+from hide_set_manager.core.handlers import clear_all_caches  # noqa: E402
+from hide_set_manager.core.mesh_arrays import clear_array_cache, get_pid_array, resolve_members  # noqa: E402
+from hide_set_manager.core.packed_store import (  # noqa: E402
+    STORAGE_ELEMENTS,
+    STORAGE_PACKED,
+    decode_pids,
+    encode_pids,
+)
+from hide_set_manager.core.pid import (  # noqa: E402
+    allocate_missing_pids,
+    assign_missing_pids_bmesh,
+    build_pid_maps,
+)
+from hide_set_manager.core.pid_cache import clear_pid_cache, get_pid_maps  # noqa: E402
+from hide_set_manager.core.pid_compact import compact_domain  # noqa: E402
+from hide_set_manager.core.pid_repair import duplicate_pid_copies  # noqa: E402
+from hide_set_manager.core.registry import add_members, split_items_by_object  # noqa: E402
+from hide_set_manager.core.reverse_index import invalidate_reverse_index, refresh_reverse_index  # noqa: E402
+from hide_set_manager.core.toggle import toggle_edit_hide_set  # noqa: E402
+from hide_set_manager.ui.operators import HM_ApplyHideSet, HM_ToggleHideSet  # noqa: E402
+
+from benchmarks.compare import (  # noqa: E402
+    DEFAULT_THRESHOLD,
+    compare_results,
+    format_comparisons,
+    has_regression,
+    load_results,
+)
+from benchmarks.scenes import ELEMENTS_STORAGE_LIMIT, size_label  # noqa: E402
+from benchmarks.timing import (  # noqa: E402
+    Case,
+    matches_filter,
+    parse_filter,
+    time_case,
+    write_results,
+)
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_BMESH_LIMIT = 200_000
+
+EXIT_REGRESSION = 1
+EXIT_CASE_FAILED = 2
+
+
+class MicroScene:
+    """グリッド1枚と、benchmarks/scenes.py と同じ構成の編集モードセット。"""
+
+    def __init__(self, vert_target: int):
+        fake_blender.reset()
+        clear_all_caches()
+        self.scene = bpy.context.scene
+        self.label = f"grid_{size_label(vert_target)}"
+        self.me = fake_blender.grid_mesh(self.label, vert_target)
+        fake_blender.stamp_pids(self.me, self.scene)
+        # オブジェクトモードで選択していると ensure_objects_in_edit_mode が
+        # selected_objects に落ちて BMesh パスになるので、選択しない
+        self.obj = fake_blender.link_object(self.scene, self.label, self.me)
+        self._add_sets()
+
+    def _pids(self, etype: str) -> np.ndarray:
+        name = {"VERT": "hm_vid", "EDGE": "hm_eid", "FACE": "hm_fid"}[etype]
+        return self.me.attributes[name].values.copy()
+
+    def _add_sets(self) -> None:
+        specs = [
+            ("faces_half", "FACE", STORAGE_PACKED, lambda p: p[::2]),
+            ("verts_tenth", "VERT", STORAGE_PACKED, lambda p: p[: max(1, len(p) // 10)]),
+            ("edges_quarter", "EDGE", STORAGE_PACKED, lambda p: p[::4]),
+        ]
+        if len(self.me.polygons) // 2 <= ELEMENTS_STORAGE_LIMIT:
+            specs.append(("faces_half_elements", "FACE", STORAGE_ELEMENTS, lambda p: p[::2]))
+        for name, etype, storage, pick in specs:
+            hs = self.scene.hm_edit_sets.add()
+            hs.name = name
+            hs.mode = etype
+            hs.storage = storage
+            pids = pick(self._pids(etype))
+            add_members(hs, self.obj.name, etype, pids, np.zeros(len(pids), dtype=bool))
+
+    @property
+    def elements(self) -> int:
+        return len(self.me.vertices) + len(self.me.edges) + len(self.me.polygons)
+
+    def hide_set(self, i: int = 0):
+        return self.scene.hm_edit_sets[i]
+
+    def group(self, i: int = 0):
+        return split_items_by_object(self.hide_set(i))[self.obj.name]
+
+    def set_mode(self, mode: str) -> None:
+        fake_blender.set_edit_mode(self.obj, mode == "EDIT")
+        fake_blender.flush_updates()
+
+    def reveal_all(self) -> None:
+        if self.obj.mode == "EDIT":
+            bm = self.me.edit_bmesh
+            for seq in (bm.verts, bm.edges, bm.faces):
+                seq.hide[:] = False
+            return
+        for name in (".hide_vert", ".hide_edge", ".hide_poly"):
+            attr = self.me.attributes.get(name)
+            if attr is not None:
+                attr.values[:] = False
+        self.me.update()
+        fake_blender.flush_updates()
+
+
+def _run_operator(op_type, **kwargs) -> None:
+    op = op_type(**kwargs)
+    result = op.execute(bpy.context)
+    if "FINISHED" not in result:
+        raise RuntimeError(f"{op_type.bl_idname} が {result} を返しました: {op.reports}")
+
+
+def algorithm_cases(ms: MicroScene) -> List[Case]:
+    """メッシュに依存しない配列アルゴリズム。"""
+    rng = np.random.default_rng(0)
+    n = len(ms.me.vertices)
+    pids = ms._pids("VERT").astype(np.int64)
+
+    missing = pids.copy()
+    missing[rng.choice(n, n // 10, replace=False)] = 0
+    all_mask = np.ones(n, dtype=bool)
+
+    duplicated = pids.copy()
+    duplicated[rng.choice(n, n // 100, replace=False)] = pids[rng.choice(n, n // 100)]
+
+    sparse = np.sort(rng.choice(n * 8, n, replace=False) + 1)
+    encoded = encode_pids(pids)
+
+    return [
+        Case("algo.allocate_missing_pids", lambda: allocate_missing_pids(missing.copy(), all_mask, ms.scene)),
+        Case("algo.duplicate_pid_copies", lambda: duplicate_pid_copies(duplicated)),
+        Case("algo.compact_domain", lambda: compact_domain(sparse, 1)),
+        Case("algo.encode_pids", lambda: encode_pids(pids)),
+        Case("algo.decode_pids", lambda: decode_pids(encoded)),
+    ]
+
+
+def array_cases(ms: MicroScene) -> List[Case]:
+    """オブジェクトモード（配列パス）。"""
+    context = bpy.context
+    me = ms.me
+    face_pids = ms.group(0).pids.copy()
+    rings = ExpansionRule(EXPAND_RINGS, 2)
+
+    def _apply(i: int, rule=None):
+        return lambda: apply_hide_arrays(me, ms.group(i), True, rule)
+
+    def _cold_pid_arrays():
+        clear_array_cache()
+        clear_pid_cache()
+
+    return [
+        Case("array.get_pid_array.cold", lambda: get_pid_array(me, "FACE"), setup=_cold_pid_arrays),
+        Case("array.resolve_members.warm", lambda: resolve_members(me, "FACE", face_pids), warmup=True),
+        Case("array.apply.faces", _apply(0), setup=ms.reveal_all),
+        Case("array.apply.verts", _apply(1), setup=ms.reveal_all),
+        Case("array.apply.edges", _apply(2), setup=ms.reveal_all),
+        Case("array.apply.faces.rings2", _apply(0, rings), setup=ms.reveal_all),
+        Case("array.compute_diff.cold", lambda: compute_hide_set_diff(context, ms.hide_set(0)),
+             setup=clear_all_caches),
+        Case("array.compute_diff.warm", lambda: compute_hide_set_diff(context, ms.hide_set(0)), warmup=True),
+        Case("array.sync", lambda: sync_hide_set_saved_hidden(context, ms.hide_set(0))),
+        Case("array.reverse_index.refresh", lambda: refresh_reverse_index(ms.scene),
+             setup=lambda: invalidate_reverse_index(full=True)),
+        Case("op.apply_hide_set.hide", lambda: _run_operator(
+            HM_ApplyHideSet, index=0, list_type="EDIT", action="HIDE"), setup=ms.reveal_all),
+    ]
+
+
+def bmesh_cases(ms: MicroScene) -> List[Case]:
+    """編集モード（BMesh パス）。"""
+    context = bpy.context
+    me = ms.me
+    bm = lambda: me.edit_bmesh  # noqa: E731
+
+    def _apply_on_bmesh():
+        with bmesh_session():
+            hide_members_on_bmesh(bm(), ms.obj, {ms.obj}, ms.group(1), True)
+
+    def _toggle():
+        with bmesh_session():
+            toggle_edit_hide_set(context, ms.hide_set(0))
+
+    def _sync():
+        with bmesh_session():
+            sync_hide_set_saved_hidden(context, ms.hide_set(0))
+
+    def _assign_selected():
+        faces = bm().faces
+        layer = faces.layers.int.get("hm_fid")
+        selected = [f for f in faces if f.select]
+        assign_missing_pids_bmesh(selected, layer, ms.scene)
+
+    def _select_faces():
+        bm().faces.select[::3] = True
+
+    return [
+        Case("bmesh.build_pid_maps", lambda: build_pid_maps(bm()), mode="EDIT"),
+        Case("bmesh.get_pid_maps.cold", lambda: get_pid_maps(bm(), me, True),
+             setup=clear_pid_cache, mode="EDIT"),
+        Case("bmesh.get_pid_maps.warm", lambda: get_pid_maps(bm(), me, True), warmup=True, mode="EDIT"),
+        Case("bmesh.assign_missing_pids", _assign_selected, setup=_select_faces, mode="EDIT"),
+        Case("bmesh.hide_members.verts", _apply_on_bmesh, setup=ms.reveal_all, mode="EDIT"),
+        Case("bmesh.toggle", _toggle, mode="EDIT"),
+        Case("bmesh.sync", _sync, mode="EDIT"),
+        Case("op.apply_hide_set.hide.edit", lambda: _run_operator(
+            HM_ApplyHideSet, index=0, list_type="EDIT", action="HIDE"), setup=ms.reveal_all, mode="EDIT"),
+        Case("op.toggle_hide_set.edit", lambda: _run_operator(HM_ToggleHideSet, index=0, list_type="EDIT"),
+             mode="EDIT"),
+    ]
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    def _int_list(text: str) -> List[int]:
+        return [int(float(t)) for t in text.split(",") if t.strip()]
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.micro", description="core/ のマイクロベンチマーク")
+    parser.add_argument("--out", default="micro_results.json", help="結果 JSON の出力先")
+    parser.add_argument("--baseline", default="", help="比較するベースラインの結果 JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="劣化とみなす増加率（0.2 = 20%%）")
+    parser.add_argument("--sizes", type=_int_list, default=list(DEFAULT_SIZES), help="頂点数（カンマ区切り）")
+    parser.add_argument("--bmesh-limit", type=int, default=DEFAULT_BMESH_LIMIT,
+                        help="BMesh パスを計測する頂点数の上限")
+    parser.add_argument("--repeat", type=int, default=5, help="ケースごとの計測回数")
+    parser.add_argument("--filter", default="", help="ケース名に含まれる文字列（カンマ区切り、どれか1つ）")
+    return parser.parse_args(argv)
+
+
+def run(args: argparse.Namespace) -> Dict[str, dict]:
+    filters = parse_filter(args.filter)
+    results: Dict[str, dict] = {}
+
+    for size in args.sizes:
+        t0 = time.perf_counter()
+        ms = MicroScene(size)
+        print(f"== {ms.label}: {ms.elements} 要素（生成 {time.perf_counter() - t0:.2f}s）", flush=True)
+
+        cases = algorithm_cases(ms) + array_cases(ms)
+        if size <= args.bmesh_limit:
+            cases += bmesh_cases(ms)
+
+        for case in cases:
+            name = f"fake/{ms.label}/{case.name}"
+            if not matches_filter(name, filters):
+                continue
+            entry = {"elements": ms.elements, "objects": 1}
+            try:
+                ms.set_mode(case.mode)
+                entry.update(time_case(case, args.repeat, settle=fake_blender.flush_updates))
+                print(f"  {case.name:<36} min {entry['min'] * 1e3:10.3f} ms"
+                      f"  median {entry['median'] * 1e3:10.3f} ms", flush=True)
+            except Exception as e:
+                entry["error"] = f"{type(e).__name__}: {e}"
+                print(f"  {case.name:<36} 失敗: {entry['error']}", flush=True)
+                traceback.print_exc()
+            results[name] = entry
+        ms.set_mode("OBJECT")
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    hide_set_manager.register()
+    try:
+        results = run(args)
+    finally:
+        hide_set_manager.unregister()
+
+    meta = {
+        "backend": "fake",
+        "addon_version": ".".join(str(v) for v in hide_set_manager.bl_info["version"]),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "repeat": args.repeat,
+        "sizes": args.sizes,
+        "bmesh_limit": args.bmesh_limit,
+    }
+    write_results(args.out, meta, results)
+    print(f"結果を保存しました: {args.out}")
+
+    code = 0
+    if args.baseline:
+        comparisons = compare_results(results, load_results(args.baseline), args.threshold)
+        print(format_comparisons(comparisons))
+        if has_regression(comparisons):
+            code = EXIT_REGRESSION
+    if code == 0 and any("error" in r for r in results.values()):
+        code = EXIT_CASE_FAILED
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
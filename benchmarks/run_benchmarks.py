@@ -0,0 +1,490 @@
+"""
+Hide Set Manager のベンチマーク（Blender のバックグラウンド実行用）。
+
+    blender --background --factory-startup --python benchmarks/run_benchmarks.py -- \
+        --out results.json [--baseline baseline.json --threshold 0.2] \
+        [--sizes 10000,100000,1000000,5000000] [--kinds grid,subdiv] \
+        [--objects 1,10,100,500,2000] [--repeat 5] [--filter apply,toggle]
+
+シーンごとに
+- ui/operators.py の全オペレーター（bpy.ops.hide_manager.*）
+- core/ / data/ の関数を直接
+- パネル描画相当（状態キャッシュを捨ててから prefetch + get）
+を計測し、ケースごとの min / median / mean / max を JSON に書く。
+
+--baseline を渡すと compare.py で比較し、劣化があれば終了コード 1 を返す
+（計測に失敗したケースがあれば 2）。
+
+ケース名は "<シーン>/<op|core|draw>.<名前>[.edit]"。
+.edit の付いたケースは編集モードで、それ以外はオブジェクトモードで計測する。
+キャッシュの効き方で結果が大きく変わる関数は .cold（全キャッシュを捨ててから）と
+.warm（直前に1回実行してから）の両方を計測する。
+"""
+
+import argparse
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from typing import Dict, List
+
+import bpy
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import hide_set_manager  # noqa: E402
+from hide_set_manager.core.handlers import clear_all_caches  # noqa: E402
+from hide_set_manager.core.array_apply import apply_hide_arrays  # noqa: E402
+from hide_set_manager.core.batch import BatchAction, run_hide_set_batch  # noqa: E402
+from hide_set_manager.core.bmesh_ops import bmesh_session  # noqa: E402
+from hide_set_manager.core.diff import (  # noqa: E402
+    compute_hide_set_diff,
+    preview_hide_set_diff,
+    sync_hide_set_saved_hidden,
+)
+from hide_set_manager.core.expansion import rule_from_hide_set  # noqa: E402
+from hide_set_manager.core.mesh_arrays import get_pid_array, resolve_members  # noqa: E402
+from hide_set_manager.core.pid_compact import compact_pids  # noqa: E402
+from hide_set_manager.core.pid_repair import repair_mesh_pids  # noqa: E402
+from hide_set_manager.core.registry import (  # noqa: E402
+    hide_set_is_completely_hidden,
+    invalidate_member_index,
+    object_members,
+    split_items_by_object,
+)
+from hide_set_manager.core.reverse_index import (  # noqa: E402
+    invalidate_reverse_index,
+    refresh_reverse_index,
+    sets_containing_object,
+)
+from hide_set_manager.core.status_cache import (  # noqa: E402
+    get_hide_set_status,
+    invalidate_hide_set_status,
+    prefetch_hide_set_status,
+)
+from hide_set_manager.core.toggle import toggle_edit_hide_set  # noqa: E402
+from hide_set_manager.data.archive import (  # noqa: E402
+    ARCHIVE_EXT,
+    export_hide_set_archive,
+    export_scene_archive,
+    import_archive,
+)
+from hide_set_manager.data.serializer import export_hide_set, import_hide_set  # noqa: E402
+
+from benchmarks import scenes  # noqa: E402
+from benchmarks.compare import (  # noqa: E402
+    DEFAULT_THRESHOLD,
+    compare_results,
+    format_comparisons,
+    has_regression,
+    load_results,
+)
+from benchmarks.timing import (  # noqa: E402
+    Case,
+    matches_filter,
+    parse_filter,
+    time_case,
+    write_results,
+)
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000, 5_000_000)
+DEFAULT_OBJECTS = (1, 10, 100, 500, 2_000)
+QUICK_SIZES = (10_000, 100_000)
+QUICK_OBJECTS = (1, 10, 100)
+
+EXIT_REGRESSION = 1
+EXIT_CASE_FAILED = 2
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def run_op(op, **kwargs) -> None:
+    """オペレーターを EXEC_DEFAULT で実行する。FINISHED 以外は失敗として扱う。"""
+    result = op("EXEC_DEFAULT", **kwargs)
+    if "FINISHED" not in result:
+        raise BenchmarkError(f"{op.idname_py()} が {set(result)} を返しました")
+
+
+# ---------------------------------------------------------------------------
+# モード / 状態の準備
+# ---------------------------------------------------------------------------
+
+def set_mode(scenario: scenes.Scenario, mode: str) -> None:
+    """シナリオの全オブジェクトを選択して、オブジェクトモード / 編集モードにする。"""
+    context = bpy.context
+    current = "EDIT" if context.mode == "EDIT_MESH" else "OBJECT"
+    if current == mode:
+        return
+    if current != "OBJECT":
+        bpy.ops.object.mode_set(mode="OBJECT")
+
+    view_layer = context.view_layer
+    names = {o.name for o in scenario.objects}
+    for obj in view_layer.objects:
+        obj.select_set(obj.name in names)
+    view_layer.objects.active = scenario.objects[0]
+    if mode == "EDIT":
+        bpy.ops.object.mode_set(mode="EDIT")
+
+
+def reveal_all(scenario: scenes.Scenario) -> None:
+    """全要素 / 全オブジェクトを表示に戻す（計測前の状態をそろえる）。"""
+    if bpy.context.mode == "EDIT_MESH":
+        bpy.ops.mesh.reveal(select=False)
+        return
+    for obj in scenario.objects:
+        obj.hide_set(False)
+        me = obj.data
+        for name in (".hide_vert", ".hide_edge", ".hide_poly"):
+            attr = me.attributes.get(name)
+            if attr is not None:
+                attr.data.foreach_set("value", np.zeros(len(attr.data), dtype=bool))
+        me.update()
+
+
+def select_all_elements(scenario: scenes.Scenario) -> None:
+    """登録オペレーター用。オブジェクトモードのうちにメッシュの全要素を選択しておく。"""
+    for me in scenario.meshes:
+        for seq in (me.vertices, me.edges, me.polygons):
+            seq.foreach_set("select", np.ones(len(seq), dtype=bool))
+        me.update()
+
+
+def remove_sets_after(hide_sets, count: int) -> None:
+    """count 個目以降に追加されたセットを消す（計測でセットの並びが変わらないように）。"""
+    while len(hide_sets) > count:
+        hide_sets.remove(len(hide_sets) - 1)
+    invalidate_member_index()
+    invalidate_hide_set_status()
+
+
+# ---------------------------------------------------------------------------
+# ケース
+# ---------------------------------------------------------------------------
+
+def mesh_cases(scenario: scenes.Scenario, tmpdir: str) -> List[Case]:
+    """
+    編集モードセット（メッシュ要素）を持つシーン共通のケース。
+    コレクションへの追加 / 削除でセットの参照は無効になるので、セットは毎回インデックスで引く。
+    """
+    context = bpy.context
+    scene = context.scene
+    edit_sets = scene.hm_edit_sets
+    n_edit = len(edit_sets)
+    me = scenario.meshes[0]
+
+    def hs():
+        return edit_sets[0]
+
+    rule = rule_from_hide_set(hs())
+    face_pids = split_items_by_object(hs())[scenario.objects[0].name].pids.copy()
+    select_all_elements(scenario)
+
+    json_path = os.path.join(tmpdir, "set.json")
+    archive_path = os.path.join(tmpdir, "set" + ARCHIVE_EXT)
+    scene_archive_path = os.path.join(tmpdir, "scene" + ARCHIVE_EXT)
+    # インポート系のケースが読むファイルは先に書いておく
+    export_hide_set(json_path, hs())
+    export_scene_archive(scene_archive_path, scene, reuse_unchanged=False)
+
+    def _apply_arrays():
+        for obj_name, items in split_items_by_object(hs()).items():
+            apply_hide_arrays(bpy.data.objects[obj_name].data, items, True, rule)
+
+    def _get_pid_arrays():
+        for m in scenario.meshes:
+            get_pid_array(m, "FACE")
+
+    def _draw_panel():
+        prefetch_hide_set_status(context, edit_sets)
+        for s in edit_sets:
+            get_hide_set_status(context, s)
+
+    def _toggle_edit():
+        with bmesh_session():
+            toggle_edit_hide_set(context, hs())
+
+    def _sync_edit():
+        with bmesh_session():
+            sync_hide_set_saved_hidden(context, hs())
+
+    def _drop_added_sets():
+        remove_sets_after(edit_sets, n_edit)
+
+    def _add_empty_set():
+        s = edit_sets.add()
+        s.name = "to_delete"
+
+    batch_actions = [BatchAction("EDIT", i, "HIDE") for i in range(min(3, n_edit))]
+
+    return [
+        # --- core: 配列パス（オブジェクトモード） ---
+        Case("core.get_pid_array.cold", _get_pid_arrays, setup=clear_all_caches),
+        Case("core.get_pid_array.warm", _get_pid_arrays, warmup=True),
+        Case("core.resolve_members.warm", lambda: resolve_members(me, "FACE", face_pids), warmup=True),
+        Case("core.apply_hide_arrays", _apply_arrays, setup=lambda: reveal_all(scenario)),
+        Case("core.compute_diff.cold", lambda: compute_hide_set_diff(context, hs()), setup=clear_all_caches),
+        Case("core.preview_diff.cold", lambda: preview_hide_set_diff(context, hs()), setup=clear_all_caches),
+        Case("core.preview_diff.warm", lambda: preview_hide_set_diff(context, hs()), warmup=True),
+        Case("core.run_hide_set_batch", lambda: run_hide_set_batch(context, batch_actions),
+             setup=lambda: reveal_all(scenario)),
+        Case("core.reverse_index.refresh", lambda: refresh_reverse_index(scene),
+             setup=lambda: invalidate_reverse_index(full=True)),
+        Case("core.repair_mesh_pids", lambda: [repair_mesh_pids(m, scene) for m in scenario.meshes]),
+        Case("core.export_hide_set.json", lambda: export_hide_set(json_path, hs())),
+        Case("core.export_hide_set.archive", lambda: export_hide_set_archive(archive_path, hs())),
+        Case("core.export_scene_archive", lambda: export_scene_archive(
+            os.path.join(tmpdir, "scene_core" + ARCHIVE_EXT), scene, reuse_unchanged=False)),
+        Case("core.import_hide_set.json", lambda: import_hide_set(scene, json_path),
+             teardown=_drop_added_sets),
+        Case("core.import_archive", lambda: import_archive(scene, scene_archive_path, skip_existing=False),
+             teardown=lambda: (_drop_added_sets(), remove_sets_after(scene.hm_object_sets, 2))),
+        Case("draw.status.cold", _draw_panel, setup=invalidate_hide_set_status),
+        Case("draw.status.warm", _draw_panel, warmup=True),
+
+        # --- オペレーター（オブジェクトモード：配列パス） ---
+        Case("op.apply_hide_set.hide", lambda: run_op(
+            bpy.ops.hide_manager.apply_hide_set, index=0, list_type="EDIT", action="HIDE"),
+             setup=lambda: reveal_all(scenario)),
+        Case("op.apply_hide_set.show", lambda: run_op(
+            bpy.ops.hide_manager.apply_hide_set, index=0, list_type="EDIT", action="SHOW"),
+             setup=_apply_arrays),
+        Case("op.toggle_hide_set", lambda: run_op(
+            bpy.ops.hide_manager.toggle_hide_set, index=0, list_type="EDIT")),
+        Case("op.batch_hide_sets", lambda: run_op(
+            bpy.ops.hide_manager.batch_hide_sets, list_type="EDIT", action="TOGGLE",
+            indices=",".join(str(a.index) for a in batch_actions))),
+        Case("op.rename_hide_set", lambda: run_op(
+            bpy.ops.hide_manager.rename_hide_set, index=0, list_type="EDIT", new_name=hs().name)),
+        Case("op.delete_hide_set", lambda: run_op(
+            bpy.ops.hide_manager.delete_hide_set, index=n_edit, list_type="EDIT"),
+             setup=_add_empty_set),
+        Case("op.export_hide_set.json", lambda: run_op(
+            bpy.ops.hide_manager.export_hide_set, index=0, list_type="EDIT", filepath=json_path)),
+        Case("op.export_hide_set.archive", lambda: run_op(
+            bpy.ops.hide_manager.export_hide_set, index=0, list_type="EDIT", filepath=archive_path)),
+        Case("op.import_hide_set.json", lambda: run_op(
+            bpy.ops.hide_manager.import_hide_set, filepath=json_path),
+             teardown=_drop_added_sets),
+        Case("op.export_all_hide_sets", lambda: run_op(
+            bpy.ops.hide_manager.export_all_hide_sets, filepath=scene_archive_path, reuse_unchanged=False)),
+        Case("op.export_all_hide_sets.reuse", lambda: run_op(
+            bpy.ops.hide_manager.export_all_hide_sets, filepath=scene_archive_path, reuse_unchanged=True)),
+        Case("op.import_all_hide_sets", lambda: run_op(
+            bpy.ops.hide_manager.import_all_hide_sets, filepath=scene_archive_path, replace=True)),
+        Case("op.repair_pids", lambda: run_op(bpy.ops.hide_manager.repair_pids)),
+
+        # --- 編集モード（BMesh パス） ---
+        Case("op.apply_hide_set.hide.edit", lambda: run_op(
+            bpy.ops.hide_manager.apply_hide_set, index=0, list_type="EDIT", action="HIDE"),
+             setup=lambda: reveal_all(scenario), mode="EDIT"),
+        Case("op.toggle_hide_set.edit", lambda: run_op(
+            bpy.ops.hide_manager.toggle_hide_set, index=0, list_type="EDIT"), mode="EDIT"),
+        Case("op.sync_hide_set.edit", lambda: run_op(
+            bpy.ops.hide_manager.sync_hide_set, index=0, list_type="EDIT"), mode="EDIT"),
+        Case("op.register_hide_set.edit", lambda: run_op(
+            bpy.ops.hide_manager.register_hide_set, name="bench", mode="FACE"),
+             teardown=_drop_added_sets, mode="EDIT"),
+        Case("op.repair_pids.edit", lambda: run_op(bpy.ops.hide_manager.repair_pids), mode="EDIT"),
+        Case("core.toggle_edit_hide_set.edit", _toggle_edit, mode="EDIT"),
+        Case("core.sync_hide_set_saved_hidden.edit", _sync_edit, mode="EDIT"),
+        Case("core.preview_diff.edit", lambda: preview_hide_set_diff(context, hs()),
+             setup=clear_all_caches, mode="EDIT"),
+        Case("draw.status.edit", _draw_panel, setup=invalidate_hide_set_status, mode="EDIT"),
+
+        # PIDとセットを書き換えるので最後に計測する（2回目以降は既に密）
+        Case("core.compact_pids", compact_pids),
+        Case("op.compact_pids", lambda: run_op(bpy.ops.hide_manager.compact_pids)),
+    ]
+
+
+def object_cases(scenario: scenes.Scenario) -> List[Case]:
+    """オブジェクトモードセット（複数オブジェクト）のケース。"""
+    context = bpy.context
+    scene = context.scene
+    object_sets = scene.hm_object_sets
+    n_object = len(object_sets)
+
+    def hs():
+        return object_sets[0]
+
+    names = [o.name for o in scenario.objects]
+
+    def _draw_panel():
+        prefetch_hide_set_status(context, object_sets)
+        for s in object_sets:
+            get_hide_set_status(context, s)
+
+    def _select_objects():
+        for obj in scenario.objects:
+            obj.select_set(True)
+
+    def _drop_added_sets():
+        remove_sets_after(object_sets, n_object)
+
+    def _lookup_objects():
+        for name in names:
+            sets_containing_object(scene, name)
+
+    return [
+        Case("core.object_members.cold", lambda: object_members(hs()), setup=clear_all_caches),
+        Case("core.object_members.warm", lambda: object_members(hs()), warmup=True),
+        Case("core.completely_hidden", lambda: hide_set_is_completely_hidden(hs(), context)),
+        Case("core.sets_containing_object", _lookup_objects, warmup=True),
+        Case("draw.object_status.cold", _draw_panel, setup=invalidate_hide_set_status),
+        Case("op.apply_hide_set.object.hide", lambda: run_op(
+            bpy.ops.hide_manager.apply_hide_set, index=0, list_type="OBJECT", action="HIDE"),
+             setup=lambda: reveal_all(scenario)),
+        Case("op.toggle_hide_set.object", lambda: run_op(
+            bpy.ops.hide_manager.toggle_hide_set, index=0, list_type="OBJECT")),
+        Case("op.batch_hide_sets.object", lambda: run_op(
+            bpy.ops.hide_manager.batch_hide_sets, list_type="OBJECT", action="TOGGLE", indices="0,1")),
+        Case("op.sync_hide_set.object", lambda: run_op(
+            bpy.ops.hide_manager.sync_hide_set, index=0, list_type="OBJECT")),
+        Case("op.register_hide_set.object", lambda: run_op(
+            bpy.ops.hide_manager.register_hide_set, name="bench", mode="OBJECT"),
+             setup=_select_objects, teardown=_drop_added_sets),
+        Case("op.cleanup_deleted_objects", lambda: run_op(bpy.ops.hide_manager.cleanup_deleted_objects)),
+    ]
+
+
+def scenario_cases(scenario: scenes.Scenario, tmpdir: str) -> List[Case]:
+    cases = []
+    if scenario.kind == "objects":
+        cases.extend(object_cases(scenario))
+    cases.extend(mesh_cases(scenario, tmpdir))
+    return cases
+
+
+# ---------------------------------------------------------------------------
+# 実行
+# ---------------------------------------------------------------------------
+
+def _int_list(text: str) -> List[int]:
+    return [int(float(t)) for t in text.split(",") if t.strip()]
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="blender --background --python benchmarks/run_benchmarks.py --",
+        description="Hide Set Manager のベンチマーク",
+    )
+    parser.add_argument("--out", default="benchmark_results.json", help="結果 JSON の出力先")
+    parser.add_argument("--baseline", default="", help="比較するベースラインの結果 JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="劣化とみなす増加率（0.2 = 20%%）")
+    parser.add_argument("--sizes", type=_int_list, default=None,
+                        help="メッシュの頂点数（カンマ区切り）")
+    parser.add_argument("--kinds", default="grid,subdiv", help="メッシュの種類（grid / subdiv）")
+    parser.add_argument("--objects", type=_int_list, default=None,
+                        help="複数オブジェクトシーンのオブジェクト数（カンマ区切り）")
+    parser.add_argument("--repeat", type=int, default=5, help="ケースごとの計測回数")
+    parser.add_argument("--filter", default="", help="ケース名に含まれる文字列（カンマ区切り、どれか1つ）")
+    parser.add_argument("--quick", action="store_true", help="小さいシーンだけで計測する")
+    args = parser.parse_args(argv)
+
+    if args.sizes is None:
+        args.sizes = list(QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    if args.objects is None:
+        args.objects = list(QUICK_OBJECTS if args.quick else DEFAULT_OBJECTS)
+    return args
+
+
+def _blender_argv() -> List[str]:
+    argv = sys.argv
+    return argv[argv.index("--") + 1:] if "--" in argv else []
+
+
+def _meta(args: argparse.Namespace) -> dict:
+    return {
+        "addon_version": ".".join(str(v) for v in hide_set_manager.bl_info["version"]),
+        "blender": bpy.app.version_string,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "repeat": args.repeat,
+        "sizes": args.sizes,
+        "kinds": args.kinds,
+        "objects": args.objects,
+    }
+
+
+def _scenario_builders(args: argparse.Namespace):
+    scene = bpy.context.scene
+    for kind in [k.strip() for k in args.kinds.split(",") if k.strip()]:
+        for size in args.sizes:
+            yield lambda kind=kind, size=size: scenes.build_mesh_scenario(scene, kind, size)
+    for count in args.objects:
+        yield lambda count=count: scenes.build_objects_scenario(scene, count)
+
+
+def run(args: argparse.Namespace) -> Dict[str, dict]:
+    filters = parse_filter(args.filter)
+    results: Dict[str, dict] = {}
+
+    tmpdir = tempfile.mkdtemp(prefix="hm_bench_")
+    try:
+        for build in _scenario_builders(args):
+            t0 = time.perf_counter()
+            scenario = build()
+            print(f"== {scenario.label}: {scenario.elements} 要素 / {len(scenario.objects)} オブジェクト"
+                  f"（生成 {time.perf_counter() - t0:.2f}s）", flush=True)
+
+            for case in scenario_cases(scenario, tmpdir):
+                name = f"{scenario.label}/{case.name}"
+                if not matches_filter(name, filters):
+                    continue
+                entry = {"elements": scenario.elements, "objects": len(scenario.objects)}
+                try:
+                    set_mode(scenario, case.mode)
+                    entry.update(time_case(case, args.repeat))
+                    print(f"  {case.name:<40} min {entry['min'] * 1e3:10.3f} ms"
+                          f"  median {entry['median'] * 1e3:10.3f} ms", flush=True)
+                except Exception as e:
+                    entry["error"] = f"{type(e).__name__}: {e}"
+                    print(f"  {case.name:<40} 失敗: {entry['error']}", flush=True)
+                    traceback.print_exc()
+                results[name] = entry
+
+            set_mode(scenario, "OBJECT")
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return results
+
+
+def main() -> int:
+    args = parse_args(_blender_argv())
+
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    hide_set_manager.register()
+    try:
+        results = run(args)
+    finally:
+        hide_set_manager.unregister()
+
+    write_results(args.out, _meta(args), results)
+    print(f"結果を保存しました: {args.out}")
+
+    code = 0
+    if args.baseline:
+        comparisons = compare_results(results, load_results(args.baseline), args.threshold)
+        print(format_comparisons(comparisons))
+        if has_regression(comparisons):
+            code = EXIT_REGRESSION
+    if code == 0 and any("error" in r for r in results.values()):
+        code = EXIT_CASE_FAILED
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+ベンチマーク用のシーン生成（Blender 内でのみ動く）。
+
+- グリッド     : NumPy で頂点 / ループ / 面を直接 foreach_set して作る（500万頂点でも数秒）
+- 細分化メッシュ : 立方体を bmesh.ops.subdivide_edges（グリッドフィル）で細分化する
+                 （極や面の向きが混ざるので、グリッドとは違う位相になる）
+- 複数オブジェクト : 小さなグリッドを別メッシュとして N 個並べる
+
+要素数の指定は頂点数の目安。PID は hm_vid / hm_eid / hm_fid に arange で振り、
+非表示セットはパック配列ストレージで add_members から直接作る（オペレーターを通さない）。
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import List
+
+import bmesh
+import bpy
+import numpy as np
+
+from hide_set_manager.core.handlers import clear_all_caches
+from hide_set_manager.core.mesh_arrays import ATTR_NAMES, domain_size
+from hide_set_manager.core.packed_store import STORAGE_ELEMENTS, STORAGE_PACKED
+from hide_set_manager.core.registry import add_item_unique, add_members, invalidate_member_index
+
+# 属性のドメイン
+_DOMAINS = {"VERT": "POINT", "EDGE": "EDGE", "FACE": "FACE"}
+
+# ELEMENTS ストレージ（旧形式）のセットを作るメンバー数の上限（CollectionProperty への追加が遅い）
+ELEMENTS_STORAGE_LIMIT = 200_000
+
+# 複数オブジェクトシーンの1オブジェクトあたりの頂点数の目安
+OBJECT_MESH_VERTS = 400
+
+
+@dataclass
+class Scenario:
+    label: str
+    kind: str  # "grid" / "subdiv" / "objects"
+    objects: List[bpy.types.Object] = field(default_factory=list)
+    elements: int = 0  # 全メッシュの頂点 + 辺 + 面
+
+    @property
+    def meshes(self) -> List[bpy.types.Mesh]:
+        return [o.data for o in self.objects]
+
+
+def size_label(count: int) -> str:
+    if count >= 1_000_000 and count % 1_000_000 == 0:
+        return f"{count // 1_000_000}m"
+    if count >= 1_000 and count % 1_000 == 0:
+        return f"{count // 1_000}k"
+    return str(count)
+
+
+def reset_scene(scene) -> None:
+    """オブジェクト / メッシュ / 非表示セットを全て消し、キャッシュを捨てる。"""
+    if bpy.context.mode != "OBJECT":
+        bpy.ops.object.mode_set(mode="OBJECT")
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj)
+    for me in list(bpy.data.meshes):
+        bpy.data.meshes.remove(me)
+    scene.hm_edit_sets.clear()
+    scene.hm_object_sets.clear()
+    scene.hm_next_elem_id = 1
+    invalidate_member_index()
+    clear_all_caches()
+
+
+def grid_mesh(name: str, vert_target: int) -> bpy.types.Mesh:
+    side = max(2, int(round(math.sqrt(vert_target))))
+    count = side * side
+
+    ix, iy = np.meshgrid(np.arange(side), np.arange(side))
+    co = np.zeros((count, 3), dtype=np.float32)
+    co[:, 0] = ix.ravel() / side
+    co[:, 1] = iy.ravel() / side
+
+    q = side - 1
+    base = (np.arange(q)[None, :] + np.arange(q)[:, None] * side).ravel()
+    loops = np.stack([base, base + 1, base + side + 1, base + side], axis=1).ravel()
+
+    me = bpy.data.meshes.new(name)
+    me.vertices.add(count)
+    me.vertices.foreach_set("co", co.ravel())
+    me.loops.add(len(loops))
+    me.loops.foreach_set("vertex_index", loops.astype(np.int32))
+    me.polygons.add(q * q)
+    me.polygons.foreach_set("loop_start", np.arange(0, len(loops), 4, dtype=np.int32))
+    me.update(calc_edges=True)
+    return me
+
+
+def subdivided_mesh(name: str, vert_target: int) -> bpy.types.Mesh:
+    # 立方体を cuts 回細分化すると 6 * cuts^2 + 12 * cuts + 8 頂点
+    cuts = max(1, int(round(math.sqrt(vert_target / 6.0))) - 1)
+    bm = bmesh.new()
+    try:
+        bmesh.ops.create_cube(bm, size=2.0)
+        bmesh.ops.subdivide_edges(bm, edges=bm.edges[:], cuts=cuts, use_grid_fill=True)
+        me = bpy.data.meshes.new(name)
+        bm.to_mesh(me)
+    finally:
+        bm.free()
+    me.update()
+    return me
+
+
+def stamp_pids(me, scene) -> None:
+    """全要素に連続したPIDを振る（hm_next_elem_id も進める）。"""
+    next_pid = int(scene.hm_next_elem_id)
+    for etype, (name, _hide_name) in ATTR_NAMES.items():
+        size = domain_size(me, etype)
+        attr = me.attributes.get(name) or me.attributes.new(name, "INT", _DOMAINS[etype])
+        attr.data.foreach_set("value", np.arange(next_pid, next_pid + size, dtype=np.int32))
+        next_pid += size
+    scene.hm_next_elem_id = next_pid
+
+
+def link_object(scene, name: str, me) -> bpy.types.Object:
+    obj = bpy.data.objects.new(name, me)
+    scene.collection.objects.link(obj)
+    return obj
+
+
+def _element_count(me) -> int:
+    return len(me.vertices) + len(me.edges) + len(me.polygons)
+
+
+def _read_pids(me, etype: str) -> np.ndarray:
+    name = ATTR_NAMES[etype][0]
+    pids = np.empty(domain_size(me, etype), dtype=np.int32)
+    me.attributes[name].data.foreach_get("value", pids)
+    return pids
+
+
+def add_edit_sets(scene, objects) -> None:
+    """
+    編集モードセットを作る。
+      0: 面の半分（1つおき）
+      1: 頂点の先頭 10%
+      2: 辺の 1/4
+      3: 面の半分（ELEMENTS ストレージ。メンバー数が多いときは作らない）
+    """
+    specs = [
+        ("faces_half", "FACE", lambda p: p[::2]),
+        ("verts_tenth", "VERT", lambda p: p[: max(1, len(p) // 10)]),
+        ("edges_quarter", "EDGE", lambda p: p[::4]),
+    ]
+    for name, etype, pick in specs:
+        hs = scene.hm_edit_sets.add()
+        hs.name = name
+        hs.mode = etype
+        hs.storage = STORAGE_PACKED
+        for obj in objects:
+            pids = pick(_read_pids(obj.data, etype))
+            add_members(hs, obj.name, etype, pids, np.zeros(len(pids), dtype=bool))
+
+    total = sum(len(o.data.polygons) // 2 for o in objects)
+    if total <= ELEMENTS_STORAGE_LIMIT:
+        hs = scene.hm_edit_sets.add()
+        hs.name = "faces_half_elements"
+        hs.mode = "FACE"
+        hs.storage = STORAGE_ELEMENTS
+        for obj in objects:
+            pids = _read_pids(obj.data, "FACE")[::2]
+            add_members(hs, obj.name, "FACE", pids, np.zeros(len(pids), dtype=bool))
+
+
+def add_object_sets(scene, objects) -> None:
+    """オブジェクトモードセット。0: 全オブジェクト / 1: 半分"""
+    for name, members in (("all_objects", objects), ("half_objects", objects[::2])):
+        hs = scene.hm_object_sets.add()
+        hs.name = name
+        hs.mode = "OBJECT"
+        for obj in members:
+            add_item_unique(hs.elements, obj.name, "OBJECT", -1, False)
+
+
+def build_mesh_scenario(scene, kind: str, vert_target: int) -> Scenario:
+    """1オブジェクト・1メッシュのシーン（kind = "grid" / "subdiv"）。"""
+    reset_scene(scene)
+    label = f"{kind}_{size_label(vert_target)}"
+    make = grid_mesh if kind == "grid" else subdivided_mesh
+    me = make(label, vert_target)
+    stamp_pids(me, scene)
+    obj = link_object(scene, label, me)
+
+    add_edit_sets(scene, [obj])
+    add_object_sets(scene, [obj])
+    return Scenario(label, kind, [obj], _element_count(me))
+
+
+def build_objects_scenario(scene, count: int, verts_per_object: int = OBJECT_MESH_VERTS) -> Scenario:
+    """小さなメッシュを count 個（メッシュは別々）並べたシーン。"""
+    reset_scene(scene)
+    label = f"objects_{size_label(count)}"
+    template = grid_mesh(f"{label}_mesh", verts_per_object)
+
+    objects = []
+    for i in range(count):
+        me = template if i == 0 else template.copy()
+        stamp_pids(me, scene)
+        objects.append(link_object(scene, f"{label}_{i:05d}", me))
+
+    add_edit_sets(scene, objects)
+    add_object_sets(scene, objects)
+    return Scenario(label, "objects", objects, sum(_element_count(o.data) for o in objects))
@@ -0,0 +1,68 @@
+"""
+ベンチマークの計測部分（bpy に依存しない）。
+
+run_benchmarks.py（Blender 内）と micro.py（フェイクの bpy / bmesh を使う CPython）の両方で使う。
+"""
+
+import json
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from .compare import RESULTS_VERSION
+
+
+@dataclass
+class Case:
+    name: str
+    func: Callable[[], object]
+    setup: Optional[Callable[[], object]] = None     # 毎回の計測前（計測しない）
+    teardown: Optional[Callable[[], object]] = None  # 毎回の計測後（計測しない）
+    mode: str = "OBJECT"                              # "OBJECT" / "EDIT"
+    warmup: bool = False                              # 最初に1回実行して捨てる（.warm）
+
+
+def run_once(case: Case, settle: Optional[Callable[[], object]] = None) -> float:
+    """
+    1回分の計測。settle は計測後に呼ぶ（Blender のイベントループが行う
+    depsgraph の評価やタイマーの実行に相当する処理。計測しない）。
+    """
+    if case.setup is not None:
+        case.setup()
+    t0 = time.perf_counter()
+    case.func()
+    elapsed = time.perf_counter() - t0
+    if settle is not None:
+        settle()
+    if case.teardown is not None:
+        case.teardown()
+    return elapsed
+
+
+def time_case(case: Case, repeat: int, settle: Optional[Callable[[], object]] = None) -> Dict[str, float]:
+    if case.warmup:
+        run_once(case, settle)
+
+    times: List[float] = [run_once(case, settle) for _ in range(repeat)]
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "max": max(times),
+        "repeat": repeat,
+    }
+
+
+def matches_filter(name: str, filters: List[str]) -> bool:
+    return not filters or any(f in name for f in filters)
+
+
+def parse_filter(text: str) -> List[str]:
+    return [f.strip() for f in text.split(",") if f.strip()]
+
+
+def write_results(filepath: str, meta: dict, results: Dict[str, dict]) -> None:
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump({"version": RESULTS_VERSION, "meta": meta, "results": results}, f,
+                  ensure_ascii=False, indent=1, sort_keys=True)
@@ -14,16 +14,24 @@ import bpy
 
 from .utils.logging import log_exc
 from .core.registry import HM_ElementRef, HM_HideSet
+from .core.handlers import register_handlers, unregister_handlers
 from .ui.operators import (
     HM_ApplyHideSet,     # 非表示を適用
     HM_RegisterHideSet,  # 新しく登録
     HM_ToggleHideSet,
+    HM_BatchHideSets,
     HM_RenameHideSet,
     HM_DeleteHideSet,
     HM_SyncHideSet,
     HM_ExportHideSet,
+    HM_ImportHideSet,
+    HM_ExportAllHideSets,
+    HM_ImportAllHideSets,
+    HM_RepairPids,
+    HM_CleanupDeletedObjects,
+    HM_CompactPids,
 )
-from .ui.panels import HM_PT_EditHideSets, HM_PT_ObjectHideSets
+from .ui.panels import HM_PT_EditHideSets, HM_PT_ObjectHideSets, HM_PT_SetsContainingSelection
 
 
 classes = (
@@ -32,12 +40,20 @@ classes = (
     HM_ApplyHideSet,
     HM_RegisterHideSet,
     HM_ToggleHideSet,
+    HM_BatchHideSets,
     HM_RenameHideSet,
     HM_DeleteHideSet,
     HM_SyncHideSet,
     HM_ExportHideSet,
+    HM_ImportHideSet,
+    HM_ExportAllHideSets,
+    HM_ImportAllHideSets,
+    HM_RepairPids,
+    HM_CleanupDeletedObjects,
+    HM_CompactPids,
     HM_PT_EditHideSets,
     HM_PT_ObjectHideSets,
+    HM_PT_SetsContainingSelection,
 )
 
 
@@ -70,8 +86,18 @@ def register():
     except Exception as e:
         log_exc("register.hm_next_elem_id", e)
 
+    try:
+        register_handlers()
+    except Exception as e:
+        log_exc("register.handlers", e)
+
 
 def unregister():
+    try:
+        unregister_handlers()
+    except Exception as e:
+        log_exc("unregister.handlers", e)
+
     # Sceneプロパティ削除
     try:
         if hasattr(bpy.types.Scene, "hm_edit_sets"):
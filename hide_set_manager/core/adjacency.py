@@ -0,0 +1,231 @@
+"""
+頂点 → 面 / 辺 → 面 の隣接配列（CSR 形式）。
+
+hide_elements_with_rules_on_bmesh_by_pid は頂点・辺メンバーごとに
+link_faces を Python でたどって接続面へ展開していたため、
+大きな頂点セットではここが一番遅かった。
+
+ここではループ配列（polygons.loop_start / loops.vertex_index / loops.edge_index）から
+CSR（offsets + targets）の隣接配列を NumPy で作り、
+「メンバーの接続面」を targets への1回のファンシーインデックスで求める。
+
+隣接配列はメッシュごとにキャッシュし、pid_cache のトポロジー世代と
+要素数で検証する（ジオメトリ更新で世代が進むと作り直す）。
+- 編集モード外 : Mesh のループ配列から foreach_get で作る
+- 編集モード   : Mesh 側が古いので BMesh のループから作る
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .pid_cache import mesh_key, mesh_generation
+
+ADJACENCY_CACHE_MAX_ENTRIES = 16
+
+
+@dataclass
+class MeshTopology:
+    loop_start: np.ndarray  # 面ごとの先頭ループ
+    loop_total: np.ndarray  # 面ごとのループ数
+    loop_vert: np.ndarray   # ループ → 頂点
+    loop_edge: np.ndarray   # ループ → 辺
+    loop_face: np.ndarray   # ループ → 面
+    edge_verts: np.ndarray  # (辺数, 2)
+
+    @property
+    def num_faces(self) -> int:
+        return len(self.loop_start)
+
+
+def read_topology(me) -> MeshTopology:
+    num_e = len(me.edges)
+    num_f = len(me.polygons)
+    num_l = len(me.loops)
+
+    loop_start = np.empty(num_f, dtype=np.int32)
+    loop_total = np.empty(num_f, dtype=np.int32)
+    me.polygons.foreach_get("loop_start", loop_start)
+    me.polygons.foreach_get("loop_total", loop_total)
+
+    loop_vert = np.empty(num_l, dtype=np.int32)
+    loop_edge = np.empty(num_l, dtype=np.int32)
+    me.loops.foreach_get("vertex_index", loop_vert)
+    me.loops.foreach_get("edge_index", loop_edge)
+
+    edge_verts = np.empty(num_e * 2, dtype=np.int32)
+    me.edges.foreach_get("vertices", edge_verts)
+
+    # ループは面ごとに連続して並ぶので、loop_start 順に面番号を繰り返せばよい
+    order = np.argsort(loop_start, kind="stable").astype(np.int32)
+    loop_face = np.repeat(order, loop_total[order])
+
+    return MeshTopology(
+        loop_start=loop_start,
+        loop_total=loop_total,
+        loop_vert=loop_vert,
+        loop_edge=loop_edge,
+        loop_face=loop_face,
+        edge_verts=edge_verts.reshape(-1, 2),
+    )
+
+
+def read_bmesh_topology(bm) -> MeshTopology:
+    """BMesh から MeshTopology を作る（要素インデックスは index_update で振り直す）。"""
+    bm.verts.index_update()
+    bm.edges.index_update()
+    bm.faces.index_update()
+
+    num_f = len(bm.faces)
+    loop_total = np.fromiter((len(f.loops) for f in bm.faces), dtype=np.int32, count=num_f)
+    loop_start = np.zeros(num_f, dtype=np.int32)
+    if num_f:
+        np.cumsum(loop_total[:-1], out=loop_start[1:])
+
+    num_l = int(loop_total.sum())
+    loop_vert = np.fromiter(
+        (l.vert.index for f in bm.faces for l in f.loops), dtype=np.int32, count=num_l
+    )
+    loop_edge = np.fromiter(
+        (l.edge.index for f in bm.faces for l in f.loops), dtype=np.int32, count=num_l
+    )
+    edge_verts = np.fromiter(
+        (v.index for e in bm.edges for v in e.verts), dtype=np.int32, count=len(bm.edges) * 2
+    )
+
+    return MeshTopology(
+        loop_start=loop_start,
+        loop_total=loop_total,
+        loop_vert=loop_vert,
+        loop_edge=loop_edge,
+        loop_face=np.repeat(np.arange(num_f, dtype=np.int32), loop_total),
+        edge_verts=edge_verts.reshape(-1, 2),
+    )
+
+
+class CSRAdjacency:
+    """要素 i の隣接先が targets[offsets[i]:offsets[i + 1]] に並ぶ隣接配列。"""
+
+    __slots__ = ("offsets", "targets")
+
+    def __init__(self, offsets: np.ndarray, targets: np.ndarray):
+        self.offsets = offsets
+        self.targets = targets
+
+    @classmethod
+    def from_pairs(cls, src: np.ndarray, dst: np.ndarray, size: int) -> "CSRAdjacency":
+        order = np.argsort(src, kind="stable")
+        offsets = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=size), out=offsets[1:])
+        return cls(offsets, dst[order].astype(np.int32))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def degree(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def gather(self, idx) -> np.ndarray:
+        """idx の全ての隣接先を連結して返す（重複あり）。"""
+        idx = np.asarray(idx, dtype=np.int64)
+        if len(idx) == 0:
+            return np.empty(0, dtype=np.int32)
+        starts = self.offsets[idx]
+        lengths = self.offsets[idx + 1] - starts
+        # 各出力位置 = 区間の先頭 + 区間内の順番
+        ends = np.cumsum(lengths)
+        shift = np.repeat(starts - (ends - lengths), lengths)
+        return self.targets[shift + np.arange(ends[-1])]
+
+
+class MeshAdjacency:
+    """1メッシュ分のトポロジーと 頂点→面 / 辺→面 の隣接配列。"""
+
+    __slots__ = ("topo", "num_verts", "vert_faces", "edge_faces", "_face_verts")
+
+    def __init__(self, topo: MeshTopology, num_verts: int, num_edges: int):
+        self.topo = topo
+        self.num_verts = num_verts
+        self.vert_faces = CSRAdjacency.from_pairs(topo.loop_vert, topo.loop_face, num_verts)
+        self.edge_faces = CSRAdjacency.from_pairs(topo.loop_edge, topo.loop_face, num_edges)
+        self._face_verts = None
+
+    @property
+    def face_verts(self) -> CSRAdjacency:
+        """面 → 頂点（展開ルールで使うときだけ作る）。"""
+        if self._face_verts is None:
+            topo = self.topo
+            self._face_verts = CSRAdjacency.from_pairs(topo.loop_face, topo.loop_vert, topo.num_faces)
+        return self._face_verts
+
+    @property
+    def num_faces(self) -> int:
+        return self.topo.num_faces
+
+    def face_mask(self, v_idx=(), e_idx=()) -> np.ndarray:
+        """頂点 / 辺インデックスの接続面をマスクで返す。"""
+        mask = np.zeros(self.num_faces, dtype=bool)
+        mask[self.vert_faces.gather(v_idx)] = True
+        mask[self.edge_faces.gather(e_idx)] = True
+        return mask
+
+
+_adjacency_cache: "OrderedDict[Tuple[int, bool], Tuple[Tuple, MeshAdjacency]]" = OrderedDict()
+
+
+def _cached(key, fp, build) -> MeshAdjacency:
+    cached = _adjacency_cache.get(key)
+    if cached is not None and cached[0] == fp:
+        _adjacency_cache.move_to_end(key)
+        return cached[1]
+
+    adj = build()
+    _adjacency_cache[key] = (fp, adj)
+    while len(_adjacency_cache) > ADJACENCY_CACHE_MAX_ENTRIES:
+        _adjacency_cache.popitem(last=False)
+    return adj
+
+
+def get_mesh_adjacency(me) -> MeshAdjacency:
+    """編集モード外メッシュの隣接配列（キャッシュ付き）。"""
+    num_v, num_e = len(me.vertices), len(me.edges)
+    fp = (num_v, num_e, len(me.polygons), len(me.loops), mesh_generation(me))
+    return _cached(
+        (mesh_key(me), False), fp, lambda: MeshAdjacency(read_topology(me), num_v, num_e)
+    )
+
+
+def get_bmesh_adjacency(bm, me, is_edit: bool) -> MeshAdjacency:
+    """
+    BMesh の隣接配列（キャッシュ付き）。
+    キャッシュが使えた場合も要素インデックスは振り直す（BMesh の index は編集で崩れるため）。
+    """
+    num_v, num_e = len(bm.verts), len(bm.edges)
+    fp = (bool(is_edit), num_v, num_e, len(bm.faces), mesh_generation(me))
+    key = (mesh_key(me), True)
+
+    cached = _adjacency_cache.get(key)
+    if cached is not None and cached[0] == fp:
+        bm.verts.index_update()
+        bm.edges.index_update()
+        bm.faces.index_update()
+
+    return _cached(key, fp, lambda: MeshAdjacency(read_bmesh_topology(bm), num_v, num_e))
+
+
+def peek_bmesh_adjacency(bm, me, is_edit: bool) -> Optional[MeshAdjacency]:
+    """
+    キャッシュ済みで有効な BMesh の隣接配列だけを返す（作り直さない）。無ければ None。
+    read_bmesh_topology は全ループを Python で走査するので、小さなセットではこちらで済ませる。
+    """
+    fp = (bool(is_edit), len(bm.verts), len(bm.edges), len(bm.faces), mesh_generation(me))
+    cached = _adjacency_cache.get((mesh_key(me), True))
+    if cached is None or cached[0] != fp:
+        return None
+    return get_bmesh_adjacency(bm, me, is_edit)
+
+
+def clear_adjacency_cache() -> None:
+    _adjacency_cache.clear()
@@ -0,0 +1,227 @@
+"""
+編集モード外メッシュ用の一括 非表示/表示 適用エンジン。
+
+hide_elements_with_rules_on_bmesh_by_pid は要素ごと・接続面ごとに
+safe_set_hidden を呼ぶため、大きなセットでは非常に遅い。
+
+ここでは
+1. メンバーを NumPy のブールマスクにする
+2. 接続面への展開を CSR 隣接配列（core/adjacency.py、キャッシュ付き）から
+   ベクトル演算で求める
+3. 頂点/辺/面それぞれ foreach_set 1回で書き戻す
+という流れで処理する。
+
+BMesh の hide_set と同じ規則に合わせている。
+- 非表示 : 頂点 → 接続辺・接続面 / 辺 → 接続面 も非表示。
+           その後、全ての接続面が隠れた辺、全ての接続辺が隠れた頂点も非表示。
+- 表示   : 頂点 → 接続辺・接続面 / 辺 → 接続面 / 面 → 構成辺・構成頂点 も表示。
+"""
+
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from .mesh_arrays import (
+    domain_size,
+    member_arrays,
+    read_hidden,
+    resolve_members,
+)
+from .adjacency import MeshAdjacency, get_mesh_adjacency
+from .expansion import ExpansionRule, expand_face_mask
+from .pid_cache import mark_hide_only_write, on_mesh_update
+from .bmesh_ops import release_session_mesh
+
+
+def compute_hide_masks(
+    adj: MeshAdjacency,
+    hide_v: np.ndarray,
+    hide_e: np.ndarray,
+    hide_f: np.ndarray,
+    v_sel: np.ndarray,
+    e_sel: np.ndarray,
+    f_sel: np.ndarray,
+    hide_flag: bool,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    現在の非表示配列とメンバーマスクから、適用後の非表示配列を返す（入力は変更しない）。
+    """
+    topo = adj.topo
+    hide_v = hide_v.copy()
+    hide_e = hide_e.copy()
+    hide_f = hide_f.copy()
+
+    # 接続面への展開（メンバーの隣接面を CSR から一度に引く）
+    f_mask = f_sel | adj.face_mask(np.flatnonzero(v_sel), np.flatnonzero(e_sel))
+
+    # 頂点メンバーの接続辺
+    ev = topo.edge_verts
+    e_from_v = v_sel[ev[:, 0]] | v_sel[ev[:, 1]]
+
+    if hide_flag:
+        prev_e = hide_e.copy()
+        hide_v |= v_sel
+        hide_e |= e_sel | e_from_v
+        hide_f |= f_mask
+
+        # 面を隠した結果、全ての接続面が隠れた辺を隠す
+        touched_e = np.zeros(len(hide_e), dtype=bool)
+        touched_e[topo.loop_edge[f_mask[topo.loop_face]]] = True
+        face_count = adj.edge_faces.degree()
+        hidden_count = np.bincount(
+            topo.loop_edge,
+            weights=hide_f[topo.loop_face].astype(np.float64),
+            minlength=len(hide_e),
+        )
+        hide_e |= touched_e & (face_count > 0) & (hidden_count >= face_count)
+
+        # 新しく隠れた辺の頂点のうち、全ての接続辺が隠れたものを隠す
+        if len(ev):
+            flat = ev.ravel()
+            edge_count = np.bincount(flat, minlength=len(hide_v))
+            hidden_edges = np.bincount(
+                flat,
+                weights=np.repeat(hide_e, 2).astype(np.float64),
+                minlength=len(hide_v),
+            )
+            touched_v = np.zeros(len(hide_v), dtype=bool)
+            touched_v[ev[hide_e & ~prev_e].ravel()] = True
+            hide_v |= touched_v & (edge_count > 0) & (hidden_edges >= edge_count)
+    else:
+        # 面を表示したら構成辺・構成頂点も表示
+        in_shown_face = f_mask[topo.loop_face]
+        e_mask = e_sel | e_from_v
+        e_mask[topo.loop_edge[in_shown_face]] = True
+
+        v_mask = v_sel.copy()
+        v_mask[topo.loop_vert[in_shown_face]] = True
+        v_mask[ev[e_mask].ravel()] = True
+
+        hide_v[v_mask] = False
+        hide_e[e_mask] = False
+        hide_f[f_mask] = False
+
+    return hide_v, hide_e, hide_f
+
+
+def _masks_from_arrays(
+    me, arrays, saved_filter: Optional[bool] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    member_arrays() の結果を頂点/辺/面のブールマスクにする（見つからないPIDは無視）。
+    saved_filter を指定すると saved_hidden がその値のメンバーだけを対象にする。
+    """
+    masks = {
+        etype: np.zeros(domain_size(me, etype), dtype=bool)
+        for etype in ("VERT", "EDGE", "FACE")
+    }
+    for etype, (pids, saved) in arrays.items():
+        if etype not in masks:
+            continue
+        if saved_filter is not None:
+            pids = pids[saved == saved_filter]
+        idx = resolve_members(me, etype, pids)
+        masks[etype][idx[idx >= 0]] = True
+    return masks["VERT"], masks["EDGE"], masks["FACE"]
+
+
+def member_masks(me, items: Iterable) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """セットのメンバーを頂点/辺/面のブールマスクにする（見つからないPIDは無視）。"""
+    return _masks_from_arrays(me, member_arrays(items))
+
+
+def write_hidden(me, hide_v: np.ndarray, hide_e: np.ndarray, hide_f: np.ndarray) -> None:
+    """非表示配列を foreach_set で一括書き込み。"""
+    mark_hide_only_write(me)
+    me.vertices.foreach_set("hide", hide_v)
+    me.edges.foreach_set("hide", hide_e)
+    me.polygons.foreach_set("hide", hide_f)
+    me.update()
+    # 指紋のメモは状態世代で検証するので、更新通知を待たずに進める
+    on_mesh_update(me)
+
+
+def _read_all_hidden(me):
+    return read_hidden(me, "VERT"), read_hidden(me, "EDGE"), read_hidden(me, "FACE")
+
+
+def _write_if_changed(me, before, after) -> bool:
+    if all(np.array_equal(a, b) for a, b in zip(before, after)):
+        return False
+    write_hidden(me, *after)
+    return True
+
+
+class ArrayHideState:
+    """
+    1メッシュ分の非表示配列をメモリ上に保持し、複数の操作を順に重ねてから
+    commit() で1回だけ書き戻す（バッチ適用用）。
+    """
+
+    _DOMAINS = ("VERT", "EDGE", "FACE")
+
+    def __init__(self, me):
+        # セッションが同じメッシュの BMesh を持っていると古くなるので先に閉じる
+        release_session_mesh(me)
+        self.me = me
+        self.adj = get_mesh_adjacency(me)
+        self.before = _read_all_hidden(me)
+        self.current = self.before
+
+    def _apply_masks(self, masks, hide_flag: bool, rule: Optional[ExpansionRule]) -> None:
+        v_sel, e_sel, f_sel = masks
+        f_sel = expand_face_mask(self.adj, v_sel, e_sel, f_sel, rule)
+        self.current = compute_hide_masks(self.adj, *self.current, v_sel, e_sel, f_sel, hide_flag)
+
+    def apply(self, items: Iterable, hide_flag: bool, rule: Optional[ExpansionRule] = None) -> None:
+        self._apply_masks(member_masks(self.me, items), hide_flag, rule)
+
+    def restore_saved(self, items: Iterable, rule: Optional[ExpansionRule] = None) -> None:
+        """
+        各メンバーを saved_hidden の状態へ戻す。
+        表示に戻すメンバーを先に処理し、その後で非表示のまま残すメンバーを隠す。
+        """
+        arrays = member_arrays(items)
+        for hide_flag in (False, True):
+            masks = _masks_from_arrays(self.me, arrays, hide_flag)
+            if any(m.any() for m in masks):
+                self._apply_masks(masks, hide_flag, rule)
+
+    def any_visible(self, items: Iterable) -> bool:
+        """現在の（未書き込みを含む）状態で、表示中のメンバーがあれば True。"""
+        for etype, (pids, _saved) in member_arrays(items).items():
+            if etype not in self._DOMAINS:
+                continue
+            idx = resolve_members(self.me, etype, pids)
+            idx = idx[idx >= 0]
+            hidden = self.current[self._DOMAINS.index(etype)]
+            if len(idx) and not hidden[idx].all():
+                return True
+        return False
+
+    def commit(self) -> bool:
+        changed = _write_if_changed(self.me, self.before, self.current)
+        self.before = self.current
+        return changed
+
+
+def apply_hide_arrays(
+    me, items: Iterable, hide_flag: bool, rule: Optional[ExpansionRule] = None
+) -> bool:
+    """
+    hide_elements_with_rules_on_bmesh_by_pid の配列版。
+    変更があれば書き戻して True を返す。失敗時は例外をそのまま投げる
+    （呼び出し側で BMesh 版へフォールバックする）。
+    """
+    state = ArrayHideState(me)
+    state.apply(items, hide_flag, rule)
+    return state.commit()
+
+
+def restore_saved_hidden_arrays(
+    me, items: Iterable, rule: Optional[ExpansionRule] = None
+) -> bool:
+    """各メンバーを saved_hidden の状態へ戻す（トグルで表示に戻すとき）。"""
+    state = ArrayHideState(me)
+    state.restore_saved(items, rule)
+    return state.commit()
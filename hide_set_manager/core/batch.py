@@ -0,0 +1,216 @@
+"""
+複数の非表示セットをまとめて 表示 / 非表示 / トグル するバッチ処理。
+
+セットごとに HM_ApplyHideSet / HM_ToggleHideSet を呼ぶと、
+同じメッシュを何度も読み書きし、アンドゥ履歴もセットの数だけ積まれる。
+
+ここでは全ての操作を先にオブジェクト（メッシュ）ごとの計画にまとめる。
+- 編集モード外のメッシュ : ArrayHideState に全操作を順に重ね、最後に1回だけ書き戻す
+- 編集モードのメッシュ   : 1つの bmesh_session の中で同じ BMesh に順に適用する
+- オブジェクトセット     : オブジェクト → 非表示フラグ の辞書に順に反映し、最後に1回だけ設定する
+同じ要素 / オブジェクトに複数の操作が当たった場合は、後の操作が優先される。
+トグルの判定も「それまでの操作を反映した状態」に対して行う。
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+import bpy
+
+from .registry import HM_HideSet, split_items_by_object, object_members, ensure_objects_in_edit_mode
+from .bmesh_ops import bmesh_session, hide_members_on_bmesh
+from .pid_cache import mesh_key
+from .mesh_arrays import can_use_arrays
+from .array_apply import ArrayHideState
+from .toggle import resolve_elements, restore_saved_on_bmesh
+from .expansion import rule_from_hide_set
+from ..utils.safe_hidden import safe_get_hidden, safe_set_hidden
+from ..utils.logging import log_exc
+
+BATCH_ACTIONS = ("HIDE", "SHOW", "TOGGLE")
+
+
+@dataclass
+class BatchAction:
+    list_type: str  # "EDIT" / "OBJECT"
+    index: int
+    action: str     # "HIDE" / "SHOW" / "TOGGLE"
+
+
+@dataclass
+class BatchResult:
+    applied: int = 0   # 処理したセット数
+    skipped: int = 0   # 無効なインデックス・空のセット
+    meshes: int = 0    # 書き込んだメッシュ数
+    objects: int = 0   # 表示状態を変えたオブジェクト数
+
+
+class _BMeshPlan:
+    """編集モードのメッシュ用。セッションの BMesh に順に適用する。"""
+
+    def __init__(self, session, obj, edit_objs):
+        self.session = session
+        self.obj = obj
+        self.edit_objs = edit_objs
+
+    def any_visible(self, items) -> bool:
+        bm = self.session.bmesh(self.obj, self.edit_objs)
+        elems = resolve_elements(bm, self.obj, items, self.edit_objs)
+        return any(not elem.hide for elem, _ in elems)
+
+    def apply(self, items, hide_flag: bool, rule=None) -> None:
+        obj, edit_objs = self.obj, self.edit_objs
+
+        def _apply(bm):
+            return hide_members_on_bmesh(bm, obj, edit_objs, items, hide_flag, rule)
+
+        self.session.process(obj, edit_objs, _apply)
+
+    def restore_saved(self, items, rule=None) -> None:
+        obj, edit_objs = self.obj, self.edit_objs
+
+        def _restore(bm):
+            return restore_saved_on_bmesh(bm, obj, edit_objs, items, rule=rule)
+
+        self.session.process(obj, edit_objs, _restore)
+
+    def commit(self) -> bool:
+        # 書き戻しはセッション終了時にまとめて行われる
+        return False
+
+
+def _get_hide_set(scene, action: BatchAction) -> Optional[HM_HideSet]:
+    hide_sets = scene.hm_object_sets if action.list_type == "OBJECT" else scene.hm_edit_sets
+    if not (0 <= action.index < len(hide_sets)):
+        return None
+    return hide_sets[action.index]
+
+
+def _plan_object_set(hide_set: HM_HideSet, action: str, planned: Dict[str, bool], objects) -> bool:
+    members = [
+        (obj, bool(group.saved[0]))
+        for obj, group in object_members(hide_set, update=True)
+        if obj is not None
+    ]
+    if not members:
+        return False
+
+    def _hidden(obj) -> bool:
+        if obj.name in planned:
+            return planned[obj.name]
+        return bool(safe_get_hidden(obj))
+
+    if action == "TOGGLE":
+        hide_flag = any(not _hidden(obj) for obj, _ in members)
+        for obj, saved in members:
+            objects[obj.name] = obj
+            planned[obj.name] = True if hide_flag else saved
+    else:
+        hide_flag = action == "HIDE"
+        for obj, _ in members:
+            objects[obj.name] = obj
+            planned[obj.name] = hide_flag
+    return True
+
+
+def _plan_edit_set(hide_set: HM_HideSet, action: str, get_plan) -> bool:
+    targets = []
+    for obj_name, items in split_items_by_object(hide_set).items():
+        plan = get_plan(bpy.data.objects.get(obj_name))
+        if plan is not None:
+            targets.append((plan, items))
+    if not targets:
+        return False
+
+    rule = rule_from_hide_set(hide_set)
+    if action == "TOGGLE":
+        hide_flag = False
+        for plan, items in targets:
+            try:
+                if plan.any_visible(items):
+                    hide_flag = True
+                    break
+            except Exception as e:
+                log_exc("batch._plan_edit_set.any_visible", e)
+        for plan, items in targets:
+            if hide_flag:
+                plan.apply(items, True, rule)
+            else:
+                plan.restore_saved(items, rule)
+    else:
+        hide_flag = action == "HIDE"
+        for plan, items in targets:
+            plan.apply(items, hide_flag, rule)
+    return True
+
+
+def run_hide_set_batch(context, actions: Iterable[BatchAction]) -> BatchResult:
+    """
+    複数セットへの操作を順にまとめて適用する。
+    メッシュ・オブジェクトへの書き込みはそれぞれ最後に1回だけ行う。
+    """
+    result = BatchResult()
+    scene = context.scene
+    edit_objs = set(ensure_objects_in_edit_mode(context))
+
+    planned_hidden: Dict[str, bool] = {}
+    planned_objects: Dict[str, bpy.types.Object] = {}
+
+    with bmesh_session() as session:
+        mesh_plans: Dict[int, object] = {}
+
+        def _get_plan(obj):
+            if obj is None or obj.type != "MESH":
+                return None
+            key = mesh_key(obj.data)
+            plan = mesh_plans.get(key)
+            if plan is not None:
+                return plan
+            if can_use_arrays(obj, edit_objs):
+                try:
+                    plan = ArrayHideState(obj.data)
+                except Exception as e:
+                    log_exc("batch.ArrayHideState", e)
+            if plan is None:
+                plan = _BMeshPlan(session, obj, edit_objs)
+            mesh_plans[key] = plan
+            return plan
+
+        for action in actions:
+            hide_set = _get_hide_set(scene, action)
+            if hide_set is None or action.action not in BATCH_ACTIONS:
+                result.skipped += 1
+                continue
+
+            try:
+                if hide_set.mode == "OBJECT":
+                    done = _plan_object_set(hide_set, action.action, planned_hidden, planned_objects)
+                else:
+                    done = _plan_edit_set(hide_set, action.action, _get_plan)
+            except Exception as e:
+                log_exc(f"batch.plan.{hide_set.name}", e)
+                done = False
+
+            if done:
+                result.applied += 1
+            else:
+                result.skipped += 1
+
+        # --- 書き込み（メッシュごと・オブジェクトごとに1回） ---
+        for plan in mesh_plans.values():
+            try:
+                if plan.commit():
+                    result.meshes += 1
+            except Exception as e:
+                log_exc("batch.commit", e)
+
+        for name, hidden in planned_hidden.items():
+            obj = planned_objects[name]
+            try:
+                if bool(safe_get_hidden(obj)) != hidden:
+                    safe_set_hidden(obj, hidden)
+                    result.objects += 1
+            except Exception as e:
+                log_exc("batch.set_object_hidden", e)
+
+    return result
@@ -1,10 +1,19 @@
-from typing import Any, Dict, List
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
 
 import bmesh
 import bpy
+import numpy as np
 
 from ..utils.safe_hidden import safe_set_hidden
 from ..utils.logging import log_exc
+from .pid_cache import get_pid_maps, mark_hide_only_write, mesh_key, on_mesh_update
+from .adjacency import MeshAdjacency, get_bmesh_adjacency, peek_bmesh_adjacency
+from .expansion import ExpansionRule, expanded_faces
+
+# 展開ルールが無いとき、これ未満のメンバー数なら隣接配列を作らず link_faces をたどる
+# （BMesh の隣接配列は全ループの Python 走査で作るので、小さなセットでは割に合わない）
+BMESH_ADJACENCY_MIN_MEMBERS = 4096
 
 
 def hide_elements_with_rules_on_bmesh_by_pid(
@@ -14,10 +23,16 @@ def hide_elements_with_rules_on_bmesh_by_pid(
     v_map: Dict[int, Any],
     e_map: Dict[int, Any],
     f_map: Dict[int, Any],
-) -> None:
+    adjacency: Optional[MeshAdjacency] = None,
+    rule: Optional[ExpansionRule] = None,
+) -> bool:
     """
     PIDから実際の要素を引いて、非表示/表示を適用する。
     辺や頂点の場合は接続面も一緒に処理する。
+    adjacency（get_bmesh_adjacency）を渡すと、接続面を link_faces ではなく
+    CSR 隣接配列から一度に求め、同じ面を何度も設定しない。
+    rule（展開ルール）は adjacency がある場合だけ使う。
+    状態が変わった要素があれば True を返す。
     """
     verts: List[Any] = []
     edges: List[Any] = []
@@ -42,30 +57,227 @@ def hide_elements_with_rules_on_bmesh_by_pid(
             if f is not None:
                 faces.append(f)
 
+    changed = False
+
+    def _set(elem):
+        nonlocal changed
+        if elem.hide != hide_flag:
+            changed = True
+        safe_set_hidden(elem, hide_flag)
+
+    if adjacency is not None:
+        # 面（メンバー＋頂点/辺メンバーの接続面）を重複なしで1回ずつ
+        v_idx = [v.index for v in verts]
+        e_idx = [e.index for e in edges]
+        f_idx = [f.index for f in faces]
+        f_mask = adjacency.face_mask(v_idx, e_idx)
+        f_mask[f_idx] = True
+        if rule is not None:
+            f_mask[expanded_faces(adjacency, v_idx, e_idx, f_idx, rule)] = True
+        bm.faces.ensure_lookup_table()
+        seq = bm.faces
+        for i in np.flatnonzero(f_mask):
+            _set(seq[int(i)])
+        for e in edges:
+            _set(e)
+        for v in verts:
+            _set(v)
+        return changed
+
     # 面
     for f in faces:
-        safe_set_hidden(f, hide_flag)
+        _set(f)
 
     # 辺＋接続面
     for e in edges:
-        safe_set_hidden(e, hide_flag)
+        _set(e)
         for lf in getattr(e, "link_faces", []):
-            safe_set_hidden(lf, hide_flag)
+            _set(lf)
 
     # 頂点＋接続面
     for v in verts:
-        safe_set_hidden(v, hide_flag)
+        _set(v)
         for lf in getattr(v, "link_faces", []):
-            safe_set_hidden(lf, hide_flag)
+            _set(lf)
+
+    return changed
+
+
+def hide_members_on_bmesh(
+    bm: bmesh.types.BMesh,
+    obj,
+    edit_objs,
+    items,
+    hide_flag: bool,
+    rule: Optional[ExpansionRule] = None,
+) -> bool:
+    """
+    PIDマップと隣接配列（どちらもキャッシュ）を引いて hide_elements_with_rules_on_bmesh_by_pid を呼ぶ。
+    隣接配列を作り直すのは、展開ルールがあるか、メンバーが BMESH_ADJACENCY_MIN_MEMBERS 以上のときだけ
+    （それ以外はキャッシュが有効なら使い、無ければ link_faces をたどる）。
+    """
+    is_edit = obj in edit_objs
+    v_map, e_map, f_map, *_ = get_pid_maps(bm, obj.data, is_edit)
+    try:
+        if rule is not None or len(items) >= BMESH_ADJACENCY_MIN_MEMBERS:
+            adjacency = get_bmesh_adjacency(bm, obj.data, is_edit)
+        else:
+            adjacency = peek_bmesh_adjacency(bm, obj.data, is_edit)
+    except Exception as e:
+        log_exc("hide_members_on_bmesh.adjacency", e)
+        adjacency = None
+    return hide_elements_with_rules_on_bmesh_by_pid(
+        bm, items, hide_flag, v_map, e_map, f_map, adjacency, rule
+    )
 
 
-def process_bmesh(obj: bpy.types.Object, edit_objs, callback):
+def _write_back(bm: bmesh.types.BMesh, me, is_edit: bool) -> None:
+    mark_hide_only_write(me)
+    if is_edit:
+        bmesh.update_edit_mesh(me)
+    else:
+        bm.to_mesh(me)
+        me.update()
+    # 指紋のメモは状態世代で検証するので、更新通知を待たずに進める
+    on_mesh_update(me)
+
+
+class _SessionEntry:
+    __slots__ = ("bm", "me", "is_edit", "dirty")
+
+    def __init__(self, bm, me, is_edit: bool):
+        self.bm = bm
+        self.me = me
+        self.is_edit = is_edit
+        self.dirty = False
+
+
+class BMeshSession:
+    """
+    オペレーター（またはバッチ）1回分の BMesh セッション。
+
+    メッシュごとに BMesh を1度だけ開き、同じ BMesh を全ての処理で共有する。
+    書き込みがあったメッシュだけを最後にまとめて書き戻す
+    （読み取りだけのメッシュは書き戻さない）。
+    """
+
+    def __init__(self):
+        self._entries: Dict[int, _SessionEntry] = {}
+
+    def open(self, obj: bpy.types.Object, edit_objs) -> _SessionEntry:
+        me = obj.data
+        key = mesh_key(me)
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        is_edit = obj in edit_objs
+        if is_edit:
+            bm = bmesh.from_edit_mesh(me)
+        else:
+            bm = bmesh.new()
+            bm.from_mesh(me)
+
+        entry = _SessionEntry(bm, me, is_edit)
+        self._entries[key] = entry
+        return entry
+
+    def bmesh(self, obj: bpy.types.Object, edit_objs) -> bmesh.types.BMesh:
+        return self.open(obj, edit_objs).bm
+
+    def process(self, obj: bpy.types.Object, edit_objs, callback, readonly: bool = False):
+        entry = self.open(obj, edit_objs)
+        try:
+            changed = callback(entry.bm)
+        except Exception as e:
+            log_exc("BMeshSession.callback", e)
+            return
+        # コールバックが明示的に False を返したら「変更なし」とみなす
+        if not readonly and changed is not False:
+            entry.dirty = True
+
+    def has_pending_write(self, me) -> bool:
+        entry = self._entries.get(mesh_key(me))
+        return entry is not None and entry.dirty
+
+    def release(self, me) -> None:
+        """メッシュを閉じる（未書き込みなら書き戻す）。配列側で直接書き換える前に使う。"""
+        entry = self._entries.pop(mesh_key(me), None)
+        if entry is not None:
+            self._close_entry(entry)
+
+    def _close_entry(self, entry: _SessionEntry) -> None:
+        try:
+            if entry.dirty:
+                _write_back(entry.bm, entry.me, entry.is_edit)
+        except Exception as e:
+            log_exc("BMeshSession.write_back", e)
+        finally:
+            if not entry.is_edit:
+                try:
+                    entry.bm.free()
+                except Exception as e:
+                    log_exc("BMeshSession.free", e)
+
+    def close(self) -> None:
+        entries = list(self._entries.values())
+        self._entries.clear()
+        for entry in entries:
+            self._close_entry(entry)
+
+
+_active_session: Optional[BMeshSession] = None
+
+
+@contextmanager
+def bmesh_session():
+    """
+    with bmesh_session(): の間、process_bmesh は同じ BMesh を使い回す。
+    入れ子にした場合は外側のセッションをそのまま使う。
+    """
+    global _active_session
+    if _active_session is not None:
+        yield _active_session
+        return
+
+    session = BMeshSession()
+    _active_session = session
+    try:
+        yield session
+    finally:
+        _active_session = None
+        session.close()
+
+
+def get_active_session() -> Optional[BMeshSession]:
+    return _active_session
+
+
+def has_pending_write(me) -> bool:
+    """アクティブなセッションがこのメッシュを未書き込みのまま保持していれば True。"""
+    return _active_session is not None and _active_session.has_pending_write(me)
+
+
+def release_session_mesh(me) -> None:
+    """アクティブなセッションからメッシュを外す（セッションが無ければ何もしない）。"""
+    if _active_session is not None:
+        _active_session.release(me)
+
+
+def process_bmesh(obj: bpy.types.Object, edit_objs, callback, readonly: bool = False):
     """
     bmesh を使った処理をまとめて行う。
     - 編集モード中のオブジェクトなら from_edit_mesh
     - それ以外は new() → from_mesh
     callback(bm) の中で実際の処理を行う。
+    readonly=True の場合はメッシュへ書き戻さない（状態チェック用）。
+    callback が False を返した場合も書き戻さない。
+    bmesh_session() の中ではセッションの BMesh を使い、書き戻しは終了時にまとめて行う。
     """
+    if _active_session is not None:
+        _active_session.process(obj, edit_objs, callback, readonly)
+        return
+
     me = obj.data
     is_edit = obj in edit_objs
 
@@ -76,12 +288,9 @@ def process_bmesh(obj: bpy.types.Object, edit_objs, callback):
         bm.from_mesh(me)
 
     try:
-        callback(bm)
-        if is_edit:
-            bmesh.update_edit_mesh(me)
-        else:
-            bm.to_mesh(me)
-            me.update()
+        changed = callback(bm)
+        if not readonly and changed is not False:
+            _write_back(bm, me, is_edit)
     except Exception as e:
         log_exc("process_bmesh.callback", e)
     finally:
@@ -13,34 +13,86 @@
 
 ※要素の「追加」は、まずは安全のため行わず、
   既存メンバーの状態同期＋消えた要素のクリーンアップに限定しています。
+
+編集モードセットの差分は compute_hide_set_diff() がオブジェクトごとに
+NumPy 配列（更新 / 欠落したメンバーの位置、任意で新しく選択されたPID）として求める。
+Sync と Preview はどちらもこの結果を使う。
+前回の同期から指紋（fingerprint）が変わっていないオブジェクトは解決自体を飛ばす。
 """
 
-from dataclasses import dataclass
-from typing import Dict, List, Set
+from dataclasses import dataclass, field
+from typing import List
 import bpy
 import bmesh
+import numpy as np
 
 from .registry import (
     HM_HideSet,
-    HM_ElementRef,
     split_items_by_object,
+    object_members,
     ensure_objects_in_edit_mode,
+    invalidate_member_index,
+)
+from .packed_store import commit_groups
+from .pid_cache import get_pid_maps
+from .bmesh_ops import process_bmesh
+from .fingerprint import (
+    is_unchanged,
+    object_fingerprint,
+    remember_clean,
+    store_fingerprints,
+)
+from .mesh_arrays import (
+    ATTR_NAMES,
+    can_use_arrays,
+    domain_size,
+    member_arrays,
+    read_hidden,
+    read_int_attribute,
+    read_selected,
+    resolve_members,
 )
-from .pid import build_pid_maps
 from ..utils.safe_hidden import safe_get_hidden
 from ..utils.logging import log_exc
 
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+@dataclass
+class ObjectDiff:
+    """
+    1オブジェクト分の差分。
+    updated / missing はメンバー配列（member_arrays の並び）上の位置。
+    """
+
+    object_name: str
+    element_type: str
+    updated: np.ndarray = field(default_factory=lambda: _EMPTY)
+    # updated の各メンバーの現在の非表示状態
+    current_hidden: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=bool))
+    missing: np.ndarray = field(default_factory=lambda: _EMPTY)
+    # メンバーではないが選択されている要素のPID（include_selected=True のときだけ）
+    selected_new: np.ndarray = field(default_factory=lambda: _EMPTY)
+
 
 @dataclass
 class HideSetDiffResult:
     added: int = 0
     removed: int = 0
     updated: int = 0
+    # 編集モードセットのオブジェクトごとの詳細
+    objects: List[ObjectDiff] = field(default_factory=list)
 
     @property
     def has_changes(self) -> bool:
         return (self.added + self.removed + self.updated) > 0
 
+    def add_object(self, diff: ObjectDiff) -> None:
+        self.objects.append(diff)
+        self.removed += len(diff.missing)
+        self.updated += len(diff.updated)
+        self.added += len(diff.selected_new)
+
 
 def sync_hide_set_saved_hidden(context, hide_set: HM_HideSet) -> HideSetDiffResult:
     if hide_set.mode == "OBJECT":
@@ -54,15 +106,14 @@ def sync_hide_set_saved_hidden(context, hide_set: HM_HideSet) -> HideSetDiffResu
 # ----------------------------------------------------------------------
 def _sync_object_mode(context, hide_set: HM_HideSet) -> HideSetDiffResult:
     result = HideSetDiffResult()
-    scene = context.scene
-
     to_remove: List[int] = []
+    groups = []
 
-    for idx, ref in list(enumerate(hide_set.elements)):
-        obj = scene.objects.get(ref.object_name)
+    # uid で引くので、名前を変えたオブジェクトも削除扱いにしない（名前は更新する）
+    for obj, group in object_members(hide_set, update=True):
         if obj is None:
-            to_remove.append(idx)
-            result.removed += 1
+            to_remove.extend(group.rows.tolist())
+            result.removed += len(group)
             continue
 
         try:
@@ -71,63 +122,193 @@ def _sync_object_mode(context, hide_set: HM_HideSet) -> HideSetDiffResult:
             log_exc("_sync_object_mode.safe_get_hidden", e)
             continue
 
-        if current_hidden != bool(ref.saved_hidden):
-            ref.saved_hidden = current_hidden
-            result.updated += 1
+        changed = group.saved != current_hidden
+        if changed.any():
+            group.saved[:] = current_hidden
+            group.dirty = True
+            result.updated += int(np.count_nonzero(changed))
+        groups.append(group)
+
+    # saved_hidden は行を消す前に（行番号が有効なうちに）まとめて書き戻す
+    commit_groups(hide_set, groups)
 
     for idx in sorted(to_remove, reverse=True):
         try:
             hide_set.elements.remove(idx)
         except Exception as e:
             log_exc("_sync_object_mode.remove", e)
+    if to_remove:
+        invalidate_member_index(hide_set.elements)
 
     return result
 
 
 # ----------------------------------------------------------------------
-# EDIT（頂点 / 辺 / 面）用
+# EDIT（頂点 / 辺 / 面）用：差分エンジン
 # ----------------------------------------------------------------------
-def _sync_edit_mode(context, hide_set: HM_HideSet) -> HideSetDiffResult:
+def _state_from_arrays(obj, etype: str, pids: np.ndarray, include_selected: bool):
+    """配列パス：PID を searchsorted で解決し、(見つかったか, 現在の非表示, 新規選択PID) を返す。"""
+    me = obj.data
+    idx = resolve_members(me, etype, pids)
+    found = idx >= 0
+    hidden = np.zeros(len(pids), dtype=bool)
+    if found.any():
+        hidden[found] = read_hidden(me, etype)[idx[found]]
+
+    selected_new = _EMPTY
+    if include_selected:
+        all_pids = read_int_attribute(me, ATTR_NAMES[etype][0], domain_size(me, etype))
+        if all_pids is not None:
+            sel = all_pids[read_selected(me, etype) & (all_pids > 0)].astype(np.int64)
+            selected_new = np.setdiff1d(sel, pids)
+    return found, hidden, selected_new
+
+
+def _state_from_bmesh(obj, etype: str, pids: np.ndarray, edit_objs, include_selected: bool):
+    """BMesh パス（編集モード中など）：PIDマップで引いた結果を配列にまとめる。"""
+    found = np.zeros(len(pids), dtype=bool)
+    hidden = np.zeros(len(pids), dtype=bool)
+    selected_new = _EMPTY
+
+    def _read(bm: bmesh.types.BMesh):
+        nonlocal selected_new
+        v_map, e_map, f_map, v_layer, e_layer, f_layer = get_pid_maps(
+            bm, obj.data, obj in edit_objs
+        )
+        lookup, layer, seq = {
+            "VERT": (v_map, v_layer, bm.verts),
+            "EDGE": (e_map, e_layer, bm.edges),
+            "FACE": (f_map, f_layer, bm.faces),
+        }[etype]
+
+        for i, pid in enumerate(pids.tolist()):
+            elem = lookup.get(pid)
+            if elem is not None:
+                found[i] = True
+                hidden[i] = elem.hide
+
+        if include_selected and layer is not None:
+            sel = np.fromiter((elem[layer] for elem in seq if elem.select), dtype=np.int64)
+            selected_new = np.setdiff1d(sel[sel > 0], pids)
+
+    process_bmesh(obj, edit_objs, _read, readonly=True)
+    return found, hidden, selected_new
+
+
+def diff_object_members(
+    obj,
+    etype: str,
+    pids: np.ndarray,
+    saved: np.ndarray,
+    edit_objs,
+    include_selected: bool = False,
+) -> ObjectDiff:
+    """1オブジェクト分のメンバー（PID配列 + saved_hidden配列）を現在の状態と比べる。"""
+    state = None
+    if can_use_arrays(obj, edit_objs):
+        try:
+            state = _state_from_arrays(obj, etype, pids, include_selected)
+        except Exception as e:
+            log_exc("diff_object_members.arrays", e)
+    if state is None:
+        state = _state_from_bmesh(obj, etype, pids, edit_objs, include_selected)
+
+    found, hidden, selected_new = state
+    updated = np.flatnonzero(found & (hidden != saved))
+    return ObjectDiff(
+        obj.name,
+        etype,
+        updated=updated,
+        current_hidden=hidden[updated],
+        missing=np.flatnonzero(~found),
+        selected_new=selected_new,
+    )
+
+
+def _iter_object_members(hide_set: HM_HideSet):
+    """(オブジェクト名, items, 要素タイプ, PID配列, saved配列) を返す。"""
+    for obj_name, items in split_items_by_object(hide_set).items():
+        for etype, (pids, saved) in member_arrays(items).items():
+            yield obj_name, items, etype, pids, saved
+
+
+def compute_hide_set_diff(
+    context, hide_set: HM_HideSet, include_selected: bool = False
+) -> HideSetDiffResult:
+    """
+    編集モードセットの差分を全オブジェクトについて求める（データは変更しない）。
+    オブジェクトが見つからなければ、そのオブジェクトの全メンバーを missing とする。
+    前回の同期 / プレビューから指紋が変わっていないオブジェクトは空の差分になる。
+    """
     result = HideSetDiffResult()
-    scene = context.scene
+    edit_objs = set(ensure_objects_in_edit_mode(context))
+
+    for obj_name, _items, etype, pids, saved in _iter_object_members(hide_set):
+        obj = bpy.data.objects.get(obj_name)
+        if obj is None or obj.type != "MESH":
+            result.add_object(
+                ObjectDiff(obj_name, etype, missing=np.arange(len(pids), dtype=np.int64))
+            )
+            continue
+        try:
+            fp = object_fingerprint(obj, etype, pids, saved, edit_objs)
+            # 新規選択は指紋に含まれないので、include_selected のときは必ず読む
+            if not include_selected and is_unchanged(hide_set, obj_name, fp):
+                result.add_object(ObjectDiff(obj_name, etype))
+                continue
+            diff = diff_object_members(obj, etype, pids, saved, edit_objs, include_selected)
+            if not len(diff.updated) and not len(diff.missing):
+                remember_clean(hide_set, obj_name, fp)
+            result.add_object(diff)
+        except Exception as e:
+            log_exc("compute_hide_set_diff", e)
+    return result
+
 
-    items_by_object = split_items_by_object(hide_set)
+def _sync_edit_mode(context, hide_set: HM_HideSet) -> HideSetDiffResult:
+    result = HideSetDiffResult()
     edit_objs = set(ensure_objects_in_edit_mode(context))
+    groups = []
+    fingerprints = {}
 
-    for obj_name, items in items_by_object.items():
+    for obj_name, items, etype, pids, saved in _iter_object_members(hide_set):
+        groups.append(items)
         obj = bpy.data.objects.get(obj_name)
-        if not obj:
-            for _ in items:
-                result.removed += 1
-            return result
-
-        def _sync_bm(bm: bmesh.types.BMesh):
-            v_map, e_map, f_map, *_ = build_pid_maps(bm)
-
-            for ref in items:
-                pid = int(ref.index)
-                if hide_set.mode == "VERT":
-                    elem = v_map.get(pid)
-                elif hide_set.mode == "EDGE":
-                    elem = e_map.get(pid)
-                else:
-                    elem = f_map.get(pid)
-
-                if elem is None:
-                    result.removed += 1
-                    continue
-
-                current_hidden = bool(elem.hide)
-                if current_hidden != bool(ref.saved_hidden):
-                    ref.saved_hidden = current_hidden
-                    result.updated += 1
+        if obj is None or obj.type != "MESH":
+            # 見つからないオブジェクトは数えるだけで、残りのオブジェクトも処理する
+            result.add_object(
+                ObjectDiff(obj_name, etype, missing=np.arange(len(pids), dtype=np.int64))
+            )
+            continue
 
         try:
-            from .bmesh_ops import process_bmesh
-            process_bmesh(obj, edit_objs, _sync_bm)
+            fp = object_fingerprint(obj, etype, pids, saved, edit_objs)
+            if is_unchanged(hide_set, obj_name, fp):
+                fingerprints[obj_name] = fp
+                result.add_object(ObjectDiff(obj_name, etype))
+                continue
+            diff = diff_object_members(obj, etype, pids, saved, edit_objs)
         except Exception as e:
-            log_exc("_sync_edit_mode.process_bmesh", e)
-
+            log_exc("_sync_edit_mode.diff", e)
+            continue
+        result.add_object(diff)
+
+        if len(diff.updated):
+            # 配列をまとめて書き換え、最後に commit_groups で1回だけ書き戻す
+            items.saved[diff.updated] = diff.current_hidden
+            items.dirty = True
+            saved = saved.copy()
+            saved[diff.updated] = diff.current_hidden
+
+        # 欠落メンバーが無ければ、同期後の状態を指紋として残す
+        if fp is not None and not len(diff.missing):
+            fp = object_fingerprint(obj, etype, pids, saved, edit_objs)
+            if fp is not None:
+                fingerprints[obj_name] = fp
+
+    # 更新した saved_hidden をまとめて書き戻す
+    commit_groups(hide_set, groups)
+    store_fingerprints(hide_set, fingerprints)
     return result
 
 
@@ -137,12 +318,10 @@ def preview_hide_set_diff(context, hide_set: HM_HideSet) -> HideSetDiffResult:
 
     # オブジェクトモード差分
     if hide_set.mode == "OBJECT":
-        scene = context.scene
-        for ref in hide_set.elements:
-            obj = scene.objects.get(ref.object_name) or bpy.data.objects.get(ref.object_name)
+        for obj, group in object_members(hide_set):
             if obj is None:
                 # オブジェクト自体が消えていたら削除と見なす
-                result.removed += 1
+                result.removed += len(group)
                 continue
 
             try:
@@ -151,64 +330,9 @@ def preview_hide_set_diff(context, hide_set: HM_HideSet) -> HideSetDiffResult:
                 continue
 
             # saved_hidden と現在の非表示状態を比較
-            if current_hidden != bool(ref.saved_hidden):
-                result.updated += 1
+            result.updated += int(np.count_nonzero(group.saved != current_hidden))
 
         return result
 
-
     # 編集モード（頂点 / 辺 / 面）の差分
-    items_by_object = split_items_by_object(hide_set)
-    if not items_by_object:
-        return result
-
-    edit_objs = set(ensure_objects_in_edit_mode(context))
-
-    for obj_name, items in items_by_object.items():
-        obj = bpy.data.objects.get(obj_name)
-        if obj is None:
-            # オブジェクト自体が消えている
-            result.removed += len(items)
-            continue
-
-        def _check(bm: bmesh.types.BMesh):
-            nonlocal result
-            try:
-                v_map, e_map, f_map, *_ = build_pid_maps(bm)
-            except Exception as e:
-                log_exc("preview_hide_set_diff.edit.build_pid_maps", e)
-                return
-
-            for ref in items:
-                try:
-                    pid = int(ref.index)
-                except Exception:
-                    continue
-
-                if hide_set.mode == "VERT":
-                    elem = v_map.get(pid)
-                elif hide_set.mode == "EDGE":
-                    elem = e_map.get(pid)
-                else:  # "FACE"
-                    elem = f_map.get(pid)
-
-                if elem is None:
-                    # 要素自体が見つからない → 拓扑的に消えた
-                    result.removed += 1
-                    continue
-
-                try:
-                    current_hidden = bool(getattr(elem, "hide", False))
-                except Exception:
-                    continue
-
-                if current_hidden != bool(ref.saved_hidden):
-                    result.updated += 1
-
-        try:
-            from .bmesh_ops import process_bmesh
-            process_bmesh(obj, edit_objs, _check)
-        except Exception as e:
-            log_exc("preview_hide_set_diff.edit.process_bmesh", e)
-
-    return result
+    return compute_hide_set_diff(context, hide_set)
@@ -0,0 +1,141 @@
+"""
+非表示セットの展開ルール（接続面 / Nリング / アイランド）。
+
+これまでの規則は「メンバー＋直接接続された面」だけだった。
+リトポ作業向けに、HM_HideSet ごとに次のルールを選べるようにする。
+- FACES  : メンバー＋接続面（従来どおり。展開処理は行わない）
+- RINGS  : さらに N リング分、頂点を共有する面へ広げる
+- ISLAND : 面でつながった島全体へ広げる（expand_ring_limit で上限リング数を指定可）
+
+展開は adjacency の CSR 隣接配列（面→頂点 / 頂点→面）の上で
+フロンティア単位の幅優先探索として行う（1リング = gather 2回）。
+結果の面インデックスは (隣接配列, ルール, 起点要素) ごとにキャッシュし、
+トグルを繰り返しても再計算しない。
+"""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .adjacency import MeshAdjacency
+
+EXPAND_FACES = "FACES"
+EXPAND_RINGS = "RINGS"
+EXPAND_ISLAND = "ISLAND"
+
+EXPANSION_CACHE_MAX_ENTRIES = 64
+
+
+@dataclass(frozen=True)
+class ExpansionRule:
+    kind: str = EXPAND_FACES
+    # 広げるリング数（0 = 無制限。ISLAND のみ）
+    rings: int = 1
+
+
+def rule_from_hide_set(hide_set) -> Optional[ExpansionRule]:
+    """セットの展開ルール。従来どおり（接続面のみ）なら None。"""
+    kind = getattr(hide_set, "expand_rule", EXPAND_FACES)
+    if hide_set.mode == "OBJECT" or kind == EXPAND_FACES:
+        return None
+    if kind == EXPAND_RINGS:
+        rings = max(int(hide_set.expand_rings), 0)
+        return ExpansionRule(EXPAND_RINGS, rings) if rings > 0 else None
+    return ExpansionRule(EXPAND_ISLAND, max(int(hide_set.expand_ring_limit), 0))
+
+
+def _unique_new(idx: np.ndarray, visited: np.ndarray) -> np.ndarray:
+    idx = idx[~visited[idx]]
+    if len(idx) == 0:
+        return idx
+    idx = np.unique(idx)
+    visited[idx] = True
+    return idx
+
+
+def _expand(adj: MeshAdjacency, v_idx, e_idx, f_idx, rule: ExpansionRule) -> np.ndarray:
+    topo = adj.topo
+    visited_v = np.zeros(adj.num_verts, dtype=bool)
+    visited_f = np.zeros(adj.num_faces, dtype=bool)
+
+    # リング0 = メンバー＋接続面（従来の規則と同じ範囲）
+    seed_f = np.concatenate(
+        [
+            np.asarray(f_idx, dtype=np.int64),
+            adj.vert_faces.gather(v_idx),
+            adj.edge_faces.gather(e_idx),
+        ]
+    ).astype(np.int64)
+    _unique_new(seed_f, visited_f)
+
+    seed_v = np.concatenate(
+        [
+            np.asarray(v_idx, dtype=np.int64),
+            topo.edge_verts[np.asarray(e_idx, dtype=np.int64)].ravel(),
+            adj.face_verts.gather(np.flatnonzero(visited_f)),
+        ]
+    ).astype(np.int64)
+    frontier_v = _unique_new(seed_v, visited_v)
+
+    ring = 0
+    while len(frontier_v) and (rule.rings == 0 or ring < rule.rings):
+        new_f = _unique_new(adj.vert_faces.gather(frontier_v).astype(np.int64), visited_f)
+        if len(new_f) == 0:
+            break
+        frontier_v = _unique_new(adj.face_verts.gather(new_f).astype(np.int64), visited_v)
+        ring += 1
+
+    return np.flatnonzero(visited_f)
+
+
+_expansion_cache: "OrderedDict[Tuple, Tuple[MeshAdjacency, np.ndarray]]" = OrderedDict()
+
+
+def _seed_digest(*arrays) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for a in arrays:
+        h.update(np.ascontiguousarray(a, dtype=np.int64).tobytes())
+        h.update(b"|")
+    return h.hexdigest()
+
+
+def expanded_faces(adj: MeshAdjacency, v_idx, e_idx, f_idx, rule: ExpansionRule) -> np.ndarray:
+    """ルールで広げた面インデックス（ソート済み）。結果はキャッシュする。"""
+    key = (id(adj), rule, _seed_digest(v_idx, e_idx, f_idx))
+    cached = _expansion_cache.get(key)
+    # id() は再利用されうるので、隣接配列そのものが同じか確かめる
+    if cached is not None and cached[0] is adj:
+        _expansion_cache.move_to_end(key)
+        return cached[1]
+
+    faces = _expand(adj, v_idx, e_idx, f_idx, rule)
+    _expansion_cache[key] = (adj, faces)
+    while len(_expansion_cache) > EXPANSION_CACHE_MAX_ENTRIES:
+        _expansion_cache.popitem(last=False)
+    return faces
+
+
+def expand_face_mask(
+    adj: MeshAdjacency,
+    v_sel: np.ndarray,
+    e_sel: np.ndarray,
+    f_sel: np.ndarray,
+    rule: Optional[ExpansionRule],
+) -> np.ndarray:
+    """メンバーマスクから、ルールで広げた面マスクを返す（rule が None なら f_sel のまま）。"""
+    if rule is None:
+        return f_sel
+    out = f_sel.copy()
+    out[
+        expanded_faces(
+            adj, np.flatnonzero(v_sel), np.flatnonzero(e_sel), np.flatnonzero(f_sel), rule
+        )
+    ] = True
+    return out
+
+
+def clear_expansion_cache() -> None:
+    _expansion_cache.clear()
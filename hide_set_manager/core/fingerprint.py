@@ -0,0 +1,127 @@
+"""
+セット × オブジェクト単位の内容指紋（fingerprint）。
+
+preview_hide_set_diff / Sync は、前回の同期から何も変わっていなくても
+毎回すべてのオブジェクトのメンバーを解決し直していた。
+
+ここでは同期した時点について、オブジェクトごとに
+- メンバー指紋 : メンバーのPID列と saved_hidden ビット列のハッシュ
+- メッシュ指紋 : そのドメインのPID属性と非表示属性のハッシュ
+を記録しておき、両方が一致するオブジェクトは差分なしとして飛ばす。
+（同期直後は saved_hidden = 現在の非表示状態なので、両方が同じなら差分も同じ＝空）
+
+記録先
+- Sync 時      : セットの ID プロパティ "hm_fingerprints"（{オブジェクト名: "メンバー:メッシュ"}）
+- プレビュー時 : セッション内の辞書（描画中は ID プロパティへ書けないため）
+
+メッシュ指紋はトポロジー世代と状態世代（pid_cache）でメモ化するので、
+更新通知の無かったメッシュは属性を読み直さない。
+編集モード中 / BMesh に未書き込みの変更があるオブジェクトは対象外（常に差分を取る）。
+"""
+
+import hashlib
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .pid_cache import mesh_key, mesh_generation, mesh_state_generation
+from .mesh_arrays import can_use_arrays, domain_size, get_pid_array, read_hidden
+from ..utils.logging import log_exc
+
+FINGERPRINT_KEY = "hm_fingerprints"
+
+# (mesh_key, 要素タイプ) → ((トポロジー世代, 状態世代, 要素数), メッシュ指紋)
+_mesh_fp_memo: Dict[Tuple[int, str], Tuple[Tuple, str]] = {}
+# (セットのポインタ, オブジェクト名) → 差分なしを確認したときの記録
+_clean_memo: Dict[Tuple[int, str], str] = {}
+
+
+def member_digest(etype: str, pids: np.ndarray, saved: np.ndarray) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(etype.encode())
+    h.update(np.ascontiguousarray(pids, dtype=np.int64).tobytes())
+    h.update(np.packbits(np.asarray(saved, dtype=bool), bitorder="little").tobytes())
+    return h.hexdigest()
+
+
+def mesh_fingerprint(me, etype: str) -> Optional[str]:
+    """ドメインのPID属性 + 非表示属性のハッシュ。PIDレイヤーが無ければ None。"""
+    size = domain_size(me, etype)
+    key = (mesh_key(me), etype)
+    token = (mesh_generation(me), mesh_state_generation(me), size)
+
+    cached = _mesh_fp_memo.get(key)
+    if cached is not None and cached[0] == token:
+        return cached[1]
+
+    arr = get_pid_array(me, etype)
+    if arr is None:
+        _mesh_fp_memo.pop(key, None)
+        return None
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(size.to_bytes(8, "little"))
+    h.update(arr.pids.tobytes())
+    h.update(np.packbits(read_hidden(me, etype), bitorder="little").tobytes())
+    fp = h.hexdigest()
+    _mesh_fp_memo[key] = (token, fp)
+    return fp
+
+
+def object_fingerprint(obj, etype: str, pids, saved, edit_objs) -> Optional[str]:
+    """
+    "メンバー指紋:メッシュ指紋"。
+    配列パスが使えない（編集モード中など）オブジェクトは None（常に差分を取る）。
+    """
+    if not can_use_arrays(obj, edit_objs):
+        return None
+    try:
+        fp = mesh_fingerprint(obj.data, etype)
+    except Exception as e:
+        log_exc("fingerprint.mesh_fingerprint", e)
+        return None
+    if fp is None:
+        return None
+    return f"{member_digest(etype, pids, saved)}:{fp}"
+
+
+def _stored(hide_set) -> dict:
+    raw = hide_set.get(FINGERPRINT_KEY)
+    return raw if raw is not None else {}
+
+
+def is_unchanged(hide_set, obj_name: str, fingerprint: Optional[str]) -> bool:
+    """前回の同期（またはプレビュー）から、このオブジェクトのメンバーに変化が無ければ True。"""
+    if fingerprint is None:
+        return False
+    if _clean_memo.get((hide_set.as_pointer(), obj_name)) == fingerprint:
+        return True
+    try:
+        return _stored(hide_set).get(obj_name) == fingerprint
+    except Exception:
+        return False
+
+
+def remember_clean(hide_set, obj_name: str, fingerprint: Optional[str]) -> None:
+    """差分なしを確認したオブジェクトをセッション内に記録する（データは変更しない）。"""
+    if fingerprint is not None:
+        _clean_memo[(hide_set.as_pointer(), obj_name)] = fingerprint
+
+
+def store_fingerprints(hide_set, fingerprints: Dict[str, str]) -> None:
+    """Sync 後の指紋をセットへ保存する（今回記録できなかったオブジェクトの古い指紋は捨てる）。"""
+    try:
+        if fingerprints:
+            hide_set[FINGERPRINT_KEY] = dict(fingerprints)
+        elif FINGERPRINT_KEY in hide_set:
+            del hide_set[FINGERPRINT_KEY]
+    except Exception as e:
+        log_exc("fingerprint.store_fingerprints", e)
+        return
+    for obj_name, fp in fingerprints.items():
+        remember_clean(hide_set, obj_name, fp)
+
+
+def clear_fingerprint_cache() -> None:
+    _mesh_fp_memo.clear()
+    _clean_memo.clear()
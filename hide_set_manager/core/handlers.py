@@ -0,0 +1,128 @@
+"""
+アプリケーションハンドラ。
+
+各キャッシュ（パネル状態 / PIDマップ）の無効化をここにまとめる。
+- depsgraph_update_post : 更新のあった オブジェクト / メッシュ 単位で無効化
+- undo_post / redo_post / load_post : データが丸ごと入れ替わるので全破棄
+
+ジオメトリが変わった編集モード外のメッシュは、重複PIDの検査待ちにする（pid_repair）。
+"""
+
+import bpy
+from bpy.app.handlers import persistent
+
+from .status_cache import invalidate_hide_set_status, invalidate_object_set_status
+from .registry import invalidate_member_index
+from .pid_cache import mesh_key, on_geometry_update, on_mesh_update, clear_pid_cache
+from .mesh_arrays import clear_array_cache
+from .adjacency import clear_adjacency_cache
+from .expansion import clear_expansion_cache
+from .fingerprint import clear_fingerprint_cache
+from .packed_store import migrate_scene
+from .pid_repair import queue_pid_check, cancel_pid_checks
+from .object_index import invalidate_object_index, mark_object_index_stale, cancel_restamp
+from .reverse_index import clear_reverse_index
+from ..utils.logging import log_exc
+
+
+def clear_all_caches() -> None:
+    invalidate_hide_set_status()
+    invalidate_member_index()
+    clear_pid_cache()
+    clear_array_cache()
+    clear_adjacency_cache()
+    clear_expansion_cache()
+    clear_fingerprint_cache()
+    invalidate_object_index()
+    clear_reverse_index()
+
+
+@persistent
+def _on_depsgraph_update_post(scene, depsgraph=None):
+    if depsgraph is None:
+        clear_all_caches()
+        return
+
+    try:
+        scene_updated = False
+        # ジオメトリ更新のあったメッシュ（mesh_key → Mesh）。
+        # オブジェクトとそのメッシュの両方から届くので、メッシュごとに1回だけ処理する
+        geometry_updated = {}
+        for update in depsgraph.updates:
+            id_data = getattr(update.id, "original", update.id)
+
+            if isinstance(id_data, bpy.types.Object):
+                invalidate_hide_set_status(obj_name=id_data.name)
+                # 名前変更などで名前 → オブジェクトの辞書が古くなっている可能性がある
+                mark_object_index_stale()
+                me = id_data.data
+                if isinstance(me, bpy.types.Mesh):
+                    on_mesh_update(me)
+                    if update.is_updated_geometry:
+                        geometry_updated[mesh_key(me)] = me
+
+            elif isinstance(id_data, bpy.types.Mesh):
+                invalidate_hide_set_status(mesh_name=id_data.name)
+                on_mesh_update(id_data)
+                if update.is_updated_geometry:
+                    geometry_updated[mesh_key(id_data)] = id_data
+
+            elif isinstance(id_data, bpy.types.Scene):
+                scene_updated = True
+
+        for me in geometry_updated.values():
+            if on_geometry_update(me):
+                queue_pid_check(me, scene)
+
+        # オブジェクトの表示状態はシーン更新として届く。選択やフレーム変更でも届くので、
+        # 捨てるのはオブジェクトモードセットの状態だけにする
+        # （セット自体の変更は各オペレーターが全体を無効化する）
+        if scene_updated:
+            invalidate_object_set_status()
+            mark_object_index_stale()
+    except Exception as e:
+        log_exc("handlers.depsgraph_update_post", e)
+        clear_all_caches()
+
+
+@persistent
+def _on_reset(*_args):
+    clear_all_caches()
+
+
+@persistent
+def _on_load_post(*_args):
+    clear_all_caches()
+    cancel_pid_checks()
+    cancel_restamp()
+    # 旧形式（HM_ElementRef コレクション）の編集モードセットをパック配列へ移行
+    for scene in bpy.data.scenes:
+        try:
+            migrate_scene(scene)
+        except Exception as e:
+            log_exc("handlers.load_post.migrate_scene", e)
+
+
+_HANDLERS = (
+    ("depsgraph_update_post", _on_depsgraph_update_post),
+    ("undo_post", _on_reset),
+    ("redo_post", _on_reset),
+    ("load_post", _on_load_post),
+)
+
+
+def register_handlers() -> None:
+    for name, func in _HANDLERS:
+        handlers = getattr(bpy.app.handlers, name)
+        if func not in handlers:
+            handlers.append(func)
+
+
+def unregister_handlers() -> None:
+    for name, func in _HANDLERS:
+        handlers = getattr(bpy.app.handlers, name)
+        if func in handlers:
+            handlers.remove(func)
+    cancel_pid_checks()
+    cancel_restamp()
+    clear_all_caches()
@@ -0,0 +1,230 @@
+"""
+編集モード外のメッシュ用の NumPy バックエンド。
+
+process_bmesh は編集モード外のオブジェクトに対して
+bmesh.new() → from_mesh() を行うため、PIDと非表示フラグを読むだけでも
+メッシュ全体の変換が走る。
+
+ここでは Mesh.attributes の
+- 永続ID   : hm_vid / hm_eid / hm_fid
+- 非表示   : .hide_vert / .hide_edge / .hide_poly
+を foreach_get で NumPy 配列に読み込み、
+セットのメンバーは np.searchsorted で要素インデックスへ解決する。
+
+PID配列とそのソート順はメッシュごとにキャッシュする（pid_cache の世代で検証）。
+PIDの範囲が要素数に対して十分に密なら（PID圧縮の後など）、ソートの代わりに
+「PID - 最小PID → 要素インデックス」の直接参照表を作り、解決を1回の gather にする。
+非表示フラグはトポロジー世代と無関係に変わるので毎回読み直す（memcpy 相当）。
+"""
+
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from .pid_cache import mesh_key, mesh_generation
+from .bmesh_ops import has_pending_write
+from ..utils.logging import log_exc
+
+# 要素タイプ → (PID属性名, 非表示属性名)
+ATTR_NAMES = {
+    "VERT": ("hm_vid", ".hide_vert"),
+    "EDGE": ("hm_eid", ".hide_edge"),
+    "FACE": ("hm_fid", ".hide_poly"),
+}
+
+# 要素タイプ → 選択属性名
+SELECT_ATTR_NAMES = {
+    "VERT": ".select_vert",
+    "EDGE": ".select_edge",
+    "FACE": ".select_poly",
+}
+
+ARRAY_CACHE_MAX_ENTRIES = 32
+
+# PIDの範囲（最大 - 最小 + 1）が要素数のこの倍率以下なら直接参照表を使う
+DENSE_TABLE_MAX_RATIO = 4
+
+
+def can_use_arrays(obj, edit_objs) -> bool:
+    """編集モード外のメッシュオブジェクトなら True（配列パスが使える）。"""
+    if obj is None or obj.type != "MESH":
+        return False
+    if obj in edit_objs or obj.mode == "EDIT":
+        return False
+    # セッション内で BMesh 側に未書き込みの変更があるなら、そちらを正とする
+    if has_pending_write(obj.data):
+        return False
+    return True
+
+
+def domain_size(me, etype: str) -> int:
+    if etype == "VERT":
+        return len(me.vertices)
+    if etype == "EDGE":
+        return len(me.edges)
+    return len(me.polygons)
+
+
+def read_int_attribute(me, name: str, size: int) -> Optional[np.ndarray]:
+    """INT 属性を配列で読む。無い / 型やサイズが合わない場合は None。"""
+    attr = me.attributes.get(name)
+    if attr is None or attr.data_type != "INT" or len(attr.data) != size:
+        return None
+    out = np.empty(size, dtype=np.int32)
+    attr.data.foreach_get("value", out)
+    return out
+
+
+def read_bool_attribute(me, name: str, size: int) -> np.ndarray:
+    """BOOLEAN 属性を配列で読む。無ければ全て False（非表示要素なし）。"""
+    out = np.zeros(size, dtype=bool)
+    attr = me.attributes.get(name)
+    if attr is None or attr.data_type != "BOOLEAN" or len(attr.data) != size:
+        return out
+    attr.data.foreach_get("value", out)
+    return out
+
+
+def read_hidden(me, etype: str) -> np.ndarray:
+    return read_bool_attribute(me, ATTR_NAMES[etype][1], domain_size(me, etype))
+
+
+def read_selected(me, etype: str) -> np.ndarray:
+    return read_bool_attribute(me, SELECT_ATTR_NAMES[etype], domain_size(me, etype))
+
+
+class PidArray:
+    """
+    1ドメイン分のPID配列と、その解決用の索引。
+    - 密な範囲 : 直接参照表 table[PID - base] = 要素インデックス（無ければ -1）
+    - それ以外 : searchsorted 用のソート済みビュー
+    同じPIDが複数ある場合はどちらも最小インデックスの要素に解決する。
+    """
+
+    __slots__ = ("pids", "order", "sorted_pids", "base", "table")
+
+    def __init__(self, pids: np.ndarray):
+        self.pids = pids
+        self.base = 0
+        self.table = None
+        self.order = None
+        self.sorted_pids = None
+
+        pos = np.flatnonzero(pids > 0)
+        if len(pos):
+            used = pids[pos].astype(np.int64)
+            lo, hi = int(used.min()), int(used.max())
+            if hi - lo + 1 <= DENSE_TABLE_MAX_RATIO * len(pids):
+                table = np.full(hi - lo + 1, -1, dtype=np.int64)
+                # 逆順に書き込むと、重複PIDは最小インデックスが残る
+                table[used[::-1] - lo] = pos[::-1]
+                self.base = lo
+                self.table = table
+                return
+
+        self.order = np.argsort(pids, kind="stable")
+        self.sorted_pids = pids[self.order]
+
+    def __len__(self) -> int:
+        return len(self.pids)
+
+    @property
+    def is_dense(self) -> bool:
+        return self.table is not None
+
+    def resolve(self, member_pids: np.ndarray) -> np.ndarray:
+        """PID → 要素インデックス。見つからないものは -1。"""
+        member_pids = np.asarray(member_pids, dtype=np.int64)
+        if self.table is not None:
+            out = np.full(len(member_pids), -1, dtype=np.int64)
+            offset = member_pids - self.base
+            ok = (offset >= 0) & (offset < len(self.table))
+            out[ok] = self.table[offset[ok]]
+            return out
+
+        if len(self.sorted_pids) == 0 or len(member_pids) == 0:
+            return np.full(len(member_pids), -1, dtype=np.int64)
+
+        pos = np.searchsorted(self.sorted_pids, member_pids)
+        pos = np.minimum(pos, len(self.sorted_pids) - 1)
+        found = (self.sorted_pids[pos] == member_pids) & (member_pids > 0)
+        return np.where(found, self.order[pos], -1)
+
+
+_array_cache: "OrderedDict[Tuple[int, str], Tuple[Tuple, PidArray]]" = OrderedDict()
+
+
+def get_pid_array(me, etype: str) -> Optional[PidArray]:
+    """メッシュのPID配列（キャッシュ付き）。PIDレイヤーが無ければ None。"""
+    size = domain_size(me, etype)
+    key = (mesh_key(me), etype)
+    fp = (size, mesh_generation(me))
+
+    cached = _array_cache.get(key)
+    if cached is not None and cached[0] == fp:
+        _array_cache.move_to_end(key)
+        return cached[1]
+
+    try:
+        pids = read_int_attribute(me, ATTR_NAMES[etype][0], size)
+    except Exception as e:
+        log_exc(f"mesh_arrays.get_pid_array.{etype}", e)
+        pids = None
+    if pids is None:
+        _array_cache.pop(key, None)
+        return None
+
+    arr = PidArray(pids)
+    _array_cache[key] = (fp, arr)
+    while len(_array_cache) > ARRAY_CACHE_MAX_ENTRIES:
+        _array_cache.popitem(last=False)
+    return arr
+
+
+def clear_array_cache() -> None:
+    _array_cache.clear()
+
+
+def member_arrays(items: Iterable) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """HM_ElementRef 列を 要素タイプ → (PID配列, saved_hidden配列) にまとめる。"""
+    # MemberGroup（パック配列）ならそのまま使う
+    if hasattr(items, "pids") and hasattr(items, "saved"):
+        return {items.element_type: (items.pids, items.saved)}
+
+    pids: Dict[str, list] = {}
+    saved: Dict[str, list] = {}
+    for it in items:
+        etype = it.element_type
+        pids.setdefault(etype, []).append(it.index)
+        saved.setdefault(etype, []).append(it.saved_hidden)
+
+    return {
+        etype: (np.asarray(pids[etype], dtype=np.int64), np.asarray(saved[etype], dtype=bool))
+        for etype in pids
+    }
+
+
+def resolve_members(me, etype: str, member_pids: np.ndarray) -> np.ndarray:
+    """メンバーPIDを要素インデックスへ。PIDレイヤーが無ければ全て -1。"""
+    arr = get_pid_array(me, etype)
+    if arr is None:
+        return np.full(len(member_pids), -1, dtype=np.int64)
+    return arr.resolve(member_pids)
+
+
+def existing_pid_mask(me, etype: str, member_pids) -> np.ndarray:
+    """メッシュ上に存在するPIDなら True のマスク（インポート時の一括検証用）。"""
+    return resolve_members(me, etype, np.asarray(member_pids, dtype=np.int64)) >= 0
+
+
+def members_all_hidden(me, items) -> bool:
+    """見つかったメンバーに表示中のものが無ければ True（見つからないものは無視）。"""
+    for etype, (pids, _saved) in member_arrays(items).items():
+        if etype not in ATTR_NAMES:
+            continue
+        idx = resolve_members(me, etype, pids)
+        idx = idx[idx >= 0]
+        if len(idx) and not read_hidden(me, etype)[idx].all():
+            return False
+    return True
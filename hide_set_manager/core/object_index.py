@@ -0,0 +1,204 @@
+"""
+オブジェクトモードセット用の 安定ID → オブジェクト 索引。
+
+オブジェクトモードセットのメンバーは object_name で保存され、
+適用 / トグル / 描画のたびにメンバーごとに bpy.data.objects.get で名前を引いていた。
+オブジェクトの名前を変えると、そのメンバーは黙って消えてしまう。
+
+ここでは
+- オブジェクトにカスタムプロパティ "hm_uid"（uuid4）を付け、メンバーには object_uid として保存する
+- uid → (オブジェクト名, as_pointer()) の辞書を、bpy.data.objects の数が変わったときだけ作り直す
+ことで、uid から名前を辞書で引けるようにし、名前変更にも追従する。
+bpy.types.Object そのものは保持しない（削除されたオブジェクトの構造体を参照すると落ちるため）。
+引くときは名前で bpy.data.objects から取り直し、ポインタが一致するか確かめる。
+
+Shift+D などでオブジェクトを複製するとカスタムプロパティも複製される。
+索引を作り直すときに「前回その uid を持っていたオブジェクト」を元として残し、
+コピー側にはタイマーで新しい uid を振り直す（描画中はIDへ書き込めないため）。
+"""
+
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import bpy
+
+from ..utils.logging import log_exc
+
+OBJECT_UID_KEY = "hm_uid"
+
+
+# (オブジェクト名, as_pointer())
+_Owner = Tuple[str, int]
+
+
+class _ObjectIndex:
+    __slots__ = ("by_uid", "count", "fresh")
+
+    def __init__(self, by_uid: Dict[str, _Owner], count: int):
+        self.by_uid = by_uid
+        self.count = count
+        # 作り直してからオブジェクトの更新通知が来ていない（引けなくても作り直さない）
+        self.fresh = True
+
+
+_index: Optional[_ObjectIndex] = None
+# uid を振り直すコピー（オブジェクト名, 複製された uid）
+_pending_copies: List[Tuple[str, str]] = []
+
+
+def object_uid(obj) -> str:
+    try:
+        uid = obj.get(OBJECT_UID_KEY)
+    except ReferenceError:
+        return ""
+    return uid if isinstance(uid, str) else ""
+
+
+def _resolve_owner(owner: Optional[_Owner]) -> Optional[bpy.types.Object]:
+    """索引に残した (名前, ポインタ) を bpy.data から引き直す。別のオブジェクトに変わっていれば None。"""
+    if owner is None:
+        return None
+    obj = bpy.data.objects.get(owner[0])
+    if obj is None or obj.as_pointer() != owner[1]:
+        return None
+    return obj
+
+
+def _build(previous: Optional[_ObjectIndex]) -> _ObjectIndex:
+    prev_uid = previous.by_uid if previous is not None else {}
+    by_uid: Dict[str, _Owner] = {}
+    copies: List[Tuple[str, str]] = []
+
+    objects = bpy.data.objects
+    for obj in objects:
+        uid = object_uid(obj)
+        if not uid:
+            continue
+        ptr = obj.as_pointer()
+        owner = by_uid.get(uid)
+        if owner is None:
+            by_uid[uid] = (obj.name, ptr)
+            continue
+        # 同じ uid が複数ある：前回の持ち主（ポインタで比べる）を元として残す
+        prev = prev_uid.get(uid)
+        if prev is not None and prev[1] == ptr:
+            copies.append((owner[0], uid))
+            by_uid[uid] = (obj.name, ptr)
+        else:
+            copies.append((obj.name, uid))
+
+    if copies:
+        _queue_restamp(copies)
+    return _ObjectIndex(by_uid, len(objects))
+
+
+def get_object_index() -> _ObjectIndex:
+    """索引を返す。bpy.data.objects の数が変わっていれば作り直す。"""
+    global _index
+    if _index is None or _index.count != len(bpy.data.objects):
+        _index = _build(_index)
+    return _index
+
+
+def invalidate_object_index() -> None:
+    global _index
+    _index = None
+
+
+def mark_object_index_stale() -> None:
+    """オブジェクトの更新通知で呼ぶ。次に引けなかったときに1回だけ作り直す。"""
+    if _index is not None:
+        _index.fresh = False
+
+
+def find_object(uid: str, name: str = "") -> Optional[bpy.types.Object]:
+    """
+    uid（無ければ名前）でオブジェクトを引く。
+    引けなかった場合、前回作り直してからオブジェクトの更新があれば作り直して引き直す
+    （見つからないメンバーが多くても、作り直しは1回だけ）。
+    """
+    global _index
+    for attempt in range(2):
+        idx = get_object_index()
+        if uid:
+            obj = _resolve_owner(idx.by_uid.get(uid))
+            if obj is not None and object_uid(obj) == uid:
+                return obj
+        if name:
+            obj = bpy.data.objects.get(name)
+            # 名前で見つけたものも、uid を持つメンバーなら同じ uid か確かめる
+            if obj is not None and (not uid or object_uid(obj) in ("", uid)):
+                return obj
+        if attempt or idx.fresh:
+            break
+        _index = _build(idx)
+    return None
+
+
+def ensure_object_uid(obj) -> str:
+    """オブジェクトの uid を返す。無い（または他のオブジェクトのコピー）なら新しく振る。"""
+    global _index
+    idx = get_object_index()
+    uid = object_uid(obj)
+    ptr = obj.as_pointer()
+    if uid:
+        owner = idx.by_uid.get(uid)
+        if owner is not None and owner[1] != ptr and _resolve_owner(owner) is None and not idx.fresh:
+            # 持ち主の名前が変わっただけかもしれないので、作り直して確かめる
+            idx = _index = _build(idx)
+            owner = idx.by_uid.get(uid)
+        if owner is None or owner[1] == ptr or _resolve_owner(owner) is None:
+            idx.by_uid[uid] = (obj.name, ptr)
+            return uid
+
+    uid = uuid.uuid4().hex
+    obj[OBJECT_UID_KEY] = uid
+    idx.by_uid[uid] = (obj.name, ptr)
+    return uid
+
+
+def resolve_object_ref(ref, update: bool = False) -> Optional[bpy.types.Object]:
+    """
+    オブジェクトメンバー（HM_ElementRef）を解決する。
+    update=True（オペレーター内）なら、名前の変更を object_name に反映し、
+    uid の無い古いメンバーには uid を付ける。
+    """
+    obj = find_object(ref.object_uid, ref.object_name)
+    if obj is None or not update:
+        return obj
+    try:
+        if not ref.object_uid:
+            ref.object_uid = ensure_object_uid(obj)
+        if ref.object_name != obj.name:
+            ref.object_name = obj.name
+    except Exception as e:
+        log_exc("object_index.resolve_object_ref", e)
+    return obj
+
+
+def _restamp_copies():
+    copies = list(_pending_copies)
+    _pending_copies.clear()
+    for name, uid in copies:
+        obj = bpy.data.objects.get(name)
+        # 先に ensure_object_uid で振り直されていれば触らない
+        if obj is None or object_uid(obj) != uid:
+            continue
+        try:
+            obj[OBJECT_UID_KEY] = uuid.uuid4().hex
+        except Exception as e:
+            log_exc("object_index.restamp_copies", e)
+    invalidate_object_index()
+    return None
+
+
+def _queue_restamp(copies: List[Tuple[str, str]]) -> None:
+    _pending_copies.extend(copies)
+    if not bpy.app.timers.is_registered(_restamp_copies):
+        bpy.app.timers.register(_restamp_copies, first_interval=0.0)
+
+
+def cancel_restamp() -> None:
+    _pending_copies.clear()
+    if bpy.app.timers.is_registered(_restamp_copies):
+        bpy.app.timers.unregister(_restamp_copies)
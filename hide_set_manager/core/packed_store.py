@@ -0,0 +1,391 @@
+"""
+非表示セットのメンバーをパック配列で保存するバックエンド。
+
+HM_ElementRef（PropertyGroup）を1要素1つずつ持つ方式では、
+100万要素のセットが100万個の RNA 構造体になり、
+.blend のサイズ・保存/読み込み時間・アンドゥメモリが膨らむ。
+
+PACKED ストレージでは、メンバーを (オブジェクト, 要素タイプ) ごとにまとめ、
+HM_HideSet の IDプロパティ "hm_members" に次の形で保存する。
+
+    [
+        {"object": "Cube", "type": "VERT", "count": N,
+         "pids": <little-endian int32 × N の bytes>,
+         "hidden": <saved_hidden のビット列（little bit order）の bytes>},
+        ...
+    ]
+
+core/ 側は iter_member_groups() / split_items_by_object() を通して
+MemberGroup（NumPy 配列）として扱うので、要素ごとに RNA を触らない。
+既存の ELEMENTS ストレージのセットは load_post で移行する。
+
+ELEMENTS ストレージ（オブジェクトモードセットなど）も、int / bool の列は
+CollectionProperty.foreach_get でまとめて読み、オブジェクト名（文字列は foreach_get
+できない）だけを1回走査してグループ分けする。結果はセットが変わるまでキャッシュする。
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.logging import log_exc
+
+PACKED_KEY = "hm_members"
+
+STORAGE_ELEMENTS = "ELEMENTS"
+STORAGE_PACKED = "PACKED"
+
+
+# ----------------------------------------------------------------------
+# エンコード / デコード
+# ----------------------------------------------------------------------
+def encode_pids(pids) -> bytes:
+    return np.asarray(pids, dtype="<i4").tobytes()
+
+
+def decode_pids(data) -> np.ndarray:
+    return np.frombuffer(bytes(data), dtype="<i4")
+
+
+def encode_bits(flags) -> bytes:
+    return np.packbits(np.asarray(flags, dtype=bool), bitorder="little").tobytes()
+
+
+def decode_bits(data, count: int) -> np.ndarray:
+    raw = np.frombuffer(bytes(data), dtype=np.uint8)
+    return np.unpackbits(raw, count=count, bitorder="little").astype(bool)
+
+
+# ----------------------------------------------------------------------
+# メンバー表現
+# ----------------------------------------------------------------------
+class MemberView:
+    """
+    MemberGroup の1要素を HM_ElementRef と同じ属性名で見せるビュー。
+    既存の「for it in items: it.index ...」というコードをそのまま使えるようにする。
+    """
+
+    __slots__ = ("_group", "_i")
+
+    def __init__(self, group: "MemberGroup", i: int):
+        self._group = group
+        self._i = i
+
+    @property
+    def object_name(self) -> str:
+        return self._group.object_name
+
+    @property
+    def element_type(self) -> str:
+        return self._group.element_type
+
+    @property
+    def index(self) -> int:
+        return int(self._group.pids[self._i])
+
+    @property
+    def saved_hidden(self) -> bool:
+        return bool(self._group.saved[self._i])
+
+    @saved_hidden.setter
+    def saved_hidden(self, value: bool) -> None:
+        value = bool(value)
+        if bool(self._group.saved[self._i]) != value:
+            self._group.saved[self._i] = value
+            self._group.dirty = True
+
+
+class MemberGroup:
+    """1オブジェクト・1要素タイプ分のメンバー（PID配列 + saved_hidden配列）。"""
+
+    __slots__ = ("object_name", "element_type", "pids", "saved", "dirty")
+
+    def __init__(self, object_name: str, element_type: str, pids, saved):
+        self.object_name = object_name
+        self.element_type = element_type
+        self.pids = np.asarray(pids, dtype=np.int64)
+        self.saved = np.array(saved, dtype=bool)
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.pids)
+
+    def __iter__(self) -> Iterator[MemberView]:
+        for i in range(len(self.pids)):
+            yield MemberView(self, i)
+
+
+class ElementGroup(MemberGroup):
+    """ELEMENTS ストレージの1グループ。rows は elements コレクション上の位置。"""
+
+    __slots__ = ("rows", "uid")
+
+    def __init__(self, object_name: str, element_type: str, pids, saved, rows, uid: str = ""):
+        super().__init__(object_name, element_type, pids, saved)
+        self.rows = rows
+        # オブジェクトメンバーの object_uid（グループ先頭の値）
+        self.uid = uid
+
+
+# ----------------------------------------------------------------------
+# 読み書き
+# ----------------------------------------------------------------------
+def is_packed(hide_set) -> bool:
+    return getattr(hide_set, "storage", STORAGE_ELEMENTS) == STORAGE_PACKED
+
+
+def _raw_groups(hide_set) -> list:
+    raw = hide_set.get(PACKED_KEY)
+    return list(raw) if raw is not None else []
+
+
+def read_groups(hide_set) -> List[MemberGroup]:
+    """PACKED ストレージのメンバーを読み出す。"""
+    groups: List[MemberGroup] = []
+    for raw in _raw_groups(hide_set):
+        try:
+            count = int(raw["count"])
+            groups.append(
+                MemberGroup(
+                    str(raw["object"]),
+                    str(raw["type"]),
+                    decode_pids(raw["pids"])[:count],
+                    decode_bits(raw["hidden"], count),
+                )
+            )
+        except Exception as e:
+            log_exc("packed_store.read_groups", e)
+    return groups
+
+
+def write_groups(hide_set, groups: Iterable[MemberGroup]) -> None:
+    """メンバーを丸ごと書き込む（空のグループは捨てる）。"""
+    packed = []
+    for g in groups:
+        if len(g) == 0:
+            continue
+        packed.append(
+            {
+                "object": g.object_name,
+                "type": g.element_type,
+                "count": len(g),
+                "pids": encode_pids(g.pids),
+                "hidden": encode_bits(g.saved),
+            }
+        )
+        g.dirty = False
+    hide_set[PACKED_KEY] = packed
+
+
+def iter_raw_groups(hide_set) -> Iterator[Tuple[str, str, int, bytes, bytes]]:
+    """PACKED ストレージを (オブジェクト, タイプ, 件数, PIDバイト列, ビット列) のままデコードせずに返す。"""
+    for raw in _raw_groups(hide_set):
+        try:
+            yield str(raw["object"]), str(raw["type"]), int(raw["count"]), bytes(raw["pids"]), bytes(raw["hidden"])
+        except Exception as e:
+            log_exc("packed_store.iter_raw_groups", e)
+
+
+def member_count(hide_set) -> int:
+    """メンバー数（PACKED でも配列をデコードしない）。"""
+    if not is_packed(hide_set):
+        return len(hide_set.elements)
+    total = 0
+    for raw in _raw_groups(hide_set):
+        try:
+            total += int(raw["count"])
+        except Exception:
+            continue
+    return total
+
+
+def iter_member_groups(hide_set) -> List[MemberGroup]:
+    """
+    ストレージに関係なく MemberGroup のリストを返す。
+    ELEMENTS ストレージの場合は foreach_get でまとめて読んだ結果（キャッシュ）を使う。
+    """
+    if is_packed(hide_set):
+        return read_groups(hide_set)
+    return element_groups(hide_set)
+
+
+def commit_groups(hide_set, groups: Iterable) -> None:
+    """
+    変更された MemberGroup があれば書き戻す。
+    PACKED は丸ごと書き直し、ELEMENTS は saved_hidden 列を foreach_set で1回だけ書く。
+    """
+    if not is_packed(hide_set):
+        _commit_element_groups(hide_set, [g for g in groups if isinstance(g, ElementGroup)])
+        return
+    groups = [g for g in groups if isinstance(g, MemberGroup)]
+    if any(g.dirty for g in groups):
+        write_groups(hide_set, groups)
+
+
+# ----------------------------------------------------------------------
+# ELEMENTS ストレージの一括読み込み
+# ----------------------------------------------------------------------
+class _ElementTable:
+    __slots__ = ("length", "pids", "saved", "groups")
+
+    def __init__(self, length: int, pids: np.ndarray, saved: np.ndarray, groups: list):
+        self.length = length
+        self.pids = pids
+        self.saved = saved
+        # [(オブジェクト名, 行番号配列, uid), ...]（最初に現れた順）
+        self.groups = groups
+
+
+_element_tables: Dict[Tuple[int, str], _ElementTable] = {}
+
+
+def _elements_key(collection) -> Tuple[int, str]:
+    return (collection.id_data.as_pointer(), collection.path_from_id())
+
+
+def _read_element_table(hide_set) -> _ElementTable:
+    elements = hide_set.elements
+    n = len(elements)
+    key = _elements_key(elements)
+    cached = _element_tables.get(key)
+    if cached is not None and cached.length == n:
+        return cached
+
+    pids = np.empty(n, dtype=np.int32)
+    saved = np.empty(n, dtype=bool)
+    if n:
+        elements.foreach_get("index", pids)
+        elements.foreach_get("saved_hidden", saved)
+
+    # 文字列は foreach_get できないので、名前（と uid）だけ1回走査して番号にする
+    lookup: Dict[str, int] = {}
+    uids: List[str] = []
+    obj_idx = np.empty(n, dtype=np.int64)
+    with_uid = hide_set.mode == "OBJECT"
+    for i, it in enumerate(elements):
+        name = it.object_name
+        j = lookup.get(name)
+        if j is None:
+            j = lookup[name] = len(lookup)
+            uids.append(it.object_uid if with_uid else "")
+        obj_idx[i] = j
+
+    order = np.argsort(obj_idx, kind="stable")
+    bounds = np.searchsorted(obj_idx[order], np.arange(len(lookup) + 1))
+    groups = [(name, order[bounds[j]:bounds[j + 1]], uids[j]) for name, j in lookup.items()]
+
+    table = _ElementTable(n, pids.astype(np.int64), saved, groups)
+    _element_tables[key] = table
+    return table
+
+
+def element_groups(hide_set) -> List[ElementGroup]:
+    """
+    ELEMENTS ストレージのメンバーを (オブジェクトごとの) ElementGroup で返す。
+    セットは単一モードなので、要素タイプはセットの mode とする（Enum は foreach_get できない）。
+    """
+    table = _read_element_table(hide_set)
+    etype = hide_set.mode
+    return [
+        ElementGroup(name, etype, table.pids[rows], table.saved[rows], rows, uid)
+        for name, rows, uid in table.groups
+    ]
+
+
+def _commit_element_groups(hide_set, groups: List[ElementGroup]) -> None:
+    dirty = [g for g in groups if g.dirty]
+    if not dirty:
+        return
+    table = _read_element_table(hide_set)
+    saved = table.saved.copy()
+    for g in dirty:
+        saved[g.rows] = g.saved
+        g.dirty = False
+    hide_set.elements.foreach_set("saved_hidden", saved)
+    table.saved = saved
+
+
+def invalidate_element_groups(collection=None) -> None:
+    """ELEMENTS ストレージのキャッシュを破棄する。引数なしなら全て。"""
+    if collection is None:
+        _element_tables.clear()
+        return
+    _element_tables.pop(_elements_key(collection), None)
+
+
+def _as_array(values, dtype) -> np.ndarray:
+    if not isinstance(values, np.ndarray):
+        values = list(values)
+    return np.asarray(values, dtype=dtype)
+
+
+def add_members_packed(
+    hide_set,
+    obj_name: str,
+    elem_type: str,
+    pids,
+    saved_hidden,
+) -> int:
+    """
+    PACKED ストレージへメンバーを追加する。
+    既存メンバーやバッチ内の重複は np.isin / np.unique でまとめて除外する。
+    """
+    pids = _as_array(pids, np.int64)
+    saved = _as_array(saved_hidden, bool)
+    if len(pids) == 0:
+        return 0
+
+    # バッチ内の重複（先に現れたものを残す）
+    _, first = np.unique(pids, return_index=True)
+    first.sort()
+    pids = pids[first]
+    saved = saved[first]
+
+    groups = read_groups(hide_set)
+    target: Optional[MemberGroup] = None
+    for g in groups:
+        if g.object_name == obj_name and g.element_type == elem_type:
+            target = g
+            break
+
+    if target is None:
+        target = MemberGroup(obj_name, elem_type, pids, saved)
+        groups.append(target)
+        added = len(pids)
+    else:
+        fresh = ~np.isin(pids, target.pids)
+        added = int(np.count_nonzero(fresh))
+        if added == 0:
+            return 0
+        target.pids = np.concatenate([target.pids, pids[fresh]])
+        target.saved = np.concatenate([target.saved, saved[fresh]])
+
+    write_groups(hide_set, groups)
+    return added
+
+
+# ----------------------------------------------------------------------
+# 移行
+# ----------------------------------------------------------------------
+def migrate_hide_set(hide_set) -> bool:
+    """ELEMENTS ストレージのセットを PACKED へ移行する。移行したら True。"""
+    if is_packed(hide_set) or hide_set.mode == "OBJECT":
+        return False
+
+    groups = iter_member_groups(hide_set)
+    write_groups(hide_set, groups)
+    hide_set.elements.clear()
+    hide_set.storage = STORAGE_PACKED
+    return True
+
+
+def migrate_scene(scene) -> int:
+    """シーン内の編集モードセットを全て移行し、移行した数を返す。"""
+    migrated = 0
+    for hide_set in getattr(scene, "hm_edit_sets", ()):
+        try:
+            if migrate_hide_set(hide_set):
+                migrated += 1
+        except Exception as e:
+            log_exc(f"packed_store.migrate_scene.{hide_set.name}", e)
+    return migrated
@@ -1,7 +1,8 @@
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Sequence, Tuple
 
 import bmesh
 import bpy
+import numpy as np
 
 from ..utils.logging import log_exc
 
@@ -59,6 +60,78 @@ def assign_persistent_id_if_missing(
     return new_pid
 
 
+def reserve_pid_range(scene, count: int) -> int:
+    """
+    scene.hm_next_elem_id から連続した count 個のPIDを予約し、先頭のPIDを返す。
+    シーンプロパティの読み書きは1回ずつだけ。
+    """
+    try:
+        start = int(scene.hm_next_elem_id)
+    except Exception:
+        start = 1
+    if start < 1:
+        start = 1
+    if count > 0:
+        scene.hm_next_elem_id = start + int(count)
+    return start
+
+
+def allocate_missing_pids(pids: np.ndarray, mask: np.ndarray, scene) -> np.ndarray:
+    """
+    一括PID割り当て。
+    pids（現在のPIDレイヤーの値）のうち mask が True かつ PID <= 0 の要素に
+    連続した新規PIDを振る。pids はその場で書き換え、新規付与した位置の
+    インデックス配列を返す。
+    """
+    missing = np.flatnonzero(mask & (pids <= 0))
+    if len(missing):
+        start = reserve_pid_range(scene, len(missing))
+        pids[missing] = np.arange(start, start + len(missing), dtype=pids.dtype)
+    return missing
+
+
+def assign_missing_pids_bmesh(elems: Sequence, layer, scene) -> np.ndarray:
+    """
+    BMesh 要素列（選択済みの要素など）にまとめてPIDを振り、各要素のPID配列を返す。
+    BMesh のレイヤーは foreach_get できないので、読み取り1回・
+    PIDなし要素への書き込み1回の走査にまとめる。
+    """
+    count = len(elems)
+    if layer is None:
+        return np.array([int(getattr(e, "index", -1)) for e in elems], dtype=np.int64)
+
+    pids = np.fromiter((e[layer] for e in elems), dtype=np.int64, count=count)
+    missing = allocate_missing_pids(pids, np.ones(count, dtype=bool), scene)
+    for i in missing:
+        elems[i][layer] = int(pids[i])
+    return pids
+
+
+def assign_missing_pids_mesh(me, etype: str, mask: np.ndarray, scene) -> np.ndarray:
+    """
+    編集モード外のメッシュ用。PID属性を foreach_get で読み、
+    mask 内のPIDなし要素に連続したPIDを振って foreach_set で書き戻す。
+    PID配列（全要素分）を返す。
+    """
+    name, domain, size = {
+        "VERT": ("hm_vid", "POINT", len(me.vertices)),
+        "EDGE": ("hm_eid", "EDGE", len(me.edges)),
+        "FACE": ("hm_fid", "FACE", len(me.polygons)),
+    }[etype]
+
+    attr = me.attributes.get(name)
+    if attr is None:
+        attr = me.attributes.new(name, "INT", domain)
+
+    pids = np.empty(size, dtype=np.int32)
+    attr.data.foreach_get("value", pids)
+    missing = allocate_missing_pids(pids, np.asarray(mask, dtype=bool), scene)
+    if len(missing):
+        attr.data.foreach_set("value", pids)
+        me.update()
+    return pids
+
+
 def ensure_id_layers(bm: bmesh.types.BMesh) -> Tuple[Any, Any, Any]:
     """頂点/辺/面用の永続IDレイヤーを取得（なければ作成）。"""
 
@@ -108,8 +181,9 @@ def build_pid_maps(bm: bmesh.types.BMesh):
                 pid = int(elem[layer])
             except Exception:
                 continue
+            # 重複PIDは最初の要素を採る（PidArray / pid_repair と同じ）
             if pid > 0:
-                out_dict[pid] = elem
+                out_dict.setdefault(pid, elem)
 
     fill(v_layer, bm.verts, v_map)
     fill(e_layer, bm.edges, e_map)
@@ -0,0 +1,249 @@
+"""
+PID → 要素インデックス のキャッシュ。
+
+build_pid_maps は毎回すべての頂点/辺/面を Python で走査するため、
+適用・トグル・同期・プレビューのたびに O(メッシュサイズ) かかっていた。
+
+ここではメッシュデータブロックごとに「PID → 要素インデックス」を保持し、
+次の指紋（fingerprint）が一致する間は再利用する。
+- 編集モードかどうか
+- 頂点/辺/面の数
+- PIDレイヤーの有無
+- トポロジー世代カウンタ（ジオメトリ更新やPID付与で進める）
+
+BMesh の要素参照そのものは BMesh を開き直すと無効になるため、
+保持するのはインデックスのみ。参照時に要素のPIDを照合し、
+食い違えばその場で作り直す（並べ替えなど件数が変わらない編集への保険）。
+
+エントリ数と推定メモリ量の上限を超えたら古いものから捨てる（LRU）。
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set, Tuple
+
+import bmesh
+
+from ..utils.logging import log_exc
+
+# キャッシュ上限
+PID_CACHE_MAX_ENTRIES = 32
+PID_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# dict 1エントリあたりの概算バイト数（キー/値の int とハッシュテーブル分）
+_BYTES_PER_ENTRY = 120
+
+
+@dataclass
+class PidIndexMaps:
+    fingerprint: Tuple
+    v_index: Dict[int, int] = field(default_factory=dict)
+    e_index: Dict[int, int] = field(default_factory=dict)
+    f_index: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def nbytes(self) -> int:
+        return (len(self.v_index) + len(self.e_index) + len(self.f_index)) * _BYTES_PER_ENTRY
+
+
+_pid_cache: "OrderedDict[int, PidIndexMaps]" = OrderedDict()
+_cache_bytes = 0
+
+# メッシュごとのトポロジー世代
+_generations: Dict[int, int] = {}
+# 自分で書き戻した（非表示フラグのみ変更）メッシュ。次のジオメトリ更新通知を1回無視する
+_hide_only_writes: Set[int] = set()
+# メッシュごとの状態世代（非表示フラグを含む、あらゆる更新通知で進める）
+_state_generations: Dict[int, int] = {}
+
+
+def mesh_key(me) -> int:
+    """メッシュデータブロックを識別するキー（セッション中は一意）。"""
+    uid = getattr(me, "session_uid", 0)
+    return int(uid) if uid else int(me.as_pointer())
+
+
+def _get_layer(layer_group, name: str):
+    try:
+        return layer_group.get(name)
+    except Exception as e:
+        log_exc(f"pid_cache.get_layer.{name}", e)
+        return None
+
+
+def _fill_index(layer, elems) -> Dict[int, int]:
+    out: Dict[int, int] = {}
+    if layer is None:
+        return out
+    for i, elem in enumerate(elems):
+        try:
+            pid = int(elem[layer])
+        except Exception:
+            continue
+        # 重複PIDは最初の要素を採る（PidArray / pid_repair と同じ）
+        if pid > 0:
+            out.setdefault(pid, i)
+    return out
+
+
+class PidLookup:
+    """
+    PID → BMesh要素 を dict.get と同じ感覚で引くためのビュー。
+    キャッシュ済みのインデックスを使い、要素側のPIDと一致するか確認してから返す。
+    """
+
+    __slots__ = ("_seq", "_layer", "_index")
+
+    def __init__(self, seq, layer, index: Dict[int, int]):
+        self._seq = seq
+        self._layer = layer
+        self._index = index
+        if layer is not None and index:
+            seq.ensure_lookup_table()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, pid) -> bool:
+        return self.get(pid) is not None
+
+    def _rebuild(self) -> None:
+        # 同じ dict を書き換えるので、キャッシュ側のエントリも更新される
+        fresh = _fill_index(self._layer, self._seq)
+        self._index.clear()
+        self._index.update(fresh)
+        self._seq.ensure_lookup_table()
+
+    def _resolve(self, pid: int):
+        """見つかれば要素、未登録なら None、インデックスが古ければ False。"""
+        i = self._index.get(pid)
+        if i is None:
+            return None
+        try:
+            elem = self._seq[i]
+            if int(elem[self._layer]) == pid:
+                return elem
+        except Exception:
+            pass
+        return False
+
+    def get(self, pid, default=None):
+        if self._layer is None:
+            return default
+        elem = self._resolve(pid)
+        if elem is False:
+            self._rebuild()
+            elem = self._resolve(pid)
+        if elem is None or elem is False:
+            return default
+        return elem
+
+
+def _fingerprint(bm: bmesh.types.BMesh, me, is_edit: bool, layers) -> Tuple:
+    return (
+        bool(is_edit),
+        len(bm.verts),
+        len(bm.edges),
+        len(bm.faces),
+        tuple(layer is not None for layer in layers),
+        _generations.get(mesh_key(me), 0),
+    )
+
+
+def _evict() -> None:
+    global _cache_bytes
+    while _pid_cache and (
+        len(_pid_cache) > PID_CACHE_MAX_ENTRIES or _cache_bytes > PID_CACHE_MAX_BYTES
+    ):
+        _, old = _pid_cache.popitem(last=False)
+        _cache_bytes -= old.nbytes
+
+
+def get_pid_maps(bm: bmesh.types.BMesh, me, is_edit: bool):
+    """
+    build_pid_maps と同じ形 (v_map, e_map, f_map, v_layer, e_layer, f_layer) を返す。
+    マップは PidLookup（.get のみ対応）。指紋が一致すればインデックスを再利用する。
+    """
+    global _cache_bytes
+
+    v_layer = _get_layer(bm.verts.layers.int, "hm_vid")
+    e_layer = _get_layer(bm.edges.layers.int, "hm_eid")
+    f_layer = _get_layer(bm.faces.layers.int, "hm_fid")
+
+    key = mesh_key(me)
+    fp = _fingerprint(bm, me, is_edit, (v_layer, e_layer, f_layer))
+
+    entry: Optional[PidIndexMaps] = _pid_cache.get(key)
+    if entry is not None and entry.fingerprint == fp:
+        _pid_cache.move_to_end(key)
+    else:
+        if entry is not None:
+            _cache_bytes -= entry.nbytes
+        entry = PidIndexMaps(
+            fingerprint=fp,
+            v_index=_fill_index(v_layer, bm.verts),
+            e_index=_fill_index(e_layer, bm.edges),
+            f_index=_fill_index(f_layer, bm.faces),
+        )
+        _pid_cache[key] = entry
+        _cache_bytes += entry.nbytes
+        _evict()
+
+    return (
+        PidLookup(bm.verts, v_layer, entry.v_index),
+        PidLookup(bm.edges, e_layer, entry.e_index),
+        PidLookup(bm.faces, f_layer, entry.f_index),
+        v_layer,
+        e_layer,
+        f_layer,
+    )
+
+
+def mesh_generation(me) -> int:
+    """メッシュのトポロジー世代（他のキャッシュの検証用）。"""
+    return _generations.get(mesh_key(me), 0)
+
+
+def invalidate_pid_maps(me) -> None:
+    """PID付与やトポロジー変更をしたメッシュの世代を進める。"""
+    key = mesh_key(me)
+    _generations[key] = _generations.get(key, 0) + 1
+    _hide_only_writes.discard(key)
+
+
+def mark_hide_only_write(me) -> None:
+    """非表示フラグだけを書き戻したことを記録する（直後の更新通知で世代を進めない）。"""
+    _hide_only_writes.add(mesh_key(me))
+
+
+def mesh_state_generation(me) -> int:
+    """メッシュの状態世代。非表示フラグだけの変更でも進む（指紋のメモ化用）。"""
+    return _state_generations.get(mesh_key(me), 0)
+
+
+def on_mesh_update(me) -> None:
+    """depsgraph からメッシュ（またはその持ち主のオブジェクト）の更新が届いたときに呼ぶ。"""
+    key = mesh_key(me)
+    _state_generations[key] = _state_generations.get(key, 0) + 1
+
+
+def on_geometry_update(me) -> bool:
+    """
+    depsgraph からジオメトリ更新が届いたときに呼ぶ。
+    世代を進めた（自分の非表示書き戻しではない）なら True。
+    """
+    key = mesh_key(me)
+    if key in _hide_only_writes:
+        _hide_only_writes.discard(key)
+        return False
+    _generations[key] = _generations.get(key, 0) + 1
+    return True
+
+
+def clear_pid_cache() -> None:
+    global _cache_bytes
+    _pid_cache.clear()
+    _generations.clear()
+    _hide_only_writes.clear()
+    _state_generations.clear()
+    _cache_bytes = 0
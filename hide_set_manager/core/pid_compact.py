@@ -0,0 +1,228 @@
+"""
+PID の圧縮（密な範囲への振り直し）。
+
+scene.hm_next_elem_id は増える一方なので、要素の削除や再登録を繰り返すと
+メッシュ上のPIDはまばらになり、mesh_arrays の直接参照表が使えなくなる。
+
+ここでは全メッシュの使用中PID（> 0）を
+  メッシュ名順 → 頂点 / 辺 / 面 の順に、要素インデックス順で連続した範囲
+へ振り直し、全シーンの編集モードセットのメンバーを同じ対応表で書き換える。
+PID はシーン全体で一意のまま（メッシュの結合などで衝突しないように）で、
+各ドメインは [base, base + 件数) の密な範囲になる。
+
+- 重複PID（pid_repair 参照）は、最小インデックスの要素を元として対応付ける
+- メッシュ上に見つからないPIDのメンバー（オブジェクトやメッシュが見つからないものも）は、
+  旧PIDが新しい範囲と衝突するので取り除く
+- 編集モード中のメッシュは配列で書けない（旧PIDが残って衝突する）ので、1つでもあれば圧縮しない
+
+メッシュとセットを食い違ったまま残さないよう、全ての対応表と書き込む配列を先に計算し、
+それが全て成功してからメッシュ → セット → hm_next_elem_id の順に書き込む。
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import bpy
+import numpy as np
+
+from .mesh_arrays import ATTR_NAMES, domain_size, read_int_attribute
+from .packed_store import (
+    MemberGroup,
+    is_packed,
+    iter_member_groups,
+    write_groups,
+)
+from .pid_cache import mesh_key, invalidate_pid_maps, on_mesh_update
+from .registry import invalidate_member_index
+from .object_index import find_object
+from ..utils.logging import log_exc
+
+
+@dataclass
+class CompactionResult:
+    meshes: int = 0     # PIDを振り直したメッシュ
+    elements: int = 0   # 振り直した要素
+    members: int = 0    # 書き換えたメンバー
+    dropped: int = 0    # メッシュ上に見つからず取り除いたメンバー
+    next_pid: int = 1
+    written: bool = False  # メッシュかセットに書き込みを始めた（途中で失敗しても Undo が要る）
+
+
+class CompactionError(RuntimeError):
+    """書き込みの途中で失敗した。result.written なら一部は書き換え済み。"""
+
+    def __init__(self, message: str, result: CompactionResult):
+        super().__init__(message)
+        self.result = result
+
+
+class _DomainMap:
+    """旧PID（ソート済み・重複なし）→ 新PID。"""
+
+    __slots__ = ("old", "new")
+
+    def __init__(self, old: np.ndarray, new: np.ndarray):
+        self.old = old
+        self.new = new
+
+    def remap(self, pids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(新PID, 見つかったか) を返す。"""
+        pids = np.asarray(pids, dtype=np.int64)
+        if len(self.old) == 0:
+            return np.zeros(len(pids), dtype=np.int64), np.zeros(len(pids), dtype=bool)
+        pos = np.minimum(np.searchsorted(self.old, pids), len(self.old) - 1)
+        found = (self.old[pos] == pids) & (pids > 0)
+        return np.where(found, self.new[pos], 0), found
+
+
+def compact_domain(pids: np.ndarray, base: int) -> Tuple[np.ndarray, _DomainMap]:
+    """使用中PIDを base から連続した値へ振り直した配列と、旧 → 新 の対応表を返す。"""
+    pids = np.asarray(pids, dtype=np.int64)
+    positions = np.flatnonzero(pids > 0)
+    new = np.zeros(len(pids), dtype=np.int64)
+    new[positions] = np.arange(base, base + len(positions), dtype=np.int64)
+
+    # 重複PIDは最小インデックスの要素へ対応付ける（np.unique は最初の位置を返す）
+    old, first = np.unique(pids[positions], return_index=True)
+    return new, _DomainMap(old, new[positions[first]])
+
+
+# (メッシュ, 属性名 → 書き込むPID配列)
+_MeshWrite = Tuple[bpy.types.Mesh, Dict[str, np.ndarray]]
+
+
+def _plan_meshes(
+    next_pid: int, result: CompactionResult
+) -> Tuple[int, Dict[Tuple[int, str], _DomainMap], List[_MeshWrite]]:
+    """全メッシュの対応表と、書き込むPID配列を計算する（メッシュには書き込まない）。"""
+    maps: Dict[Tuple[int, str], _DomainMap] = {}
+    writes: List[_MeshWrite] = []
+    for me in sorted(bpy.data.meshes, key=lambda m: m.name):
+        attrs: Dict[str, np.ndarray] = {}
+        for etype, (name, _hide_name) in ATTR_NAMES.items():
+            pids = read_int_attribute(me, name, domain_size(me, etype))
+            if pids is None:
+                continue
+            new, dmap = compact_domain(pids, next_pid)
+            count = int(np.count_nonzero(pids > 0))
+            next_pid += count
+            maps[(mesh_key(me), etype)] = dmap
+            if count and not np.array_equal(new, pids):
+                attrs[name] = new.astype(np.int32)
+                result.elements += count
+        if attrs:
+            writes.append((me, attrs))
+    return next_pid, maps, writes
+
+
+def _write_meshes(writes: List[_MeshWrite], result: CompactionResult) -> None:
+    for me, attrs in writes:
+        result.written = True
+        for name, values in attrs.items():
+            me.attributes[name].data.foreach_set("value", values)
+        me.update()
+        invalidate_pid_maps(me)
+        on_mesh_update(me)
+        result.meshes += 1
+
+
+def _remap_group(group: MemberGroup, maps, result: CompactionResult) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (新PID, 残すマスク) を返す。
+    オブジェクトやPIDの対応表が無いメンバーも、旧PIDのままでは新しい範囲と衝突するので全て取り除く。
+    """
+    obj = find_object("", group.object_name)
+    dmap = None
+    if obj is not None and obj.type == "MESH":
+        dmap = maps.get((mesh_key(obj.data), group.element_type))
+    if dmap is None:
+        count = len(group.pids)
+        result.dropped += count
+        return np.zeros(count, dtype=np.int64), np.zeros(count, dtype=bool)
+    new, found = dmap.remap(group.pids)
+    result.members += int(np.count_nonzero(found))
+    result.dropped += int(np.count_nonzero(~found))
+    return new, found
+
+
+class _SetPlan:
+    """1つのセットの書き換え内容。計算だけ先に済ませ、write() で書き込む。"""
+
+    __slots__ = ("hide_set", "groups", "index", "drop")
+
+    def __init__(
+        self,
+        hide_set,
+        groups: Optional[List[MemberGroup]] = None,
+        index: Optional[np.ndarray] = None,
+        drop: Optional[List[int]] = None,
+    ):
+        self.hide_set = hide_set
+        self.groups = groups
+        self.index = index
+        self.drop = drop or []
+
+    def write(self) -> None:
+        if self.groups is not None:
+            write_groups(self.hide_set, self.groups)
+            return
+        # ELEMENTS ストレージ：index 列を foreach_set でまとめて書き、見つからない行を消す
+        elements = self.hide_set.elements
+        elements.foreach_set("index", self.index)
+        for row in sorted(self.drop, reverse=True):
+            elements.remove(row)
+        invalidate_member_index(elements)
+
+
+def _plan_hide_set(hide_set, maps, result: CompactionResult) -> _SetPlan:
+    groups = iter_member_groups(hide_set)
+    if is_packed(hide_set):
+        out: List[MemberGroup] = []
+        for g in groups:
+            new, keep = _remap_group(g, maps, result)
+            out.append(MemberGroup(g.object_name, g.element_type, new[keep], g.saved[keep]))
+        return _SetPlan(hide_set, groups=out)
+
+    elements = hide_set.elements
+    index = np.empty(len(elements), dtype=np.int32)
+    elements.foreach_get("index", index)
+    drop: List[int] = []
+    for g in groups:
+        new, keep = _remap_group(g, maps, result)
+        index[g.rows[keep]] = new[keep]
+        drop.extend(g.rows[~keep].tolist())
+    return _SetPlan(hide_set, index=index, drop=drop)
+
+
+def compact_pids() -> CompactionResult:
+    """
+    全メッシュのPIDを密な範囲へ振り直し、全シーンの編集モードセットを書き換える。
+    各シーンの hm_next_elem_id は振り直した範囲の直後にそろえる。
+    編集モード中のメッシュがあれば何もせず ValueError を投げる。
+    計算中の失敗は何も書き込まずにそのまま投げ、書き込み中の失敗は CompactionError を投げる。
+    """
+    editing = sorted(me.name for me in bpy.data.meshes if me.is_editmode)
+    if editing:
+        raise ValueError(f"編集モード中のメッシュがあります: {', '.join(editing)}")
+
+    result = CompactionResult()
+    next_pid, maps, mesh_writes = _plan_meshes(1, result)
+    plans = [
+        _plan_hide_set(hide_set, maps, result)
+        for scene in bpy.data.scenes
+        for hide_set in getattr(scene, "hm_edit_sets", ())
+    ]
+
+    try:
+        _write_meshes(mesh_writes, result)
+        for plan in plans:
+            result.written = True
+            plan.write()
+        for scene in bpy.data.scenes:
+            scene.hm_next_elem_id = next_pid
+    except Exception as e:
+        log_exc("pid_compact.write", e)
+        raise CompactionError(f"PIDの書き込み中に失敗しました: {e}", result) from e
+
+    result.next_pid = next_pid
+    return result
@@ -0,0 +1,149 @@
+"""
+重複PIDの検出と修復。
+
+押し出し / 複製 / 細分化などでは BMesh の int レイヤーも一緒にコピーされるため、
+hm_vid / hm_eid / hm_fid に同じPIDを持つ要素ができる。
+build_pid_maps は PID ごとに最後の要素だけを残すので、セットのメンバーが
+コピー側に付け替わったように見えてしまう。
+
+ここでは PID 配列に np.unique(return_counts=True) をかけて重複を見つけ、
+各PIDについて「インデックスが最も小さい要素」を元として残し、
+それ以外（コピー）に hm_next_elem_id から新しいPIDを振る。
+新しい要素は末尾に追加されるので、元の要素は常にインデックスの小さい側にある
+（mesh_arrays の searchsorted も同じPIDなら最初の要素を返す）。
+
+- 編集モード外 : depsgraph_update_post でジオメトリ更新のあったメッシュを記録し、
+                 タイマーでまとめて検査する（foreach_get / foreach_set のみ）
+- 編集モード   : BMesh のレイヤーは配列で読めないので、オペレーターから明示的に行う
+"""
+
+from typing import Dict
+
+import bmesh
+import bpy
+import numpy as np
+
+from .pid import reserve_pid_range
+from .pid_cache import invalidate_pid_maps, on_mesh_update
+from .mesh_arrays import ATTR_NAMES, domain_size, read_int_attribute
+from ..utils.logging import log_exc
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+# 検査待ちのメッシュ名 → シーン名
+_pending: Dict[str, str] = {}
+
+
+def duplicate_pid_copies(pids) -> np.ndarray:
+    """重複PIDを持つ要素のうち、元（最小インデックス）以外の位置を返す。"""
+    pids = np.asarray(pids)
+    if len(pids) < 2:
+        return _EMPTY
+    uniq, first, inverse, counts = np.unique(
+        pids, return_index=True, return_inverse=True, return_counts=True
+    )
+    dup = (counts > 1) & (uniq > 0)
+    if not dup.any():
+        return _EMPTY
+
+    keep = np.zeros(len(pids), dtype=bool)
+    keep[first] = True
+    return np.flatnonzero(dup[inverse] & ~keep)
+
+
+def _fresh_pids(scene, pids: np.ndarray, count: int) -> np.ndarray:
+    # カウンタが既存のPIDより後ろを指しているとは限らない（古いファイルなど）
+    max_pid = int(pids.max()) if len(pids) else 0
+    if max_pid >= scene.hm_next_elem_id:
+        scene.hm_next_elem_id = max_pid + 1
+    start = reserve_pid_range(scene, count)
+    return np.arange(start, start + count, dtype=np.int64)
+
+
+def repair_mesh_pids(me, scene) -> int:
+    """編集モード外のメッシュの重複PIDを直し、振り直した要素数を返す。"""
+    total = 0
+    for etype, (name, _hide_name) in ATTR_NAMES.items():
+        pids = read_int_attribute(me, name, domain_size(me, etype))
+        if pids is None:
+            continue
+        copies = duplicate_pid_copies(pids)
+        if not len(copies):
+            continue
+        pids[copies] = _fresh_pids(scene, pids, len(copies))
+        me.attributes[name].data.foreach_set("value", pids)
+        total += len(copies)
+
+    if total:
+        me.update()
+        invalidate_pid_maps(me)
+        on_mesh_update(me)
+    return total
+
+
+def repair_bmesh_pids(bm: bmesh.types.BMesh, scene) -> int:
+    """BMesh（編集モード）の重複PIDを直し、振り直した要素数を返す。"""
+    total = 0
+    for seq, name in ((bm.verts, "hm_vid"), (bm.edges, "hm_eid"), (bm.faces, "hm_fid")):
+        layer = seq.layers.int.get(name)
+        if layer is None:
+            continue
+        pids = np.fromiter((e[layer] for e in seq), dtype=np.int64, count=len(seq))
+        copies = duplicate_pid_copies(pids)
+        if not len(copies):
+            continue
+        seq.ensure_lookup_table()
+        for i, pid in zip(copies.tolist(), _fresh_pids(scene, pids, len(copies)).tolist()):
+            seq[i][layer] = pid
+        total += len(copies)
+    return total
+
+
+def repair_object_pids(obj, scene) -> int:
+    """オブジェクトのメッシュの重複PIDを直す（編集モードなら BMesh 経由）。"""
+    if obj is None or obj.type != "MESH":
+        return 0
+    me = obj.data
+    if obj.mode != "EDIT":
+        return repair_mesh_pids(me, scene)
+
+    bm = bmesh.from_edit_mesh(me)
+    count = repair_bmesh_pids(bm, scene)
+    if count:
+        bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
+        invalidate_pid_maps(me)
+        on_mesh_update(me)
+    return count
+
+
+def _run_pending():
+    pending = dict(_pending)
+    _pending.clear()
+    for me_name, scene_name in pending.items():
+        me = bpy.data.meshes.get(me_name)
+        scene = bpy.data.scenes.get(scene_name)
+        if me is None or scene is None or me.is_editmode:
+            continue
+        try:
+            repair_mesh_pids(me, scene)
+        except Exception as e:
+            log_exc("pid_repair.run_pending", e)
+    return None
+
+
+def queue_pid_check(me, scene) -> None:
+    """
+    ジオメトリが変わったメッシュを検査待ちにする（depsgraph ハンドラ用）。
+    ハンドラの中ではデータを書き換えず、タイマーで後からまとめて直す。
+    """
+    if me.is_editmode or scene is None:
+        return
+    _pending[me.name] = scene.name
+    if not bpy.app.timers.is_registered(_run_pending):
+        bpy.app.timers.register(_run_pending, first_interval=0.0)
+
+
+def cancel_pid_checks() -> None:
+    _pending.clear()
+    if bpy.app.timers.is_registered(_run_pending):
+        bpy.app.timers.unregister(_run_pending)
@@ -1,17 +1,32 @@
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import bpy
 
 from ..utils.safe_hidden import safe_get_hidden
 from ..utils.logging import log_exc
 from .bmesh_ops import process_bmesh
-from .pid import build_pid_maps
+from .pid_cache import get_pid_maps
+from .mesh_arrays import can_use_arrays, members_all_hidden
+from .object_index import ensure_object_uid, find_object, resolve_object_ref
+from .packed_store import (
+    STORAGE_ELEMENTS,
+    STORAGE_PACKED,
+    ElementGroup,
+    MemberGroup,
+    is_packed,
+    read_groups,
+    element_groups,
+    invalidate_element_groups,
+    add_members_packed,
+)
 
 
 class HM_ElementRef(bpy.types.PropertyGroup):
     """1つの要素（またはオブジェクト）への参照情報"""
 
     object_name: bpy.props.StringProperty(default="")
+    # オブジェクトメンバーの安定ID（オブジェクトのカスタムプロパティ "hm_uid"）。名前変更に追従する
+    object_uid: bpy.props.StringProperty(default="")
     element_type: bpy.props.EnumProperty(
         items=[
             ("VERT", "頂点", ""),
@@ -41,13 +56,61 @@ class HM_HideSet(bpy.types.PropertyGroup):
         default="VERT",
     )
     elements: bpy.props.CollectionProperty(type=HM_ElementRef)
+    # メンバーの保存方式（PACKED は IDプロパティ "hm_members" にパック配列で保存）
+    storage: bpy.props.EnumProperty(
+        items=[
+            (STORAGE_ELEMENTS, "要素コレクション", ""),
+            (STORAGE_PACKED, "パック配列", ""),
+        ],
+        default=STORAGE_ELEMENTS,
+    )
+    # 展開ルール（core/expansion.py）
+    expand_rule: bpy.props.EnumProperty(
+        name="展開",
+        items=[
+            ("FACES", "接続面", "メンバーと直接接続された面"),
+            ("RINGS", "Nリング", "さらに指定したリング数だけ周囲の面へ広げる"),
+            ("ISLAND", "アイランド", "面でつながった島全体へ広げる"),
+        ],
+        default="FACES",
+    )
+    expand_rings: bpy.props.IntProperty(name="リング数", default=1, min=1, max=1000)
+    # ISLAND の上限リング数（0 = 無制限）
+    expand_ring_limit: bpy.props.IntProperty(name="上限リング数", default=0, min=0)
+    # パネルでチェックしたセットをまとめて操作する（HM_BatchHideSets）
+    batch_selected: bpy.props.BoolProperty(name="まとめて操作", default=False)
 
 
-def split_items_by_object(hide_set: HM_HideSet) -> Dict[str, List[HM_ElementRef]]:
-    """同じオブジェクトごとに要素をまとめる。"""
-    result: Dict[str, List[HM_ElementRef]] = {}
-    for it in hide_set.elements:
-        result.setdefault(it.object_name, []).append(it)
+def split_items_by_object(hide_set: HM_HideSet) -> Dict[str, MemberGroup]:
+    """
+    同じオブジェクトごとに要素をまとめる。
+    値は MemberGroup（HM_ElementRef と同じ属性で反復できる）。
+    ELEMENTS ストレージでも foreach_get でまとめて読んだ ElementGroup を返す。
+    """
+    if is_packed(hide_set):
+        return {g.object_name: g for g in read_groups(hide_set)}
+    return {g.object_name: g for g in element_groups(hide_set)}
+
+
+def object_members(
+    hide_set: HM_HideSet, update: bool = False
+) -> List[Tuple[Optional[bpy.types.Object], ElementGroup]]:
+    """
+    オブジェクトモードセットのメンバーを (オブジェクト or None, ElementGroup) で返す。
+    update=True（オペレーター内）なら、名前の変わったオブジェクトや uid の無いメンバーを
+    該当する行だけ書き直す。
+    """
+    result = []
+    changed = False
+    for g in element_groups(hide_set):
+        obj = find_object(g.uid, g.object_name)
+        if obj is not None and update and (not g.uid or obj.name != g.object_name):
+            for row in g.rows.tolist():
+                resolve_object_ref(hide_set.elements[row], update=True)
+            changed = True
+        result.append((obj, g))
+    if changed:
+        invalidate_member_index(hide_set.elements)
     return result
 
 
@@ -62,21 +125,114 @@ def ensure_objects_in_edit_mode(context) -> List[bpy.types.Object]:
     return list(context.selected_objects)
 
 
-def add_item_unique(collection, obj_name: str, elem_type: str, pid: int, saved_hidden: bool) -> bool:
-    """同じ (オブジェクト, タイプ, ID) があれば追加しない。"""
-    key = (obj_name, elem_type, int(pid))
-    for it in collection:
-        if (it.object_name, it.element_type, it.index) == key:
-            return False
+# ----------------------------------------------------------------------
+# メンバー索引（(オブジェクト, タイプ, ID) のハッシュ集合）
+# ----------------------------------------------------------------------
+MemberKey = Tuple[str, str, int]
+
+
+class _MemberIndex:
+    __slots__ = ("keys", "length")
+
+    def __init__(self, keys: Set[MemberKey], length: int):
+        self.keys = keys
+        self.length = length
+
+
+_member_indices: Dict[Tuple[int, str], _MemberIndex] = {}
+
+
+def _collection_key(collection) -> Tuple[int, str]:
+    return (collection.id_data.as_pointer(), collection.path_from_id())
+
+
+def get_member_index(collection) -> Set[MemberKey]:
+    """
+    コレクションのメンバー集合を返す。
+    要素数が変わっていれば（このモジュール外で追加/削除された）作り直す。
+    """
+    key = _collection_key(collection)
+    index = _member_indices.get(key)
+    if index is None or index.length != len(collection):
+        keys = {(it.object_name, it.element_type, it.index) for it in collection}
+        index = _MemberIndex(keys, len(collection))
+        _member_indices[key] = index
+    return index.keys
 
+
+def invalidate_member_index(collection=None) -> None:
+    """メンバー索引（と ELEMENTS ストレージの一括読み込みキャッシュ）を破棄する。引数なしなら全て。"""
+    invalidate_element_groups(collection)
+    if collection is None:
+        _member_indices.clear()
+        return
+    _member_indices.pop(_collection_key(collection), None)
+
+
+def _add_item(collection, obj_name: str, elem_type: str, pid: int, saved_hidden: bool) -> None:
     new_item: HM_ElementRef = collection.add()
     new_item.object_name = obj_name
     new_item.element_type = elem_type
     new_item.index = int(pid)
     new_item.saved_hidden = bool(saved_hidden)
+    if elem_type == "OBJECT":
+        obj = find_object("", obj_name)
+        if obj is not None:
+            new_item.object_uid = ensure_object_uid(obj)
+
+
+def add_item_unique(collection, obj_name: str, elem_type: str, pid: int, saved_hidden: bool) -> bool:
+    """同じ (オブジェクト, タイプ, ID) があれば追加しない。"""
+    keys = get_member_index(collection)
+    key = (obj_name, elem_type, int(pid))
+    if key in keys:
+        return False
+
+    _add_item(collection, obj_name, elem_type, pid, saved_hidden)
+    keys.add(key)
+    _member_indices[_collection_key(collection)].length = len(collection)
     return True
 
 
+def add_items_bulk(
+    collection,
+    obj_name: str,
+    elem_type: str,
+    pids: Iterable[int],
+    saved_hidden: Iterable[bool],
+) -> int:
+    """
+    同じオブジェクト・タイプの要素をまとめて追加する（重複は1回の走査で除外）。
+    追加した数を返す。
+    """
+    keys = get_member_index(collection)
+
+    added = 0
+    for pid, hidden in zip(pids, saved_hidden):
+        key = (obj_name, elem_type, int(pid))
+        if key in keys:
+            continue
+        keys.add(key)
+        _add_item(collection, obj_name, elem_type, pid, hidden)
+        added += 1
+
+    _member_indices[_collection_key(collection)].length = len(collection)
+    return added
+
+
+def add_members(
+    hide_set: HM_HideSet,
+    obj_name: str,
+    elem_type: str,
+    pids: Iterable[int],
+    saved_hidden: Iterable[bool],
+) -> int:
+    """セットのストレージに合わせてメンバーをまとめて追加する。"""
+    if is_packed(hide_set):
+        return add_members_packed(hide_set, obj_name, elem_type, pids, saved_hidden)
+    return add_items_bulk(hide_set.elements, obj_name, elem_type, pids, saved_hidden)
+
+
 def get_mode_label(mode: str) -> str:
     mapping = {
         "VERT": "頂点",
@@ -93,8 +249,7 @@ def hide_set_is_completely_hidden(hide_set: HM_HideSet, context) -> bool:
     # オブジェクトモード
     if hide_set.mode == "OBJECT":
         any_obj = False
-        for it in hide_set.elements:
-            obj = bpy.data.objects.get(it.object_name)
+        for obj, _group in object_members(hide_set):
             if not obj:
                 continue
             any_obj = True
@@ -116,12 +271,22 @@ def hide_set_is_completely_hidden(hide_set: HM_HideSet, context) -> bool:
         if not obj:
             continue
 
+        # 編集モード外は BMesh に変換せず属性配列を直接読む
+        if can_use_arrays(obj, edit_objs):
+            try:
+                if not members_all_hidden(obj.data, items):
+                    all_hidden = False
+                    break
+                continue
+            except Exception as e:
+                log_exc("hide_set_is_completely_hidden.arrays", e)
+
         def _check(bm):
             nonlocal all_hidden
             try:
-                v_map, e_map, f_map, *_ = build_pid_maps(bm)
+                v_map, e_map, f_map, *_ = get_pid_maps(bm, obj.data, obj in edit_objs)
             except Exception as e:
-                log_exc("hide_set_is_completely_hidden.build_pid_maps", e)
+                log_exc("hide_set_is_completely_hidden.get_pid_maps", e)
                 all_hidden = False
                 return
 
@@ -143,7 +308,7 @@ def hide_set_is_completely_hidden(hide_set: HM_HideSet, context) -> bool:
                     all_hidden = False
                     break
 
-        process_bmesh(obj, edit_objs, _check)
+        process_bmesh(obj, edit_objs, _check, readonly=True)
         if not all_hidden:
             break
 
@@ -0,0 +1,364 @@
+"""
+オブジェクト / 要素 → それを含むセット の逆引き索引。
+
+「このオブジェクト（選択中の面）を参照しているセットはどれか」を知るには、
+これまで hm_edit_sets / hm_object_sets の全メンバーを走査するしかなかった。
+
+ここではセットごとに
+- 参照しているオブジェクト名（uid を持つオブジェクトメンバーは uid）
+- (オブジェクト, 要素タイプ) ごとのソート済みPID配列
+をまとめたエントリを持ち、メンバー構成の指紋（オブジェクト名・uid・PID列のハッシュ）が
+変わったセットのエントリだけを作り直す（saved_hidden だけの変更では作り直さない）。
+オブジェクトメンバーを uid で引くので、名前を変えたオブジェクトも Sync 前後どちらでも見つかる。
+(オブジェクト, タイプ) ごとの「PID → セット」配列は、寄与するセットが変わったときだけ
+連結し直し、問い合わせは searchsorted で行う。
+
+セットやメンバー構成を変えるオペレーターが invalidate_reverse_index() で dirty にする
+（シーン更新のたびに検証し直すことはしない）。
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+import bmesh
+import numpy as np
+
+from .packed_store import (
+    is_packed,
+    iter_raw_groups,
+    decode_pids,
+    element_groups,
+    read_groups,
+    write_groups,
+)
+from .registry import ensure_objects_in_edit_mode, invalidate_member_index
+from .object_index import find_object, object_uid
+from .pid_cache import mesh_key, mesh_generation, mesh_state_generation
+from ..utils.logging import log_exc
+
+# (リスト種別 "EDIT" / "OBJECT", セットのインデックス)
+SetRef = Tuple[str, int]
+
+_LIST_TYPES = (("EDIT", "hm_edit_sets"), ("OBJECT", "hm_object_sets"))
+
+
+@dataclass
+class _SetEntry:
+    signature: Tuple
+    # オブジェクト名 → 要素タイプ → ソート済み・重複なしPID（uid の無い OBJECT メンバーは空配列）
+    members: Dict[str, Dict[str, np.ndarray]] = field(default_factory=dict)
+    # uid を持つオブジェクトメンバーの uid → 保存されている名前（名前ではなく uid で引く）
+    uids: Dict[str, str] = field(default_factory=dict)
+
+
+class _ReverseIndex:
+    def __init__(self):
+        self.entries: Dict[int, _SetEntry] = {}
+        # セットのポインタ → SetRef（refresh のたびに振り直す）
+        self.refs: Dict[int, SetRef] = {}
+        self.by_object: Dict[str, Set[int]] = {}
+        self.by_uid: Dict[str, Set[int]] = {}
+        # (オブジェクト, タイプ) → (ソート済みPID, 対応するセットのポインタ)
+        self.buckets: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+        self.scene_ptr = 0
+        self.dirty = True
+        self.version = 0
+
+
+_index = _ReverseIndex()
+
+
+def _signature(hide_set) -> Tuple:
+    h = hashlib.blake2b(digest_size=16)
+    if not is_packed(hide_set):
+        # 一括読み込みキャッシュ（名前の書き換えや行の削除で破棄される）の内容から作る
+        for g in element_groups(hide_set):
+            h.update(g.object_name.encode())
+            h.update(b"\0")
+            h.update(g.uid.encode())
+            h.update(b"\0")
+            h.update(len(g.pids).to_bytes(8, "little"))
+            h.update(np.ascontiguousarray(g.pids, dtype=np.int64).tobytes())
+        return ("ELEMENTS", hide_set.mode, h.hexdigest())
+    for obj_name, etype, count, pid_bytes, _bits in iter_raw_groups(hide_set):
+        h.update(obj_name.encode())
+        h.update(b"\0")
+        h.update(etype.encode())
+        h.update(count.to_bytes(8, "little"))
+        h.update(pid_bytes)
+    return ("PACKED", hide_set.mode, h.hexdigest())
+
+
+def _build_entry(hide_set, signature: Tuple) -> _SetEntry:
+    entry = _SetEntry(signature)
+    if is_packed(hide_set):
+        for obj_name, etype, count, pid_bytes, _bits in iter_raw_groups(hide_set):
+            pids = decode_pids(pid_bytes)[:count].astype(np.int64)
+            prev = entry.members.setdefault(obj_name, {}).get(etype)
+            if prev is not None:
+                pids = np.concatenate([prev, pids])
+            entry.members[obj_name][etype] = np.unique(pids)
+        return entry
+
+    for g in element_groups(hide_set):
+        if g.element_type == "OBJECT":
+            if g.uid:
+                entry.uids[g.uid] = g.object_name
+                continue
+            arr = np.empty(0, dtype=np.int64)
+        else:
+            arr = np.unique(g.pids)
+        entry.members.setdefault(g.object_name, {})[g.element_type] = arr
+    return entry
+
+
+def _drop_entry(idx: _ReverseIndex, ptr: int, entry: _SetEntry) -> None:
+    for uid in entry.uids:
+        owners = idx.by_uid.get(uid)
+        if owners is not None:
+            owners.discard(ptr)
+            if not owners:
+                del idx.by_uid[uid]
+    for obj_name, by_type in entry.members.items():
+        owners = idx.by_object.get(obj_name)
+        if owners is not None:
+            owners.discard(ptr)
+            if not owners:
+                del idx.by_object[obj_name]
+        for etype in by_type:
+            idx.buckets.pop((obj_name, etype), None)
+
+
+def _add_entry(idx: _ReverseIndex, ptr: int, entry: _SetEntry) -> None:
+    idx.entries[ptr] = entry
+    for uid in entry.uids:
+        idx.by_uid.setdefault(uid, set()).add(ptr)
+    for obj_name, by_type in entry.members.items():
+        idx.by_object.setdefault(obj_name, set()).add(ptr)
+        for etype in by_type:
+            idx.buckets.pop((obj_name, etype), None)
+
+
+def refresh_reverse_index(scene) -> None:
+    """メンバー構成が変わったセットのエントリだけを作り直す。"""
+    idx = _index
+    if scene.as_pointer() != idx.scene_ptr:
+        invalidate_reverse_index(full=True)
+        idx.scene_ptr = scene.as_pointer()
+    if not idx.dirty:
+        return
+
+    seen: Set[int] = set()
+    idx.refs.clear()
+    for list_type, attr in _LIST_TYPES:
+        for i, hide_set in enumerate(getattr(scene, attr)):
+            ptr = hide_set.as_pointer()
+            seen.add(ptr)
+            idx.refs[ptr] = (list_type, i)
+            try:
+                sig = _signature(hide_set)
+                old = idx.entries.get(ptr)
+                if old is not None and old.signature == sig:
+                    continue
+                if old is not None:
+                    _drop_entry(idx, ptr, old)
+                _add_entry(idx, ptr, _build_entry(hide_set, sig))
+            except Exception as e:
+                log_exc("reverse_index.refresh", e)
+
+    for ptr in [p for p in idx.entries if p not in seen]:
+        _drop_entry(idx, ptr, idx.entries.pop(ptr))
+
+    idx.dirty = False
+    idx.version += 1
+
+
+def invalidate_reverse_index(full: bool = False) -> None:
+    """セットが変わったかもしれないときに呼ぶ。full=True なら全エントリを捨てる。"""
+    if full:
+        _index.entries.clear()
+        _index.refs.clear()
+        _index.by_object.clear()
+        _index.by_uid.clear()
+        _index.buckets.clear()
+    _index.dirty = True
+
+
+def _bucket(obj_name: str, etype: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    idx = _index
+    key = (obj_name, etype)
+    cached = idx.buckets.get(key)
+    if cached is not None:
+        return cached
+
+    pids, owners = [], []
+    for ptr in idx.by_object.get(obj_name, ()):
+        arr = idx.entries[ptr].members.get(obj_name, {}).get(etype)
+        if arr is not None and len(arr):
+            pids.append(arr)
+            owners.append(np.full(len(arr), ptr, dtype=np.int64))
+    if not pids:
+        return None
+
+    all_pids = np.concatenate(pids)
+    all_owners = np.concatenate(owners)
+    order = np.argsort(all_pids, kind="stable")
+    idx.buckets[key] = (all_pids[order], all_owners[order])
+    return idx.buckets[key]
+
+
+def _to_refs(ptrs) -> List[SetRef]:
+    return sorted(_index.refs[p] for p in set(ptrs) if p in _index.refs)
+
+
+def _owners_of_object(obj_name: str, obj=None) -> Set[int]:
+    """名前で参照しているセットと、uid で参照しているセット（obj が無ければ名前から引く）。"""
+    ptrs = set(_index.by_object.get(obj_name, ()))
+    if obj is None and _index.by_uid:
+        obj = find_object("", obj_name)
+    if obj is not None:
+        uid = object_uid(obj)
+        if uid:
+            ptrs |= _index.by_uid.get(uid, set())
+    return ptrs
+
+
+def sets_containing_object(scene, obj_name: str) -> List[SetRef]:
+    """オブジェクト（またはその要素）を参照しているセット。"""
+    refresh_reverse_index(scene)
+    return _to_refs(_owners_of_object(obj_name))
+
+
+def sets_containing_elements(scene, obj_name: str, etype: str, pids) -> List[SetRef]:
+    """PID のどれか1つでも含むセット。"""
+    refresh_reverse_index(scene)
+    bucket = _bucket(obj_name, etype)
+    pids = np.asarray(pids, dtype=np.int64)
+    if bucket is None or len(pids) == 0:
+        return []
+    sorted_pids, owners = bucket
+    lo = np.searchsorted(sorted_pids, pids, side="left")
+    hi = np.searchsorted(sorted_pids, pids, side="right")
+    hit = hi > lo
+    if not hit.any():
+        return []
+    # 一致した区間のセットを全て集める
+    lo, hi = lo[hit], hi[hit]
+    lengths = hi - lo
+    ends = np.cumsum(lengths)
+    pos = np.repeat(lo - (ends - lengths), lengths) + np.arange(ends[-1])
+    return _to_refs(np.unique(owners[pos]).tolist())
+
+
+def _selected_pids(bm: bmesh.types.BMesh, etype: str) -> np.ndarray:
+    seq, name = {
+        "VERT": (bm.verts, "hm_vid"),
+        "EDGE": (bm.edges, "hm_eid"),
+        "FACE": (bm.faces, "hm_fid"),
+    }[etype]
+    layer = seq.layers.int.get(name)
+    if layer is None:
+        return np.empty(0, dtype=np.int64)
+    return np.fromiter((e[layer] for e in seq if e.select), dtype=np.int64)
+
+
+# 選択から求めた結果のキャッシュ（パネルの再描画ごとに BMesh を読まない）
+_selection_cache: Dict[str, Tuple[Tuple, List[SetRef]]] = {}
+
+
+def sets_containing_selection(context) -> List[SetRef]:
+    """
+    選択を含むセット。
+    編集モード : 選択中の頂点/辺/面のどれかを含む編集モードセット
+    それ以外   : 選択中のオブジェクトを参照するセット（両方のリスト）
+    """
+    scene = context.scene
+    refresh_reverse_index(scene)
+
+    if context.mode != "EDIT_MESH":
+        ptrs: Set[int] = set()
+        for obj in context.selected_objects:
+            ptrs |= _owners_of_object(obj.name, obj)
+        return _to_refs(ptrs)
+
+    objs = [o for o in ensure_objects_in_edit_mode(context) if o.type == "MESH"]
+    key = (
+        _index.version,
+        tuple((o.name, mesh_key(o.data), mesh_generation(o.data), mesh_state_generation(o.data)) for o in objs),
+    )
+    cached = _selection_cache.get("EDIT")
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    found: Set[SetRef] = set()
+    for obj in objs:
+        by_type = [etype for etype in ("VERT", "EDGE", "FACE") if _bucket(obj.name, etype) is not None]
+        if not by_type:
+            continue
+        try:
+            bm = bmesh.from_edit_mesh(obj.data)
+            for etype in by_type:
+                found.update(sets_containing_elements(scene, obj.name, etype, _selected_pids(bm, etype)))
+        except Exception as e:
+            log_exc("reverse_index.sets_containing_selection", e)
+
+    result = sorted(r for r in found if r[0] == "EDIT")
+    _selection_cache["EDIT"] = (key, result)
+    return result
+
+
+def cleanup_deleted_objects(scene) -> int:
+    """
+    削除されたオブジェクトのメンバーを、それを参照しているセットからだけ取り除く。
+    取り除いたメンバー数を返す。
+    """
+    refresh_reverse_index(scene)
+
+    def _stored_name(uid: str) -> str:
+        return next(_index.entries[p].uids[uid] for p in _index.by_uid[uid])
+
+    gone_names = {name for name in _index.by_object if find_object("", name) is None}
+    gone_uids = {uid for uid in _index.by_uid if find_object(uid, _stored_name(uid)) is None}
+    if not gone_names and not gone_uids:
+        return 0
+
+    targets: Set[int] = set()
+    for name in gone_names:
+        targets |= _index.by_object[name]
+    for uid in gone_uids:
+        targets |= _index.by_uid[uid]
+
+    def _gone(g) -> bool:
+        return g.uid in gone_uids if g.uid else g.object_name in gone_names
+
+    removed = 0
+    for ptr in targets:
+        list_type, i = _index.refs[ptr]
+        hide_set = getattr(scene, dict(_LIST_TYPES)[list_type])[i]
+        try:
+            if is_packed(hide_set):
+                groups = read_groups(hide_set)
+                keep = [g for g in groups if g.object_name not in gone_names]
+                removed += sum(len(g) for g in groups) - sum(len(g) for g in keep)
+                write_groups(hide_set, keep)
+                continue
+            drop = sorted(
+                row for g in element_groups(hide_set) if _gone(g) for row in g.rows.tolist()
+            )
+            for j in reversed(drop):
+                hide_set.elements.remove(j)
+            removed += len(drop)
+            if drop:
+                invalidate_member_index(hide_set.elements)
+        except Exception as e:
+            log_exc("reverse_index.cleanup_deleted_objects", e)
+
+    invalidate_reverse_index()
+    return removed
+
+
+def clear_reverse_index() -> None:
+    invalidate_reverse_index(full=True)
+    _index.scene_ptr = 0
+    _selection_cache.clear()
@@ -0,0 +1,137 @@
+"""
+UIパネル用の状態キャッシュ。
+
+パネルの draw() は再描画のたびに呼ばれるため、
+「完全に非表示か」「同期が必要か」をその都度 BMesh から計算すると
+大きなメッシュではビューポートが固まる。
+
+ここでは (セット, オブジェクト) 単位で結果を保持し、
+depsgraph_update_post / undo / redo / load_post ハンドラ（core/handlers.py）で無効化する。
+draw() 側は get_hide_set_status() を呼ぶだけ（通常は辞書参照のみ）。
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set, Tuple
+
+import bpy
+
+from .registry import HM_HideSet, split_items_by_object, hide_set_is_completely_hidden
+from .packed_store import member_count
+from .diff import preview_hide_set_diff
+from .bmesh_ops import bmesh_session
+from ..utils.logging import log_exc
+
+
+@dataclass
+class HideSetStatus:
+    completely_hidden: bool = False
+    needs_sync: bool = False
+    member_count: int = 0
+    # オブジェクト名 → メンバー数
+    object_counts: Dict[str, int] = field(default_factory=dict)
+
+
+StatusKey = Tuple[int, str, str, int]
+
+_status_cache: Dict[StatusKey, HideSetStatus] = {}
+# オブジェクト名 / メッシュ名 → そのIDを参照しているキャッシュキー
+_keys_by_object: Dict[str, Set[StatusKey]] = {}
+_keys_by_mesh: Dict[str, Set[StatusKey]] = {}
+
+
+def _status_key(hide_set: HM_HideSet) -> StatusKey:
+    """
+    セットを識別するキー。
+    コレクションの追加/削除でポインタが再利用されても取り違えないよう、
+    名前・モード・要素数も含める。
+    """
+    return (hide_set.as_pointer(), hide_set.name, hide_set.mode, member_count(hide_set))
+
+
+def _compute_status(context, hide_set: HM_HideSet) -> HideSetStatus:
+    status = HideSetStatus()
+    status.member_count = member_count(hide_set)
+    status.object_counts = {
+        name: len(items) for name, items in split_items_by_object(hide_set).items()
+    }
+
+    try:
+        status.completely_hidden = hide_set_is_completely_hidden(hide_set, context)
+    except Exception as e:
+        log_exc("status_cache.completely_hidden", e)
+
+    try:
+        status.needs_sync = preview_hide_set_diff(context, hide_set).has_changes
+    except Exception as e:
+        log_exc("status_cache.needs_sync", e)
+
+    return status
+
+
+def get_hide_set_status(context, hide_set: HM_HideSet) -> HideSetStatus:
+    """キャッシュ済みの状態を返す。なければ計算して登録する。"""
+    key = _status_key(hide_set)
+    status = _status_cache.get(key)
+    if status is not None:
+        return status
+
+    status = _compute_status(context, hide_set)
+    _status_cache[key] = status
+
+    for obj_name in status.object_counts:
+        _keys_by_object.setdefault(obj_name, set()).add(key)
+        obj = bpy.data.objects.get(obj_name)
+        me = getattr(obj, "data", None) if obj else None
+        if isinstance(me, bpy.types.Mesh):
+            _keys_by_mesh.setdefault(me.name, set()).add(key)
+
+    return status
+
+
+def peek_hide_set_status(hide_set: HM_HideSet) -> Optional[HideSetStatus]:
+    """キャッシュ済みの状態があれば返す（計算はしない）。"""
+    return _status_cache.get(_status_key(hide_set))
+
+
+def prefetch_hide_set_status(context, hide_sets) -> None:
+    """
+    キャッシュに無いセットの状態をまとめて計算する。
+    同じメッシュを参照するセットの間で BMesh を共有する（読み取りのみ）。
+    """
+    missing = [hs for hs in hide_sets if _status_key(hs) not in _status_cache]
+    if not missing:
+        return
+    with bmesh_session():
+        for hs in missing:
+            get_hide_set_status(context, hs)
+
+
+def _drop_keys(keys) -> None:
+    for key in keys:
+        _status_cache.pop(key, None)
+
+
+def invalidate_hide_set_status(obj_name: str = "", mesh_name: str = "") -> None:
+    """
+    キャッシュを無効化する。
+    名前を指定しなければ全体、指定すればそのオブジェクト/メッシュを含むセットのみ。
+    """
+    if not obj_name and not mesh_name:
+        _status_cache.clear()
+        _keys_by_object.clear()
+        _keys_by_mesh.clear()
+        return
+
+    if obj_name:
+        _drop_keys(_keys_by_object.pop(obj_name, ()))
+    if mesh_name:
+        _drop_keys(_keys_by_mesh.pop(mesh_name, ()))
+
+
+def invalidate_object_set_status() -> None:
+    """
+    オブジェクトモードセットの状態だけを無効化する。
+    オブジェクトの表示切り替えはシーン更新としてしか届かないため、シーン更新で呼ぶ
+    （編集モードセットはメッシュ / オブジェクト単位の無効化で足りる）。
+    """
+    _drop_keys([key for key in _status_cache if key[2] == "OBJECT"])
@@ -0,0 +1,147 @@
+"""
+編集モードセット用のトグルエンジン。
+
+以前の HM_ToggleHideSet は
+1. 全オブジェクトで BMesh を開き PID マップを作って「表示中の要素があるか」を判定
+2. もう一度全オブジェクトで BMesh を開き PID マップを作って適用
+という2周の処理だった。
+
+ここでは1つの BMesh セッションの中で
+- パネル用の状態キャッシュがあれば、それで判定（メッシュを見ない）
+- 無ければ表示中の要素が見つかった時点で判定を打ち切る
+- 判定で解決した要素はそのまま適用に使い回す
+ことで、オブジェクトごとの変換は最大1回にする。
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import bpy
+
+from .registry import HM_HideSet, split_items_by_object, ensure_objects_in_edit_mode
+from .bmesh_ops import bmesh_session, hide_members_on_bmesh
+from .pid_cache import get_pid_maps
+from .mesh_arrays import can_use_arrays, members_all_hidden
+from .array_apply import apply_hide_arrays, restore_saved_hidden_arrays
+from .status_cache import peek_hide_set_status
+from .expansion import ExpansionRule, rule_from_hide_set
+from ..utils.safe_hidden import safe_set_hidden
+from ..utils.logging import log_exc
+
+
+def resolve_elements(bm, obj, items, edit_objs) -> List[Tuple[object, bool]]:
+    """メンバーを (BMesh要素, saved_hidden) の列に解決する。"""
+    v_map, e_map, f_map, *_ = get_pid_maps(bm, obj.data, obj in edit_objs)
+    maps = {"VERT": v_map, "EDGE": e_map, "FACE": f_map}
+
+    resolved: List[Tuple[object, bool]] = []
+    for it in items:
+        lookup = maps.get(it.element_type)
+        if lookup is None:
+            continue
+        elem = lookup.get(int(it.index))
+        if elem is not None:
+            resolved.append((elem, bool(it.saved_hidden)))
+    return resolved
+
+
+def restore_saved_on_bmesh(
+    bm,
+    obj,
+    edit_objs,
+    items,
+    elems: Optional[List[Tuple[object, bool]]] = None,
+    rule: Optional[ExpansionRule] = None,
+) -> bool:
+    """
+    メンバーを saved_hidden の状態へ戻す。elems に解決済みの要素があればそれを使う。
+    展開ルールがある場合は、広げた範囲もメンバーの saved_hidden に合わせて 表示 / 非表示 にする。
+    """
+    if elems is None:
+        elems = resolve_elements(bm, obj, items, edit_objs)
+    changed = False
+    for elem, saved in elems:
+        if elem.hide != saved:
+            changed = True
+        safe_set_hidden(elem, saved)
+
+    if rule is not None:
+        for hide_flag in (False, True):
+            subset = [it for it in items if bool(it.saved_hidden) == hide_flag]
+            if subset and hide_members_on_bmesh(bm, obj, edit_objs, subset, hide_flag, rule):
+                changed = True
+    return changed
+
+
+def toggle_edit_hide_set(context, hide_set: HM_HideSet) -> Optional[bool]:
+    """
+    編集モードセットをトグルする。
+    非表示にしたら True、saved_hidden の状態へ戻したら False、
+    メンバーが無ければ None を返す。
+    """
+    items_by_object = split_items_by_object(hide_set)
+    if not items_by_object:
+        return None
+    rule = rule_from_hide_set(hide_set)
+
+    edit_objs = set(ensure_objects_in_edit_mode(context))
+    targets = []
+    for obj_name, items in items_by_object.items():
+        obj = bpy.data.objects.get(obj_name)
+        if obj is not None and obj.type == "MESH":
+            targets.append((obj, items))
+
+    # 判定時に解決した BMesh 要素（オブジェクト名 → 要素列）
+    resolved: Dict[str, List[Tuple[object, bool]]] = {}
+
+    with bmesh_session() as session:
+        # --- 判定 ---
+        cached = peek_hide_set_status(hide_set)
+        if cached is not None:
+            any_visible = not cached.completely_hidden
+        else:
+            any_visible = False
+            for obj, items in targets:
+                if can_use_arrays(obj, edit_objs):
+                    try:
+                        if not members_all_hidden(obj.data, items):
+                            any_visible = True
+                            break
+                        continue
+                    except Exception as e:
+                        log_exc("toggle_edit_hide_set.check_arrays", e)
+
+                try:
+                    bm = session.bmesh(obj, edit_objs)
+                    elems = resolve_elements(bm, obj, items, edit_objs)
+                except Exception as e:
+                    log_exc("toggle_edit_hide_set.check_bmesh", e)
+                    continue
+                resolved[obj.name] = elems
+                if any(not elem.hide for elem, _ in elems):
+                    any_visible = True
+                    break
+
+        hide_flag = any_visible
+
+        # --- 適用 ---
+        for obj, items in targets:
+            if obj.name not in resolved and can_use_arrays(obj, edit_objs):
+                try:
+                    if hide_flag:
+                        apply_hide_arrays(obj.data, items, True, rule)
+                    else:
+                        restore_saved_hidden_arrays(obj.data, items, rule)
+                    continue
+                except Exception as e:
+                    log_exc("toggle_edit_hide_set.apply_arrays", e)
+
+            def _apply(bm, obj=obj, items=items):
+                if hide_flag:
+                    return hide_members_on_bmesh(bm, obj, edit_objs, items, True, rule)
+                return restore_saved_on_bmesh(
+                    bm, obj, edit_objs, items, resolved.get(obj.name), rule
+                )
+
+            session.process(obj, edit_objs, _apply)
+
+    return hide_flag
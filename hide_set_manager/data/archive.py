@@ -0,0 +1,492 @@
+"""
+非表示セットのバイナリアーカイブ（.hmarc）。
+
+JSON は大量のPIDを扱うには向かないので、次のレイアウトのバイナリで保存する。
+数値は全てリトルエンディアン。データ部は 8 バイト境界に揃える。
+
+    ヘッダー      HEADER_DTYPE × 1
+    セット表      SET_DTYPE × set_count（version 1 は SET_DTYPE_V1。展開ルールを持たない）
+    セクション表  SECTION_DTYPE × section_count
+    文字列領域    UTF-8（セット名・オブジェクト名）
+    データ部      セクションごとに int32 の PID 配列 + 非表示ビット列（packbits, little）
+
+1セクション = 1セットの (オブジェクト, 要素タイプ) 1組。
+表は構造化 dtype なので numpy.memmap でそのまま読め、
+あるオブジェクトのセクションだけを、ファイル全体を解析せずに参照できる。
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.logging import log_exc
+from ..core.packed_store import MemberGroup, is_packed, iter_member_groups, iter_raw_groups
+from .serializer import (
+    EXPAND_RULES,
+    HideSetData,
+    ImportResult,
+    add_hide_set_data,
+    check_set_mode,
+    expand_settings,
+)
+
+ARCHIVE_MAGIC = b"HMSARC\x00\x00"
+ARCHIVE_VERSION = 2
+ARCHIVE_EXT = ".hmarc"
+
+HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("set_count", "<u4"),
+        ("section_count", "<u4"),
+        ("reserved", "<u4"),
+        ("strings_offset", "<u8"),
+        ("strings_size", "<u8"),
+        ("next_elem_id", "<i8"),
+    ]
+)
+
+SET_DTYPE_V1 = np.dtype(
+    [
+        ("name_offset", "<u4"),
+        ("name_length", "<u4"),
+        ("first_section", "<u4"),
+        ("section_count", "<u4"),
+        ("mode", "S16"),
+        ("digest", "u1", (16,)),  # 内容ハッシュ（hide_set_digest）
+    ]
+)
+
+SET_DTYPE = np.dtype(
+    SET_DTYPE_V1.descr
+    + [
+        ("expand_rule", "S8"),
+        ("expand_rings", "<u4"),
+        ("expand_ring_limit", "<u4"),
+    ]
+)
+
+SECTION_DTYPE = np.dtype(
+    [
+        ("name_offset", "<u4"),
+        ("name_length", "<u4"),
+        ("type", "S8"),
+        ("count", "<u8"),
+        ("pid_offset", "<u8"),
+        ("bits_offset", "<u8"),
+    ]
+)
+
+_ALIGN = 8
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _bits_size(count: int) -> int:
+    return (count + 7) // 8
+
+
+def _hash_set_header(h, name: str, mode: str, expand: Dict[str, object]) -> None:
+    h.update(name.encode("utf-8") + b"\x00" + mode.encode("ascii") + b"\x00")
+    h.update("\x00".join(str(expand[key]) for key in sorted(expand)).encode("ascii") + b"\x00")
+
+
+def hide_set_digest(data: HideSetData) -> bytes:
+    """セット名・モード・展開ルール・メンバー（PID と saved_hidden）から作る 16 バイトの内容ハッシュ。"""
+    h = hashlib.blake2b(digest_size=16)
+    _hash_set_header(h, data.name, data.mode, expand_settings(data))
+    for g in data.groups:
+        h.update(g.object_name.encode("utf-8") + b"\x00" + g.element_type.encode("ascii") + b"\x00")
+        h.update(np.asarray(g.pids, dtype="<i4").tobytes())
+        h.update(np.packbits(g.saved, bitorder="little").tobytes())
+    return h.digest()
+
+
+def hide_set_to_data(hide_set) -> HideSetData:
+    """シーンのセットを、メンバーをまとめた HideSetData にする。"""
+    return HideSetData(
+        hide_set.name, hide_set.mode, iter_member_groups(hide_set), **expand_settings(hide_set)
+    )
+
+
+def hide_set_content_digest(hide_set) -> bytes:
+    """
+    シーンのセットの内容ハッシュ（hide_set_digest と同じ値）。
+    PACKED ストレージは保存済みのバイト列をそのまま読むので、配列をデコードしない。
+    """
+    if not is_packed(hide_set):
+        return hide_set_digest(hide_set_to_data(hide_set))
+
+    h = hashlib.blake2b(digest_size=16)
+    _hash_set_header(h, hide_set.name, hide_set.mode, expand_settings(hide_set))
+    for obj_name, etype, count, pid_bytes, bit_bytes in iter_raw_groups(hide_set):
+        h.update(obj_name.encode("utf-8") + b"\x00" + etype.encode("ascii") + b"\x00")
+        h.update(pid_bytes[:4 * count])
+        h.update(bit_bytes[:_bits_size(count)])
+    return h.digest()
+
+
+# ----------------------------------------------------------------------
+# 書き込み
+# ----------------------------------------------------------------------
+class _GroupSection:
+    """書き込み用に MemberGroup を包む（ArchiveSection と同じ属性を持つ）。"""
+
+    __slots__ = ("object_name", "element_type", "count", "_group")
+
+    def __init__(self, group: MemberGroup):
+        self.object_name = group.object_name
+        self.element_type = group.element_type
+        self.count = len(group)
+        self._group = group
+
+    def pid_bytes(self):
+        return np.asarray(self._group.pids, dtype="<i4").tobytes()
+
+    def bit_bytes(self):
+        return np.packbits(self._group.saved, bitorder="little").tobytes()
+
+
+class _SetEntry:
+    __slots__ = ("name", "mode", "expand", "digest", "sections")
+
+    def __init__(self, name: str, mode: str, expand: Dict[str, object], digest: bytes, sections):
+        self.name = name
+        self.mode = mode
+        self.expand = expand
+        self.digest = digest
+        self.sections = sections
+
+
+def _entry_from_data(data: HideSetData) -> _SetEntry:
+    return _SetEntry(
+        data.name,
+        data.mode,
+        expand_settings(data),
+        hide_set_digest(data),
+        [_GroupSection(g) for g in data.groups],
+    )
+
+
+def _write_entries(filepath: str, entries: List[_SetEntry], next_elem_id: int) -> None:
+    strings = bytearray()
+    interned: Dict[str, Tuple[int, int]] = {}
+
+    def _intern(text: str) -> Tuple[int, int]:
+        # 同じオブジェクト名は全セットで1回だけ格納する
+        hit = interned.get(text)
+        if hit is None:
+            raw = text.encode("utf-8")
+            hit = (len(strings), len(raw))
+            strings.extend(raw)
+            interned[text] = hit
+        return hit
+
+    set_table = np.zeros(len(entries), dtype=SET_DTYPE)
+    sections = []
+    for i, entry in enumerate(entries):
+        set_table["name_offset"][i], set_table["name_length"][i] = _intern(entry.name)
+        set_table["first_section"][i] = len(sections)
+        set_table["section_count"][i] = len(entry.sections)
+        set_table["mode"][i] = entry.mode.encode("ascii")
+        set_table["expand_rule"][i] = str(entry.expand["expand_rule"]).encode("ascii")
+        set_table["expand_rings"][i] = int(entry.expand["expand_rings"])
+        set_table["expand_ring_limit"][i] = int(entry.expand["expand_ring_limit"])
+        set_table["digest"][i] = np.frombuffer(entry.digest, dtype=np.uint8)
+        sections.extend(entry.sections)
+
+    section_table = np.zeros(len(sections), dtype=SECTION_DTYPE)
+    for i, sec in enumerate(sections):
+        section_table["name_offset"][i], section_table["name_length"][i] = _intern(sec.object_name)
+        section_table["type"][i] = sec.element_type.encode("ascii")
+        section_table["count"][i] = sec.count
+
+    strings_offset = HEADER_DTYPE.itemsize + set_table.nbytes + section_table.nbytes
+    offset = _aligned(strings_offset + len(strings))
+    for i, sec in enumerate(sections):
+        section_table["pid_offset"][i] = offset
+        offset = _aligned(offset + 4 * sec.count)
+        section_table["bits_offset"][i] = offset
+        offset = _aligned(offset + _bits_size(sec.count))
+
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = ARCHIVE_MAGIC
+    header["version"] = ARCHIVE_VERSION
+    header["set_count"] = len(set_table)
+    header["section_count"] = len(section_table)
+    header["strings_offset"] = strings_offset
+    header["strings_size"] = len(strings)
+    header["next_elem_id"] = int(next_elem_id)
+
+    with open(filepath, "wb") as f:
+        f.write(header.tobytes())
+        f.write(set_table.tobytes())
+        f.write(section_table.tobytes())
+        f.write(bytes(strings))
+
+        # データ部はセクションごとに逐次書き込む
+        for row, sec in zip(section_table, sections):
+            f.write(b"\x00" * (int(row["pid_offset"]) - f.tell()))
+            f.write(sec.pid_bytes())
+            f.write(b"\x00" * (int(row["bits_offset"]) - f.tell()))
+            f.write(sec.bit_bytes())
+        f.write(b"\x00" * (_aligned(f.tell()) - f.tell()))
+
+
+def write_archive(filepath: str, sets: Iterable[HideSetData], next_elem_id: int = 0) -> None:
+    """セットの列をアーカイブに書く。失敗時は例外を投げる。"""
+    _write_entries(filepath, [_entry_from_data(data) for data in sets], next_elem_id)
+
+
+def export_hide_set_archive(filepath: str, hide_set, next_elem_id: int = 0) -> bool:
+    try:
+        write_archive(filepath, [hide_set_to_data(hide_set)], next_elem_id)
+        return True
+    except Exception as e:
+        log_exc("export_hide_set_archive", e)
+        return False
+
+
+@dataclass
+class ArchiveExportResult:
+    written: int = 0          # 書き直したセット数
+    reused: int = 0           # 前回のアーカイブからそのまま写したセット数
+    unchanged: bool = False   # 全く変更が無く、ファイルを書かなかった
+
+
+def _scene_sets(scene) -> list:
+    return list(scene.hm_edit_sets) + list(scene.hm_object_sets)
+
+
+def _open_previous(filepath: str) -> Optional["HideSetArchive"]:
+    if not (os.path.exists(filepath) and is_archive(filepath)):
+        return None
+    try:
+        return read_archive(filepath)
+    except Exception as e:
+        log_exc("archive.open_previous", e)
+        return None
+
+
+def _scene_entries(scene, previous, result: ArchiveExportResult) -> List[_SetEntry]:
+    by_digest = {s.digest: s for s in previous.sets} if previous is not None else {}
+    entries: List[_SetEntry] = []
+    for hide_set in _scene_sets(scene):
+        digest = hide_set_content_digest(hide_set)
+        expand = expand_settings(hide_set)
+        old = by_digest.get(digest)
+        if old is not None:
+            entries.append(_SetEntry(hide_set.name, hide_set.mode, expand, digest, old.sections))
+            result.reused += 1
+        else:
+            groups = iter_member_groups(hide_set)
+            entries.append(
+                _SetEntry(hide_set.name, hide_set.mode, expand, digest, [_GroupSection(g) for g in groups])
+            )
+            result.written += 1
+    return entries
+
+
+def export_scene_archive(filepath: str, scene, reuse_unchanged: bool = True) -> ArchiveExportResult:
+    """
+    シーンの全セット（hm_edit_sets / hm_object_sets）と hm_next_elem_id を1ファイルに書く。
+    既存のアーカイブがあれば内容ハッシュを比べ、変わっていないセットはメンバーを読み直さず
+    前回のセクションをそのまま写す。何も変わっていなければファイルを書かない。
+    失敗時は例外を投げる。
+    """
+    result = ArchiveExportResult()
+    previous = _open_previous(filepath) if reuse_unchanged else None
+    entries = _scene_entries(scene, previous, result)
+
+    if (
+        previous is not None
+        and result.written == 0
+        and previous.next_elem_id == scene.hm_next_elem_id
+        and [s.digest for s in previous.sets] == [e.digest for e in entries]
+    ):
+        result.unchanged = True
+        return result
+
+    # 前回のアーカイブを読みながら書くので、一時ファイルに書いてから置き換える
+    tmp_path = filepath + ".tmp"
+    try:
+        _write_entries(tmp_path, entries, scene.hm_next_elem_id)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    # 前回のアーカイブ（memmap）への参照を手放してから置き換える
+    entries = previous = None
+    os.replace(tmp_path, filepath)
+    return result
+
+
+# ----------------------------------------------------------------------
+# 読み込み
+# ----------------------------------------------------------------------
+class ArchiveSection:
+    """1セクション分のビュー。PID / ビット列は memmap から必要になった時に切り出す。"""
+
+    __slots__ = ("_archive", "_row", "object_name", "element_type", "count")
+
+    def __init__(self, archive: "HideSetArchive", row):
+        self._archive = archive
+        self._row = row
+        self.object_name = archive.string(row["name_offset"], row["name_length"])
+        self.element_type = row["type"].decode("ascii")
+        self.count = int(row["count"])
+
+    def pids(self) -> np.ndarray:
+        return self.pid_bytes().view("<i4")
+
+    def hidden(self) -> np.ndarray:
+        return np.unpackbits(self.bit_bytes(), count=self.count, bitorder="little").astype(bool)
+
+    def to_group(self) -> MemberGroup:
+        return MemberGroup(self.object_name, self.element_type, self.pids(), self.hidden())
+
+    # 再エクスポート時に、変わっていないセクションをデコードせずに写す
+    def pid_bytes(self):
+        start = int(self._row["pid_offset"])
+        return self._archive.mm[start:start + 4 * self.count]
+
+    def bit_bytes(self):
+        start = int(self._row["bits_offset"])
+        return self._archive.mm[start:start + _bits_size(self.count)]
+
+
+class ArchiveSet:
+    __slots__ = ("name", "mode", "expand", "digest", "sections")
+
+    def __init__(
+        self, name: str, mode: str, expand: Dict[str, object], digest: bytes, sections: List[ArchiveSection]
+    ):
+        self.name = name
+        self.mode = mode
+        # expand_settings と同じキー（HideSetData のキーワード引数）
+        self.expand = expand
+        self.digest = digest
+        self.sections = sections
+
+    def section(self, object_name: str) -> Optional[ArchiveSection]:
+        for sec in self.sections:
+            if sec.object_name == object_name:
+                return sec
+        return None
+
+    def to_data(self) -> HideSetData:
+        return HideSetData(self.name, self.mode, [sec.to_group() for sec in self.sections], **self.expand)
+
+
+def _row_expand_settings(row, version: int) -> Dict[str, object]:
+    """セット表の行から展開ルールを読む（version 1 は既定値）。"""
+    if version < 2:
+        return expand_settings(HideSetData("", ""))
+    rule = row["expand_rule"].decode("ascii")
+    if rule not in EXPAND_RULES:
+        raise ValueError(f"未対応の展開ルールです: {rule}")
+    return {
+        "expand_rule": rule,
+        "expand_rings": int(row["expand_rings"]),
+        "expand_ring_limit": int(row["expand_ring_limit"]),
+    }
+
+
+class HideSetArchive:
+    """アーカイブを memmap で開いたもの。表だけを読み、データ部は参照時に切り出す。"""
+
+    def __init__(self, filepath: str):
+        self.mm = np.memmap(filepath, dtype=np.uint8, mode="r")
+        header = self.mm[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)[0]
+        if bytes(header["magic"]).ljust(8, b"\x00") != ARCHIVE_MAGIC:
+            raise ValueError("hide set archive ではありません")
+        if int(header["version"]) > ARCHIVE_VERSION:
+            raise ValueError(f"未対応のバージョンです: {int(header['version'])}")
+
+        self.next_elem_id = int(header["next_elem_id"])
+        self._strings_offset = int(header["strings_offset"])
+
+        version = int(header["version"])
+        set_dtype = SET_DTYPE if version >= 2 else SET_DTYPE_V1
+        offset = HEADER_DTYPE.itemsize
+        set_rows = self.mm[offset:offset + set_dtype.itemsize * int(header["set_count"])].view(set_dtype)
+        offset += set_rows.nbytes
+        section_rows = self.mm[
+            offset:offset + SECTION_DTYPE.itemsize * int(header["section_count"])
+        ].view(SECTION_DTYPE)
+
+        self.sets: List[ArchiveSet] = []
+        for row in set_rows:
+            first = int(row["first_section"])
+            sections = [
+                ArchiveSection(self, section_rows[i])
+                for i in range(first, first + int(row["section_count"]))
+            ]
+            aset = ArchiveSet(
+                self.string(row["name_offset"], row["name_length"]),
+                row["mode"].decode("ascii"),
+                _row_expand_settings(row, version),
+                row["digest"].tobytes(),
+                sections,
+            )
+            if version < 2:
+                # version 1 の内容ハッシュは展開ルールを含まないので、今の定義で作り直す
+                aset.digest = hide_set_digest(aset.to_data())
+            self.sets.append(aset)
+
+    def string(self, offset, length) -> str:
+        start = self._strings_offset + int(offset)
+        return bytes(self.mm[start:start + int(length)]).decode("utf-8")
+
+
+def read_archive(filepath: str) -> HideSetArchive:
+    return HideSetArchive(filepath)
+
+
+def is_archive(filepath: str) -> bool:
+    try:
+        with open(filepath, "rb") as f:
+            return f.read(len(ARCHIVE_MAGIC)) == ARCHIVE_MAGIC
+    except OSError:
+        return False
+
+
+def import_archive(
+    scene,
+    filepath: str,
+    validate: bool = True,
+    replace: bool = False,
+    skip_existing: bool = True,
+) -> List[ImportResult]:
+    """
+    アーカイブの全セットをシーンへ追加する。失敗時は例外を投げる。
+    replace=True なら既存のセットを全て消してから読み込む（シーン全体の復元）。
+    skip_existing=True なら、内容ハッシュが同じセットが既にあれば読み込まない。
+    """
+    archive = read_archive(filepath)
+    # 既存のセットを消す前に、全セットのモードと要素タイプを確認する
+    for s in archive.sets:
+        check_set_mode(s.mode, s.sections)
+    if replace:
+        scene.hm_edit_sets.clear()
+        scene.hm_object_sets.clear()
+
+    existing = set()
+    if skip_existing and not replace:
+        existing = {hide_set_content_digest(hs) for hs in _scene_sets(scene)}
+
+    results: List[ImportResult] = []
+    for s in archive.sets:
+        if s.digest in existing:
+            results.append(ImportResult(name=s.name, skipped=True))
+            continue
+        results.append(add_hide_set_data(scene, s.to_data(), validate))
+    if archive.next_elem_id > scene.hm_next_elem_id:
+        scene.hm_next_elem_id = archive.next_elem_id
+    return results
@@ -1,30 +1,311 @@
+import base64
+import gzip
 import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
 import bpy
+import numpy as np
 from ..utils.logging import log_exc
+from ..core.packed_store import (
+    MemberGroup,
+    STORAGE_PACKED,
+    iter_member_groups,
+    write_groups,
+)
+from ..core.registry import add_items_bulk
+from ..core.mesh_arrays import existing_pid_mask
+from ..core.expansion import EXPAND_FACES, EXPAND_ISLAND, EXPAND_RINGS
 
 JSON_VERSION = 1
+# 列指向フォーマット（オブジェクトごとに PID 配列 + 非表示ビット列）
+JSON_VERSION_COLUMNAR = 2
 
+# 1回に書き出す要素数（メモリ使用量の上限になる）。ビット列は 3 の倍数バイトずつ base64 化する
+EXPORT_CHUNK = 65536
 
-def export_hide_set(filepath: str, hide_set) -> bool:
+# HM_HideSet.mode の値（大文字小文字も含めて一致するものだけ受け付ける）
+SET_MODES = ("VERT", "EDGE", "FACE", "OBJECT")
+EXPAND_RULES = (EXPAND_FACES, EXPAND_RINGS, EXPAND_ISLAND)
+
+
+def _open_text(filepath: str, mode: str, compress):
+    """compress=None なら拡張子 .gz で判断する。"""
+    if compress is None:
+        compress = filepath.lower().endswith(".gz")
+    if compress:
+        return gzip.open(filepath, mode + "t", encoding="utf-8")
+    return open(filepath, mode, encoding="utf-8")
+
+
+def expand_settings(hide_set) -> Dict[str, object]:
+    """セットの展開ルール（HideSetData のキーワード引数 / version 2 のヘッダーと同じキー）。"""
+    return {
+        "expand_rule": hide_set.expand_rule,
+        "expand_rings": int(hide_set.expand_rings),
+        "expand_ring_limit": int(hide_set.expand_ring_limit),
+    }
+
+
+def _write_legacy(f, hide_set) -> None:
     data = {
         "version": JSON_VERSION,
         "name": hide_set.name,
         "mode": hide_set.mode,
         "elements": [
             {
-                "object": elem.object_name,
-                "type": elem.element_type,
-                "pid": elem.index,
-                "hidden": bool(elem.saved_hidden),
+                "object": group.object_name,
+                "type": group.element_type,
+                "pid": int(pid),
+                "hidden": bool(hidden),
             }
-            for elem in hide_set.elements
+            for group in iter_member_groups(hide_set)
+            for pid, hidden in zip(group.pids, group.saved)
         ],
     }
+    json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _write_columnar(f, hide_set) -> None:
+    """
+    {"version": 2, "name": ..., "mode": ...,
+     "expand_rule": ..., "expand_rings": N, "expand_ring_limit": N,
+     "objects": [{"object": ..., "type": ..., "count": N,
+                  "pids": [...], "hidden": "<base64(packbits little)>"}, ...]}
+    をチャンクごとにファイルへ書く（全体の文字列は作らない）。
+    """
+    f.write("{")
+    f.write(f'"version": {JSON_VERSION_COLUMNAR}, ')
+    f.write(f'"name": {json.dumps(hide_set.name, ensure_ascii=False)}, ')
+    f.write(f'"mode": {json.dumps(hide_set.mode)}, ')
+    for key, value in expand_settings(hide_set).items():
+        f.write(f'"{key}": {json.dumps(value)}, ')
+    f.write('"objects": [')
+
+    for gi, group in enumerate(iter_member_groups(hide_set)):
+        if gi:
+            f.write(", ")
+        f.write("\n")
+        f.write(f'{{"object": {json.dumps(group.object_name, ensure_ascii=False)}, ')
+        f.write(f'"type": {json.dumps(group.element_type)}, ')
+        f.write(f'"count": {len(group)}, ')
+
+        f.write('"pids": [')
+        for start in range(0, len(group.pids), EXPORT_CHUNK):
+            if start:
+                f.write(",")
+            f.write(",".join(map(str, group.pids[start:start + EXPORT_CHUNK].tolist())))
+        f.write("], ")
+
+        f.write('"hidden": "')
+        bits = np.packbits(group.saved, bitorder="little")
+        step = EXPORT_CHUNK - EXPORT_CHUNK % 3
+        for start in range(0, len(bits), step):
+            f.write(base64.b64encode(bits[start:start + step].tobytes()).decode("ascii"))
+        f.write('"}')
 
+    f.write("\n]}\n")
+
+
+def export_hide_set(filepath: str, hide_set, version: int = JSON_VERSION_COLUMNAR, compress=None) -> bool:
+    """
+    セットを JSON で書き出す。
+    version=JSON_VERSION_COLUMNAR（既定）は列指向で逐次書き込み、JSON_VERSION は従来の要素ごとの形式。
+    compress=True なら gzip（None なら拡張子 .gz で判断）。
+    """
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with _open_text(filepath, "w", compress) as f:
+            if version == JSON_VERSION:
+                _write_legacy(f, hide_set)
+            else:
+                _write_columnar(f, hide_set)
         return True
     except Exception as e:
         log_exc("export_hide_set", e)
         return False
+
+
+# ----------------------------------------------------------------------
+# インポート
+# ----------------------------------------------------------------------
+@dataclass
+class HideSetData:
+    """ファイルから読み込んだセット（まだシーンには追加していない）。"""
+
+    name: str
+    mode: str
+    groups: List[MemberGroup] = field(default_factory=list)
+    # 展開ルール（HM_HideSet.expand_*）
+    expand_rule: str = EXPAND_FACES
+    expand_rings: int = 1
+    expand_ring_limit: int = 0
+
+    @property
+    def member_count(self) -> int:
+        return sum(len(g) for g in self.groups)
+
+
+@dataclass
+class ImportResult:
+    name: str = ""
+    added: int = 0
+    dropped: int = 0           # メッシュ上に見つからなかったPID
+    missing_objects: int = 0   # 見つからなかったオブジェクト
+    skipped: bool = False      # 同じ内容のセットが既にあったので読み込まなかった
+
+
+def _restore_expand_settings(hide_set, data: HideSetData) -> None:
+    hide_set.expand_rule = data.expand_rule
+    hide_set.expand_rings = max(int(data.expand_rings), 1)
+    hide_set.expand_ring_limit = max(int(data.expand_ring_limit), 0)
+
+
+def _open_any(filepath: str):
+    """gzip かどうかは先頭のマジックバイトで判断する。"""
+    with open(filepath, "rb") as f:
+        magic = f.read(2)
+    return _open_text(filepath, "r", magic == b"\x1f\x8b")
+
+
+def _groups_from_legacy(elements) -> List[MemberGroup]:
+    pids: Dict[Tuple[str, str], list] = {}
+    saved: Dict[Tuple[str, str], list] = {}
+    for el in elements:
+        key = (str(el["object"]), str(el["type"]))
+        pids.setdefault(key, []).append(int(el["pid"]))
+        saved.setdefault(key, []).append(bool(el["hidden"]))
+    return [MemberGroup(obj, etype, pids[(obj, etype)], saved[(obj, etype)]) for obj, etype in pids]
+
+
+def _groups_from_columnar(objects) -> List[MemberGroup]:
+    groups: List[MemberGroup] = []
+    for entry in objects:
+        count = int(entry["count"])
+        pids = np.asarray(entry["pids"], dtype=np.int64)[:count]
+        raw = np.frombuffer(base64.b64decode(entry["hidden"]), dtype=np.uint8)
+        hidden = np.unpackbits(raw, count=count, bitorder="little").astype(bool)
+        groups.append(MemberGroup(str(entry["object"]), str(entry["type"]), pids, hidden))
+    return groups
+
+
+def read_hide_set(filepath: str) -> HideSetData:
+    """version 1（要素ごと）/ version 2（列指向）の JSON を読む。gzip も可。"""
+    with _open_any(filepath) as f:
+        data = json.load(f)
+
+    version = int(data.get("version", JSON_VERSION))
+    if version == JSON_VERSION:
+        groups = _groups_from_legacy(data.get("elements", []))
+    elif version == JSON_VERSION_COLUMNAR:
+        groups = _groups_from_columnar(data.get("objects", []))
+    else:
+        raise ValueError(f"未対応のバージョンです: {version}")
+
+    mode = str(data.get("mode", "VERT"))
+    if mode not in SET_MODES:
+        raise ValueError(f"未対応のモードです: {mode}")
+    # version 1 と、展開ルール追加前の version 2 には無いので既定値
+    rule = str(data.get("expand_rule", EXPAND_FACES))
+    if rule not in EXPAND_RULES:
+        raise ValueError(f"未対応の展開ルールです: {rule}")
+    return HideSetData(
+        str(data.get("name", "Untitled")),
+        mode,
+        groups,
+        expand_rule=rule,
+        expand_rings=int(data.get("expand_rings", 1)),
+        expand_ring_limit=int(data.get("expand_ring_limit", 0)),
+    )
+
+
+def check_set_mode(mode: str, groups) -> None:
+    """
+    モードと各グループ（object_name / element_type を持つもの）の要素タイプが
+    一致しているか確認する（セットは単一モード）。
+    シーンへ追加する前に呼び、不正なら ValueError（空のセットを残さないため）。
+    """
+    if mode not in SET_MODES:
+        raise ValueError(f"未対応のモードです: {mode}")
+    for g in groups:
+        if g.element_type != mode:
+            raise ValueError(f"要素タイプ {g.element_type} がセットのモード {mode} と一致しません: {g.object_name}")
+
+
+def _validate_group(group: MemberGroup, result: ImportResult) -> MemberGroup:
+    """オブジェクト / PID の存在をまとめて確認し、見つからないメンバーを除く。"""
+    obj = bpy.data.objects.get(group.object_name)
+    if obj is None:
+        result.missing_objects += 1
+        result.dropped += len(group)
+        return MemberGroup(group.object_name, group.element_type, [], [])
+    if group.element_type == "OBJECT":
+        return group
+    if obj.type != "MESH":
+        result.dropped += len(group)
+        return MemberGroup(group.object_name, group.element_type, [], [])
+
+    if obj.mode == "EDIT":
+        # 編集中の変更（付与済みPID）を Mesh 側に反映してから配列で確認する
+        try:
+            obj.update_from_editmode()
+        except Exception as e:
+            log_exc("serializer.validate.update_from_editmode", e)
+
+    found = existing_pid_mask(obj.data, group.element_type, group.pids)
+    result.dropped += int(np.count_nonzero(~found))
+    return MemberGroup(group.object_name, group.element_type, group.pids[found], group.saved[found])
+
+
+def add_hide_set_data(scene, data: HideSetData, validate: bool = True) -> ImportResult:
+    """読み込んだセットをシーンへ追加する（メンバーはまとめて書き込む）。"""
+    check_set_mode(data.mode, data.groups)
+    result = ImportResult(name=data.name)
+
+    groups = data.groups
+    if validate:
+        groups = [_validate_group(g, result) for g in groups]
+    groups = [g for g in groups if len(g)]
+
+    if data.mode == "OBJECT":
+        new_set = scene.hm_object_sets.add()
+        new_set.name = data.name
+        new_set.mode = "OBJECT"
+        _restore_expand_settings(new_set, data)
+        for g in groups:
+            result.added += add_items_bulk(new_set.elements, g.object_name, "OBJECT", g.pids, g.saved)
+        return result
+
+    new_set = scene.hm_edit_sets.add()
+    new_set.name = data.name
+    new_set.mode = data.mode
+    new_set.storage = STORAGE_PACKED
+    _restore_expand_settings(new_set, data)
+
+    # (オブジェクト, タイプ) ごとに重複を除いてから1回で書き込む
+    merged: Dict[Tuple[str, str], MemberGroup] = {}
+    for g in groups:
+        key = (g.object_name, g.element_type)
+        if key in merged:
+            prev = merged[key]
+            g = MemberGroup(
+                g.object_name,
+                g.element_type,
+                np.concatenate([prev.pids, g.pids]),
+                np.concatenate([prev.saved, g.saved]),
+            )
+        _, first = np.unique(g.pids, return_index=True)
+        first.sort()
+        merged[key] = MemberGroup(g.object_name, g.element_type, g.pids[first], g.saved[first])
+
+    write_groups(new_set, merged.values())
+    result.added = sum(len(g) for g in merged.values())
+
+    # 検証しない場合でも、以後に振るPIDと衝突しないようカウンタを進める
+    max_pid = max((int(g.pids.max()) for g in merged.values() if len(g)), default=0)
+    if max_pid >= scene.hm_next_elem_id:
+        scene.hm_next_elem_id = max_pid + 1
+    return result
+
+
+def import_hide_set(scene, filepath: str, validate: bool = True) -> ImportResult:
+    """ファイルからセットを1つ読み込んでシーンへ追加する。失敗時は例外を投げる。"""
+    return add_hide_set_data(scene, read_hide_set(filepath), validate)
@@ -4,20 +4,32 @@ import bpy
 
 from ..core.registry import (
     HM_HideSet,
-    HM_ElementRef,
     split_items_by_object,
+    object_members,
     ensure_objects_in_edit_mode,
     add_item_unique,
+    add_members,
+    invalidate_member_index,
 )
+from ..core.packed_store import STORAGE_PACKED
 from ..core.pid import (
     ensure_id_layers,
-    assign_persistent_id_if_missing,
-    build_pid_maps,
+    assign_missing_pids_bmesh,
 )
+from ..core.pid_cache import invalidate_pid_maps
+from ..core.pid_repair import repair_object_pids
+from ..core.pid_compact import CompactionError, compact_pids
+from ..core.reverse_index import cleanup_deleted_objects, invalidate_reverse_index
 from ..core.bmesh_ops import (
     process_bmesh,
-    hide_elements_with_rules_on_bmesh_by_pid,
+    bmesh_session,
+    hide_members_on_bmesh,
 )
+from ..core.mesh_arrays import can_use_arrays
+from ..core.array_apply import apply_hide_arrays
+from ..core.toggle import toggle_edit_hide_set
+from ..core.expansion import rule_from_hide_set
+from ..core.batch import BatchAction, run_hide_set_batch
 from ..utils.safe_hidden import safe_get_hidden, safe_set_hidden
 from ..utils.logging import log_exc
 #追加
@@ -25,7 +37,20 @@ from ..core.diff import (
     HideSetDiffResult,
     sync_hide_set_saved_hidden,
 )
-from ..data.serializer import export_hide_set
+from ..data.serializer import (
+    export_hide_set,
+    import_hide_set,
+    JSON_VERSION,
+    JSON_VERSION_COLUMNAR,
+)
+from ..data.archive import (
+    ARCHIVE_EXT,
+    export_hide_set_archive,
+    export_scene_archive,
+    import_archive,
+    is_archive,
+)
+from ..core.status_cache import invalidate_hide_set_status
 
 
 class HM_ApplyHideSet(bpy.types.Operator):
@@ -48,7 +73,9 @@ class HM_ApplyHideSet(bpy.types.Operator):
 
     def execute(self, context):
         try:
-            return self._execute(context)
+            # BMesh はオブジェクトごとに1回だけ開き、最後にまとめて書き戻す
+            with bmesh_session():
+                return self._execute(context)
         except Exception as e:
             log_exc("HM_ApplyHideSet.execute", e)
             self.report({"ERROR"}, "非表示セットの適用中にエラーが発生しました")
@@ -67,13 +94,15 @@ class HM_ApplyHideSet(bpy.types.Operator):
 
         # オブジェクトモード
         if hide_set.mode == "OBJECT":
-            for it in hide_set.elements:
-                obj = bpy.data.objects.get(it.object_name)
+            for obj, _group in object_members(hide_set, update=True):
                 if not obj:
                     continue
                 safe_set_hidden(obj, hide_flag)
 
             self.report({"INFO"}, f"オブジェクトを {'非表示' if hide_flag else '表示'} にしました")
+            invalidate_hide_set_status()
+            # 名前の変わったメンバーを書き換えたかもしれない
+            invalidate_reverse_index()
             return {"FINISHED"}
 
         # 編集モード（メッシュ要素）
@@ -83,19 +112,28 @@ class HM_ApplyHideSet(bpy.types.Operator):
             return {"CANCELLED"}
 
         edit_objs = set(ensure_objects_in_edit_mode(context))
+        rule = rule_from_hide_set(hide_set)
 
         for obj_name, items in d.items():
             obj = bpy.data.objects.get(obj_name)
             if not obj:
                 continue
 
+            # 編集モード外は配列で一括適用
+            if can_use_arrays(obj, edit_objs):
+                try:
+                    apply_hide_arrays(obj.data, items, hide_flag, rule)
+                    continue
+                except Exception as e:
+                    log_exc("HM_ApplyHideSet.apply_hide_arrays", e)
+
             def _apply(bm):
-                v_map, e_map, f_map, *_ = build_pid_maps(bm)
-                hide_elements_with_rules_on_bmesh_by_pid(bm, items, hide_flag, v_map, e_map, f_map)
+                return hide_members_on_bmesh(bm, obj, edit_objs, items, hide_flag, rule)
 
             process_bmesh(obj, edit_objs, _apply)
 
         self.report({"INFO"}, f"編集要素を {'非表示' if hide_flag else '表示'} にしました")
+        invalidate_hide_set_status()
         return {"FINISHED"}
 
 
@@ -120,6 +158,10 @@ class HM_RegisterHideSet(bpy.types.Operator):
         return context.window_manager.invoke_props_dialog(self, width=320)
 
     def execute(self, context):
+        with bmesh_session():
+            return self._execute(context)
+
+    def _execute(self, context):
         scene = context.scene
 
         # OBJECT モードでの登録
@@ -142,6 +184,8 @@ class HM_RegisterHideSet(bpy.types.Operator):
                 add_item_unique(new_set.elements, obj.name, "OBJECT", -1, saved)
 
             self.report({"INFO"}, f"オブジェクトを {len(selected)} 個登録しました")
+            invalidate_hide_set_status()
+            invalidate_reverse_index()
             return {"FINISHED"}
 
         # 編集モードでの登録
@@ -157,6 +201,7 @@ class HM_RegisterHideSet(bpy.types.Operator):
         new_set: HM_HideSet = scene.hm_edit_sets.add()
         new_set.name = self.name
         new_set.mode = self.mode
+        new_set.storage = STORAGE_PACKED
 
         total_added = 0
 
@@ -172,36 +217,28 @@ class HM_RegisterHideSet(bpy.types.Operator):
                 v_layer, e_layer, f_layer = ensure_id_layers(bm)
 
                 if self.mode == "VERT":
-                    for v in bm.verts:
-                        if not v.select:
-                            continue
-                        pid = assign_persistent_id_if_missing(
-                            bm, v_layer, e_layer, f_layer, v, "VERT", scene
-                        )
-                        if add_item_unique(new_set.elements, obj.name, "VERT", pid, v.hide):
-                            total_added += 1
-
+                    elems, layer = bm.verts, v_layer
                 elif self.mode == "EDGE":
-                    for e in bm.edges:
-                        if not e.select:
-                            continue
-                        pid = assign_persistent_id_if_missing(
-                            bm, v_layer, e_layer, f_layer, e, "EDGE", scene
-                        )
-                        if add_item_unique(new_set.elements, obj.name, "EDGE", pid, e.hide):
-                            total_added += 1
-
+                    elems, layer = bm.edges, e_layer
                 elif self.mode == "FACE":
-                    for f in bm.faces:
-                        if not f.select:
-                            continue
-                        pid = assign_persistent_id_if_missing(
-                            bm, v_layer, e_layer, f_layer, f, "FACE", scene
-                        )
-                        if add_item_unique(new_set.elements, obj.name, "FACE", pid, f.hide):
-                            total_added += 1
+                    elems, layer = bm.faces, f_layer
+                else:
+                    return
+
+                selected = [elem for elem in elems if elem.select]
+                if not selected:
+                    return False
+
+                # PIDなし要素には連続したPIDをまとめて予約して振る
+                pids = assign_missing_pids_bmesh(selected, layer, scene)
+                hidden = [elem.hide for elem in selected]
+
+                # 重複チェックはまとめて1回だけ
+                total_added += add_members(new_set, obj.name, self.mode, pids, hidden)
 
             process_bmesh(obj, objs, _collect)
+            # PIDを付与したのでキャッシュ済みのマップは使えない
+            invalidate_pid_maps(obj.data)
 
         if total_added == 0:
             try:
@@ -214,6 +251,8 @@ class HM_RegisterHideSet(bpy.types.Operator):
             return {"CANCELLED"}
 
         self.report({"INFO"}, f"「{new_set.name}」を登録しました（{total_added} 要素）")
+        invalidate_hide_set_status()
+        invalidate_reverse_index()
         return {"FINISHED"}
 
 
@@ -232,7 +271,9 @@ class HM_ToggleHideSet(bpy.types.Operator):
 
     def execute(self, context):
         try:
-            return self._execute(context)
+            # 判定と適用で同じ BMesh を使う
+            with bmesh_session():
+                return self._execute(context)
         except Exception as e:
             log_exc("HM_ToggleHideSet.execute", e)
             self.report({"ERROR"}, "トグル処理中にエラーが発生しました")
@@ -250,100 +291,99 @@ class HM_ToggleHideSet(bpy.types.Operator):
 
         # オブジェクトモード
         if hide_set.mode == "OBJECT":
-            objs: List[Tuple[bpy.types.Object, HM_ElementRef]] = []
-            for it in hide_set.elements:
-                o = bpy.data.objects.get(it.object_name)
-                if o:
-                    objs.append((o, it))
+            objs: List[Tuple[bpy.types.Object, bool]] = [
+                (o, bool(group.saved[0]))
+                for o, group in object_members(hide_set, update=True)
+                if o is not None
+            ]
 
             if not objs:
                 self.report({"INFO"}, "対象のオブジェクトが見つかりません")
                 return {"CANCELLED"}
 
             any_visible = any(not safe_get_hidden(o) for o, _ in objs)
-            for o, it in objs:
+            for o, saved in objs:
                 if any_visible:
                     safe_set_hidden(o, True)
                 else:
-                    safe_set_hidden(o, bool(it.saved_hidden))
+                    safe_set_hidden(o, saved)
 
             self.report({"INFO"}, f"オブジェクトを {'非表示' if any_visible else '表示'} にしました")
+            invalidate_hide_set_status()
+            invalidate_reverse_index()
             return {"FINISHED"}
 
-        # 編集モード
-        d = split_items_by_object(hide_set)
-        if not d:
+        # 編集モード（判定と適用を1つのセッションで行う）
+        hide_flag = toggle_edit_hide_set(context, hide_set)
+        if hide_flag is None:
             self.report({"INFO"}, "非表示セットに要素がありません")
             return {"CANCELLED"}
 
-        edit_objs = set(ensure_objects_in_edit_mode(context))
-
-        any_visible = False
+        self.report({"INFO"}, f"編集要素を {'非表示' if hide_flag else '表示'} にしました")
+        invalidate_hide_set_status()
+        return {"FINISHED"}
 
-        for obj_name, items in d.items():
-            obj = bpy.data.objects.get(obj_name)
-            if not obj:
-                continue
 
-            def _check(bm):
-                nonlocal any_visible
-                v_map, e_map, f_map, *_ = build_pid_maps(bm)
+class HM_BatchHideSets(bpy.types.Operator):
+    """チェックした複数の非表示セットをまとめて表示 / 非表示 / トグルする（アンドゥは1回分）"""
 
-                for it in items:
-                    try:
-                        pid = int(it.index)
-                    except Exception:
-                        continue
+    bl_idname = "hide_manager.batch_hide_sets"
+    bl_label = "非表示セットをまとめて操作"
+    bl_options = {"REGISTER", "UNDO"}
 
-                    elem = None
-                    if it.element_type == "VERT":
-                        elem = v_map.get(pid)
-                    elif it.element_type == "EDGE":
-                        elem = e_map.get(pid)
-                    elif it.element_type == "FACE":
-                        elem = f_map.get(pid)
+    list_type: bpy.props.EnumProperty(
+        name="リスト",
+        items=[("EDIT", "編集モード", ""), ("OBJECT", "オブジェクトモード", "")],
+    )
+    action: bpy.props.EnumProperty(
+        name="動作",
+        items=[("SHOW", "表示", ""), ("HIDE", "非表示", ""), ("TOGGLE", "トグル", "")],
+        default="HIDE",
+    )
+    # "1,3,4" のようなインデックス指定（0始まり）。空ならパネルでチェックしたセット
+    indices: bpy.props.StringProperty(name="インデックス", default="")
 
-                    if elem and not getattr(elem, "hide", False):
-                        any_visible = True
-                        break
+    def _target_indices(self, hide_sets) -> List[int]:
+        if not self.indices.strip():
+            return [i for i, hs in enumerate(hide_sets) if hs.batch_selected]
 
-            process_bmesh(obj, edit_objs, _check)
-            if any_visible:
-                break
+        result: List[int] = []
+        for token in self.indices.split(","):
+            token = token.strip()
+            if token:
+                result.append(int(token))
+        return result
 
-        hide_flag = any_visible
+    def execute(self, context):
+        scene = context.scene
+        hide_sets = scene.hm_object_sets if self.list_type == "OBJECT" else scene.hm_edit_sets
 
-        for obj_name, items in d.items():
-            obj = bpy.data.objects.get(obj_name)
-            if not obj:
-                continue
+        try:
+            indices = self._target_indices(hide_sets)
+        except ValueError:
+            self.report({"WARNING"}, "インデックスの指定が不正です")
+            return {"CANCELLED"}
 
-            def _apply(bm):
-                v_map, e_map, f_map, *_ = build_pid_maps(bm)
+        if not indices:
+            self.report({"INFO"}, "操作する非表示セットがチェックされていません")
+            return {"CANCELLED"}
 
-                if hide_flag:
-                    hide_elements_with_rules_on_bmesh_by_pid(bm, items, True, v_map, e_map, f_map)
-                else:
-                    for it in items:
-                        try:
-                            pid = int(it.index)
-                        except Exception:
-                            continue
-
-                        elem = None
-                        if it.element_type == "VERT":
-                            elem = v_map.get(pid)
-                        elif it.element_type == "EDGE":
-                            elem = e_map.get(pid)
-                        elif it.element_type == "FACE":
-                            elem = f_map.get(pid)
-
-                        if elem:
-                            safe_set_hidden(elem, bool(it.saved_hidden))
+        actions = [BatchAction(self.list_type, i, self.action) for i in indices]
+        try:
+            result = run_hide_set_batch(context, actions)
+        except Exception as e:
+            log_exc("HM_BatchHideSets.execute", e)
+            self.report({"ERROR"}, "まとめて操作中にエラーが発生しました")
+            return {"CANCELLED"}
 
-            process_bmesh(obj, edit_objs, _apply)
+        invalidate_hide_set_status()
+        if self.list_type == "OBJECT":
+            invalidate_reverse_index()
+        if result.applied == 0:
+            self.report({"INFO"}, "対象の要素 / オブジェクトが見つかりません")
+            return {"CANCELLED"}
 
-        self.report({"INFO"}, f"編集要素を {'非表示' if hide_flag else '表示'} にしました")
+        self.report({"INFO"}, f"{result.applied} 個の非表示セットをまとめて処理しました")
         return {"FINISHED"}
 
 
@@ -369,6 +409,7 @@ class HM_RenameHideSet(bpy.types.Operator):
         if 0 <= self.index < len(hide_sets):
             hide_sets[self.index].name = self.new_name
             self.report({"INFO"}, f"名前を「{self.new_name}」に変更しました")
+        invalidate_hide_set_status()
         return {"FINISHED"}
 
 
@@ -387,11 +428,15 @@ class HM_DeleteHideSet(bpy.types.Operator):
         if 0 <= self.index < len(hide_sets):
             try:
                 hide_sets.remove(self.index)
+                # 後ろのセットのパスがずれるので索引は作り直す
+                invalidate_member_index()
                 self.report({"INFO"}, "非表示セットを削除しました")
             except Exception as e:
                 log_exc("HM_DeleteHideSet.remove", e)
                 self.report({"WARNING"}, "削除に失敗しました")
                 return {"CANCELLED"}
+        invalidate_hide_set_status()
+        invalidate_reverse_index()
         return {"FINISHED"}
 
 #追加
@@ -430,7 +475,8 @@ class HM_SyncHideSet(bpy.types.Operator):
             return {"CANCELLED"}
 
         try:
-            diff = sync_hide_set_saved_hidden(context, hide_set)
+            with bmesh_session():
+                diff = sync_hide_set_saved_hidden(context, hide_set)
         except Exception as e:
             log_exc("HM_SyncHideSet.execute", e)
             self.report({"ERROR"}, "差分同期中にエラーが発生しました")
@@ -447,12 +493,15 @@ class HM_SyncHideSet(bpy.types.Operator):
             )
             self.report({"INFO"}, msg)
             
-        # UIの即時更新
-        for area in bpy.context.window.screen.areas:
-            if area.type == 'VIEW_3D':
-                area.tag_redraw()
+        # UIの即時更新（--background 実行ではウィンドウが無い）
+        if context.window is not None:
+            for area in context.window.screen.areas:
+                if area.type == 'VIEW_3D':
+                    area.tag_redraw()
 
 
+        invalidate_hide_set_status()
+        invalidate_reverse_index()
         return {"FINISHED"}
 
 class HM_ExportHideSet(bpy.types.Operator):
@@ -475,6 +524,12 @@ class HM_ExportHideSet(bpy.types.Operator):
         subtype="FILE_PATH",
         default="hide_set.json",
     )
+    filter_glob: bpy.props.StringProperty(
+        default="*.json;*.json.gz;*" + ARCHIVE_EXT, options={"HIDDEN"}
+    )
+    use_gzip: bpy.props.BoolProperty(name="gzip 圧縮", default=False)
+    # 旧形式（version 1：要素ごとの dict）で書き出す
+    legacy_format: bpy.props.BoolProperty(name="旧形式 (version 1)", default=False)
 
     def execute(self, context):
         hide_sets = (
@@ -489,8 +544,19 @@ class HM_ExportHideSet(bpy.types.Operator):
 
         hide_set = hide_sets[self.index]
 
-        if export_hide_set(self.filepath, hide_set):
-            self.report({"INFO"}, f"保存しました: {self.filepath}")
+        filepath = self.filepath
+        if filepath.lower().endswith(ARCHIVE_EXT):
+            # バイナリアーカイブ
+            ok = export_hide_set_archive(filepath, hide_set, context.scene.hm_next_elem_id)
+        else:
+            if self.use_gzip and not filepath.lower().endswith(".gz"):
+                filepath += ".gz"
+            version = JSON_VERSION if self.legacy_format else JSON_VERSION_COLUMNAR
+            # チェックが無くても、拡張子が .gz なら圧縮する（_open_text の判定に任せる）
+            ok = export_hide_set(filepath, hide_set, version, self.use_gzip or None)
+
+        if ok:
+            self.report({"INFO"}, f"保存しました: {filepath}")
             return {"FINISHED"}
         else:
             self.report({"ERROR"}, "保存に失敗しました")
@@ -499,3 +565,220 @@ class HM_ExportHideSet(bpy.types.Operator):
     def invoke(self, context, event):
         context.window_manager.fileselect_add(self)
         return {"RUNNING_MODAL"}
+
+
+class HM_ImportHideSet(bpy.types.Operator):
+    """JSON ファイル（version 1 / 2、gzip 可）またはバイナリアーカイブから HideSet をインポート"""
+
+    bl_idname = "hide_manager.import_hide_set"
+    bl_label = "Import"
+    bl_options = {"REGISTER", "UNDO"}
+
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+    filter_glob: bpy.props.StringProperty(
+        default="*.json;*.json.gz;*" + ARCHIVE_EXT, options={"HIDDEN"}
+    )
+    # メッシュ上に存在しないPID / オブジェクトのメンバーを取り込まない
+    validate: bpy.props.BoolProperty(name="PIDを検証", default=True)
+
+    def execute(self, context):
+        try:
+            if is_archive(self.filepath):
+                results = import_archive(context.scene, self.filepath, self.validate)
+            else:
+                results = [import_hide_set(context.scene, self.filepath, self.validate)]
+        except Exception as e:
+            log_exc("HM_ImportHideSet.execute", e)
+            self.report({"ERROR"}, "読み込みに失敗しました")
+            return {"CANCELLED"}
+
+        invalidate_hide_set_status()
+        invalidate_reverse_index()
+        added = sum(r.added for r in results)
+        dropped = sum(r.dropped for r in results)
+        if len(results) == 1:
+            msg = f"「{results[0].name}」を読み込みました（{added} 要素）"
+        else:
+            msg = f"{len(results)} 個のセットを読み込みました（{added} 要素）"
+        if dropped:
+            msg += f"／見つからない要素 {dropped} 件を除外"
+        self.report({"INFO"}, msg)
+        return {"FINISHED"}
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+
+class HM_ExportAllHideSets(bpy.types.Operator):
+    """シーンの全ての HideSet（編集モード / オブジェクトモード）を1つのアーカイブへエクスポート"""
+
+    bl_idname = "hide_manager.export_all_hide_sets"
+    bl_label = "Export All"
+    bl_options = {"REGISTER"}
+
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH", default="hide_sets" + ARCHIVE_EXT)
+    filter_glob: bpy.props.StringProperty(default="*" + ARCHIVE_EXT, options={"HIDDEN"})
+    # 既存のアーカイブと内容ハッシュが同じセットはメンバーを読み直さない
+    reuse_unchanged: bpy.props.BoolProperty(name="変更のないセットを再利用", default=True)
+
+    def execute(self, context):
+        filepath = self.filepath
+        if not filepath.lower().endswith(ARCHIVE_EXT):
+            filepath += ARCHIVE_EXT
+
+        try:
+            result = export_scene_archive(filepath, context.scene, self.reuse_unchanged)
+        except Exception as e:
+            log_exc("HM_ExportAllHideSets.execute", e)
+            self.report({"ERROR"}, "保存に失敗しました")
+            return {"CANCELLED"}
+
+        if result.unchanged:
+            self.report({"INFO"}, f"変更がないため書き込みを省略しました: {filepath}")
+        else:
+            self.report(
+                {"INFO"},
+                f"保存しました: {filepath}（更新 {result.written} / 再利用 {result.reused} セット）",
+            )
+        return {"FINISHED"}
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+
+class HM_ImportAllHideSets(bpy.types.Operator):
+    """アーカイブから全ての HideSet と永続IDカウンタを読み込む"""
+
+    bl_idname = "hide_manager.import_all_hide_sets"
+    bl_label = "Import All"
+    bl_options = {"REGISTER", "UNDO"}
+
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+    filter_glob: bpy.props.StringProperty(default="*" + ARCHIVE_EXT, options={"HIDDEN"})
+    # 既存のセットを全て置き換える（オフなら追加し、同じ内容のセットは読み飛ばす）
+    replace: bpy.props.BoolProperty(name="既存のセットを置き換え", default=True)
+    validate: bpy.props.BoolProperty(name="PIDを検証", default=True)
+
+    def execute(self, context):
+        if not is_archive(self.filepath):
+            self.report({"ERROR"}, "hide set アーカイブではありません")
+            return {"CANCELLED"}
+
+        try:
+            results = import_archive(context.scene, self.filepath, self.validate, self.replace)
+        except Exception as e:
+            log_exc("HM_ImportAllHideSets.execute", e)
+            self.report({"ERROR"}, "読み込みに失敗しました")
+            return {"CANCELLED"}
+
+        invalidate_member_index()
+        invalidate_hide_set_status()
+        invalidate_reverse_index()
+        loaded = [r for r in results if not r.skipped]
+        self.report(
+            {"INFO"},
+            f"{len(loaded)} 個のセットを読み込みました（{sum(r.added for r in loaded)} 要素、"
+            f"同じ内容で省略 {len(results) - len(loaded)} 個）",
+        )
+        return {"FINISHED"}
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+
+class HM_RepairPids(bpy.types.Operator):
+    """押し出し / 複製などでコピーされた重複PIDを検出し、コピー側に新しいPIDを振り直す"""
+
+    bl_idname = "hide_manager.repair_pids"
+    bl_label = "重複PIDを修復"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        total = 0
+        meshes = set()
+        for obj in context.scene.objects:
+            if obj.type != "MESH" or obj.data in meshes:
+                continue
+            meshes.add(obj.data)
+            try:
+                total += repair_object_pids(obj, context.scene)
+            except Exception as e:
+                log_exc("HM_RepairPids.execute", e)
+
+        invalidate_hide_set_status()
+        if total:
+            self.report({"INFO"}, f"重複PIDを {total} 要素分 振り直しました")
+        else:
+            self.report({"INFO"}, "重複PIDはありません")
+        return {"FINISHED"}
+
+
+class HM_CleanupDeletedObjects(bpy.types.Operator):
+    """削除されたオブジェクトのメンバーを、それを参照しているセットから取り除く"""
+
+    bl_idname = "hide_manager.cleanup_deleted_objects"
+    bl_label = "削除済みオブジェクトを整理"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        try:
+            removed = cleanup_deleted_objects(context.scene)
+        except Exception as e:
+            log_exc("HM_CleanupDeletedObjects.execute", e)
+            self.report({"ERROR"}, "整理中にエラーが発生しました")
+            return {"CANCELLED"}
+
+        invalidate_hide_set_status()
+        if removed:
+            self.report({"INFO"}, f"{removed} 個のメンバーを取り除きました")
+        else:
+            self.report({"INFO"}, "削除されたオブジェクトを参照するセットはありません")
+        return {"FINISHED"}
+
+
+class HM_CompactPids(bpy.types.Operator):
+    """全メッシュのPIDを連続した範囲へ振り直し、セットのメンバーも書き換える"""
+
+    bl_idname = "hide_manager.compact_pids"
+    bl_label = "PIDを圧縮"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        if context.mode != "OBJECT":
+            self.report({"WARNING"}, "オブジェクトモードで実行してください")
+            return {"CANCELLED"}
+
+        try:
+            result = compact_pids()
+        except ValueError as e:
+            self.report({"WARNING"}, str(e))
+            return {"CANCELLED"}
+        except CompactionError as e:
+            invalidate_member_index()
+            invalidate_hide_set_status()
+            invalidate_reverse_index()
+            if not e.result.written:
+                self.report({"ERROR"}, "PIDの圧縮中にエラーが発生しました")
+                return {"CANCELLED"}
+            # 一部を書き換え済み：Undo で元に戻せるよう FINISHED を返す
+            self.report({"ERROR"}, "PIDの書き込み中にエラーが発生しました（元に戻すには Undo してください）")
+            return {"FINISHED"}
+        except Exception as e:
+            log_exc("HM_CompactPids.execute", e)
+            self.report({"ERROR"}, "PIDの圧縮中にエラーが発生しました")
+            return {"CANCELLED"}
+
+        invalidate_member_index()
+        invalidate_hide_set_status()
+        invalidate_reverse_index()
+        msg = (
+            f"PIDを圧縮しました：メッシュ {result.meshes} / 要素 {result.elements} / "
+            f"メンバー {result.members}（次のPID {result.next_pid}）"
+        )
+        if result.dropped:
+            msg += f"／見つからないメンバー {result.dropped} 件を除外"
+        self.report({"INFO"}, msg)
+        return {"FINISHED"}
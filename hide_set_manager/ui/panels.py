@@ -1,12 +1,22 @@
 import bpy
 
-from ..core.registry import get_mode_label, hide_set_is_completely_hidden
+from ..core.registry import get_mode_label
 from .operators import (
     HM_ApplyHideSet,
     HM_RegisterHideSet,
 )
-#from ..core.diff import sync_hide_set_saved_hidden, preview_hide_set_diff
-from ..core.diff import preview_hide_set_diff
+from ..core.status_cache import get_hide_set_status, prefetch_hide_set_status
+from ..core.reverse_index import sets_containing_selection
+
+
+def _draw_batch_row(layout, list_type: str) -> None:
+    """チェックしたセットをまとめて操作するボタン列"""
+    row = layout.row(align=True)
+    row.label(text="チェックしたセット:")
+    for action, icon in (("SHOW", "HIDE_OFF"), ("HIDE", "HIDE_ON"), ("TOGGLE", "FILE_REFRESH")):
+        op = row.operator("hide_manager.batch_hide_sets", text="", icon=icon)
+        op.list_type = list_type
+        op.action = action
 
 
 
@@ -24,32 +34,34 @@ class HM_PT_EditHideSets(bpy.types.Panel):
 
     def draw(self, context):
         layout = self.layout
-        layout.operator(HM_RegisterHideSet.bl_idname, icon="ADD")
+        row = layout.row(align=True)
+        row.operator(HM_RegisterHideSet.bl_idname, icon="ADD")
+        row.operator("hide_manager.import_hide_set", text="", icon="IMPORT")
+        row.operator("hide_manager.export_all_hide_sets", text="", icon="EXPORT")
+        row.operator("hide_manager.import_all_hide_sets", text="", icon="FILE_FOLDER")
+        row.operator("hide_manager.repair_pids", text="", icon="TOOL_SETTINGS")
 
         hide_sets = context.scene.hm_edit_sets
         if not hide_sets:
             layout.label(text="非表示セットはまだ登録されていません")
             return
 
+        # 未計算のセットは1つの BMesh セッションでまとめて計算しておく
+        prefetch_hide_set_status(context, hide_sets)
+        _draw_batch_row(layout, "EDIT")
+
         for i, hide_set in enumerate(hide_sets):
             box = layout.box()
             row = box.row(align=True)
 
-            mode_label = get_mode_label(hide_set.mode)
-            row.label(text=f"{i + 1}. {hide_set.name} [{mode_label}]")
-
-            is_hidden = hide_set_is_completely_hidden(hide_set, context)
-            
-
+            # --- 状態はキャッシュから取得（再描画ごとに BMesh を開かない） ---
+            status = get_hide_set_status(context, hide_set)
+            is_hidden = status.completely_hidden
+            needs_sync = status.needs_sync
 
-            # --- 差分判定 ---
-            try:
-                #diff_preview = sync_hide_set_saved_hidden(context, hide_set)
-                diff_preview = preview_hide_set_diff(context, hide_set)
-                needs_sync = diff_preview.has_changes
-                # Panel全体の再描画
-            except Exception:
-                needs_sync = False
+            mode_label = get_mode_label(hide_set.mode)
+            row.prop(hide_set, "batch_selected", text="")
+            row.label(text=f"{i + 1}. {hide_set.name} [{mode_label}] ({status.member_count})")
 
             # 同期ボタン（差分あり → エラーアイコン）
             icon = "ERROR" if needs_sync else "CHECKMARK"
@@ -101,6 +113,14 @@ class HM_PT_EditHideSets(bpy.types.Panel):
             op.index = i
             op.list_type = "EDIT"
 
+            # 展開ルール
+            rule_row = box.row(align=True)
+            rule_row.prop(hide_set, "expand_rule", text="")
+            if hide_set.expand_rule == "RINGS":
+                rule_row.prop(hide_set, "expand_rings")
+            elif hide_set.expand_rule == "ISLAND":
+                rule_row.prop(hide_set, "expand_ring_limit")
+
 
 class HM_PT_ObjectHideSets(bpy.types.Panel):
     bl_label = "非表示セット（オブジェクトモード）"
@@ -115,30 +135,35 @@ class HM_PT_ObjectHideSets(bpy.types.Panel):
 
     def draw(self, context):
         layout = self.layout
-        layout.operator(HM_RegisterHideSet.bl_idname, icon="ADD")
+        row = layout.row(align=True)
+        row.operator(HM_RegisterHideSet.bl_idname, icon="ADD")
+        row.operator("hide_manager.import_hide_set", text="", icon="IMPORT")
+        row.operator("hide_manager.export_all_hide_sets", text="", icon="EXPORT")
+        row.operator("hide_manager.import_all_hide_sets", text="", icon="FILE_FOLDER")
+        row.operator("hide_manager.cleanup_deleted_objects", text="", icon="BRUSH_DATA")
+        row.operator("hide_manager.compact_pids", text="", icon="SORTSIZE")
 
         hide_sets = context.scene.hm_object_sets
         if not hide_sets:
             layout.label(text="非表示セットはまだ登録されていません")
             return
 
+        # 未計算のセットは1つの BMesh セッションでまとめて計算しておく
+        prefetch_hide_set_status(context, hide_sets)
+        _draw_batch_row(layout, "OBJECT")
+
         for i, hide_set in enumerate(hide_sets):
             box = layout.box()
             row = box.row(align=True)
 
-            mode_label = get_mode_label(hide_set.mode)
-            row.label(text=f"{i + 1}. {hide_set.name} [{mode_label}]")
-
-            is_hidden = hide_set_is_completely_hidden(hide_set, context)
+            # --- 状態はキャッシュから取得（再描画ごとに BMesh を開かない） ---
+            status = get_hide_set_status(context, hide_set)
+            is_hidden = status.completely_hidden
+            needs_sync = status.needs_sync
 
-            # --- 差分判定（UI可視化用の事前チェック） ---
-            try:
-                diff_preview = preview_hide_set_diff(context, hide_set)
-                needs_sync = diff_preview.has_changes
-
-
-            except Exception:
-                needs_sync = False
+            mode_label = get_mode_label(hide_set.mode)
+            row.prop(hide_set, "batch_selected", text="")
+            row.label(text=f"{i + 1}. {hide_set.name} [{mode_label}] ({status.member_count})")
 
             # 同期ボタン（差分あり → エラーアイコン）
             icon = "ERROR" if needs_sync else "CHECKMARK"
@@ -191,3 +216,36 @@ class HM_PT_ObjectHideSets(bpy.types.Panel):
             op = row.operator("hide_manager.delete_hide_set", text="", icon="TRASH")
             op.index = i
             op.list_type = "OBJECT"
+
+
+class HM_PT_SetsContainingSelection(bpy.types.Panel):
+    """選択中の要素 / オブジェクトを含むセット（逆引き索引から求める）"""
+
+    bl_label = "選択を含むセット"
+    bl_idname = "HM_PT_SetsContainingSelection"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "非表示管理"
+    # 開いている間だけ計算する
+    bl_options = {"DEFAULT_CLOSED"}
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode in ("OBJECT", "EDIT_MESH")
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+        refs = sets_containing_selection(context)
+        if not refs:
+            layout.label(text="選択を含むセットはありません")
+            return
+
+        for list_type, i in refs:
+            hide_sets = scene.hm_object_sets if list_type == "OBJECT" else scene.hm_edit_sets
+            hide_set = hide_sets[i]
+            row = layout.row(align=True)
+            row.label(text=f"{hide_set.name} [{get_mode_label(hide_set.mode)}]")
+            op = row.operator("hide_manager.toggle_hide_set", text="", icon="FILE_REFRESH")
+            op.index = i
+            op.list_type = list_type
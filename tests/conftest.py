@@ -0,0 +1,51 @@
+"""
+core/ のテスト。Blender 無しで、benchmarks/fake_blender（bpy / bmesh のフェイク）の上で動く。
+
+    python -m pytest -q tests
+
+フェイクは hide_set_manager より先に sys.modules へ登録する必要があるので、ここで install する。
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fake_blender  # noqa: E402
+
+fake_blender.install()
+
+import bpy  # noqa: E402
+
+import hide_set_manager  # noqa: E402
+from hide_set_manager.core.handlers import clear_all_caches  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def addon():
+    hide_set_manager.register()
+    yield
+    hide_set_manager.unregister()
+
+
+@pytest.fixture
+def scene():
+    """空のシーン（bpy.data とアドオンのキャッシュも空にする）。"""
+    fake_blender.reset()
+    clear_all_caches()
+    yield bpy.context.scene
+    clear_all_caches()
+
+
+@pytest.fixture
+def make_grid(scene):
+    """make_grid(name, vert_target) → 全要素にPIDを振ったグリッドのオブジェクト。"""
+
+    def _make(name: str = "Grid", vert_target: int = 100):
+        me = fake_blender.grid_mesh(name, vert_target)
+        fake_blender.stamp_pids(me, scene)
+        return fake_blender.link_object(scene, name, me)
+
+    return _make
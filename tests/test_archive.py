@@ -0,0 +1,176 @@
+import numpy as np
+import pytest
+
+from hide_set_manager.core.expansion import EXPAND_FACES, EXPAND_RINGS
+from hide_set_manager.core.packed_store import STORAGE_ELEMENTS, STORAGE_PACKED, iter_member_groups
+from hide_set_manager.core.registry import add_members
+from hide_set_manager.data.archive import (
+    export_hide_set_archive,
+    export_scene_archive,
+    hide_set_content_digest,
+    hide_set_digest,
+    import_archive,
+    read_archive,
+)
+from hide_set_manager.data.serializer import (
+    JSON_VERSION,
+    JSON_VERSION_COLUMNAR,
+    HideSetData,
+    export_hide_set,
+    import_hide_set,
+)
+
+DEFAULT_EXPAND = {"expand_rule": EXPAND_FACES, "expand_rings": 1, "expand_ring_limit": 0}
+
+
+def _pids(obj, name):
+    return obj.data.attributes[name].values
+
+
+@pytest.fixture
+def filled_scene(scene, make_grid):
+    """編集モードセット2つ（PACKED + 展開ルール / ELEMENTS）とオブジェクトセット1つ。"""
+    a = make_grid("A", 100)
+    b = make_grid("B", 64)
+
+    faces = scene.hm_edit_sets.add()
+    faces.name = "faces"
+    faces.mode = "FACE"
+    faces.storage = STORAGE_PACKED
+    faces.expand_rule = EXPAND_RINGS
+    faces.expand_rings = 2
+    for obj in (a, b):
+        pids = _pids(obj, "hm_fid")[::3]
+        add_members(faces, obj.name, "FACE", pids, np.arange(len(pids)) % 2 == 0)
+
+    verts = scene.hm_edit_sets.add()
+    verts.name = "頂点"
+    verts.mode = "VERT"
+    verts.storage = STORAGE_ELEMENTS
+    pids = _pids(a, "hm_vid")[5:20]
+    add_members(verts, a.name, "VERT", pids, np.arange(len(pids)) % 3 == 0)
+
+    objects = scene.hm_object_sets.add()
+    objects.name = "objects"
+    objects.mode = "OBJECT"
+    add_members(objects, a.name, "OBJECT", [-1], [True])
+    add_members(objects, b.name, "OBJECT", [-1], [False])
+    return scene
+
+
+def _snapshot(hide_set, expand=None) -> dict:
+    """比べる内容（名前・モード・展開ルール・メンバー・内容ハッシュ）。"""
+    groups = [
+        (g.object_name, g.element_type, np.asarray(g.pids).tolist(), np.asarray(g.saved, dtype=bool).tolist())
+        for g in iter_member_groups(hide_set)
+    ]
+    settings = expand or {
+        "expand_rule": hide_set.expand_rule,
+        "expand_rings": int(hide_set.expand_rings),
+        "expand_ring_limit": int(hide_set.expand_ring_limit),
+    }
+    if expand is None:
+        digest = hide_set_content_digest(hide_set)
+    else:
+        data = HideSetData(hide_set.name, hide_set.mode, iter_member_groups(hide_set), **expand)
+        digest = hide_set_digest(data)
+    return {"name": hide_set.name, "mode": hide_set.mode, "expand": settings, "groups": groups, "digest": digest}
+
+
+def _all_sets(scene) -> list:
+    return list(scene.hm_edit_sets) + list(scene.hm_object_sets)
+
+
+def _export(fmt: str, path: str, hide_set, scene) -> None:
+    if fmt == "hmarc":
+        assert export_hide_set_archive(path, hide_set, scene.hm_next_elem_id)
+    else:
+        version = JSON_VERSION if fmt == "json1" else JSON_VERSION_COLUMNAR
+        assert export_hide_set(path, hide_set, version)
+
+
+def _import(fmt: str, path: str, scene) -> None:
+    if fmt == "hmarc":
+        import_archive(scene, path)
+    else:
+        import_hide_set(scene, path)
+
+
+def _clear(scene) -> None:
+    scene.hm_edit_sets.clear()
+    scene.hm_object_sets.clear()
+
+
+@pytest.mark.parametrize("fmt", ["hmarc", "json2", "json1"])
+@pytest.mark.parametrize("set_name", ["faces", "頂点", "objects"])
+def test_single_set_round_trip(filled_scene, tmp_path, fmt, set_name):
+    scene = filled_scene
+    hide_set = next(s for s in _all_sets(scene) if s.name == set_name)
+    # version 1 の JSON には展開ルールが無いので、読み込むと既定値になる
+    expected = _snapshot(hide_set, DEFAULT_EXPAND if fmt == "json1" else None)
+    next_id = scene.hm_next_elem_id
+    path = str(tmp_path / f"set.{fmt}")
+
+    _export(fmt, path, hide_set, scene)
+    _clear(scene)
+    _import(fmt, path, scene)
+
+    (restored,) = _all_sets(scene)
+    assert _snapshot(restored) == expected
+    assert scene.hm_next_elem_id == next_id
+
+
+def test_archive_digest_matches_scene(filled_scene, tmp_path):
+    path = str(tmp_path / "scene.hmarc")
+    export_scene_archive(path, filled_scene)
+
+    archive = read_archive(path)
+    assert [s.digest for s in archive.sets] == [hide_set_content_digest(s) for s in _all_sets(filled_scene)]
+    assert archive.next_elem_id == filled_scene.hm_next_elem_id
+
+
+def test_scene_archive_round_trip(filled_scene, tmp_path):
+    scene = filled_scene
+    expected = [_snapshot(s) for s in _all_sets(scene)]
+    next_id = scene.hm_next_elem_id
+    path = str(tmp_path / "scene.hmarc")
+
+    export_scene_archive(path, scene)
+    _clear(scene)
+    scene.hm_next_elem_id = 1
+    import_archive(scene, path, replace=True)
+
+    assert [_snapshot(s) for s in _all_sets(scene)] == expected
+    assert scene.hm_next_elem_id == next_id
+
+
+@pytest.mark.parametrize("fmt", ["json2", "json1"])
+def test_scene_json_round_trip(filled_scene, tmp_path, fmt):
+    scene = filled_scene
+    sets = _all_sets(scene)
+    expected = [_snapshot(s, DEFAULT_EXPAND if fmt == "json1" else None) for s in sets]
+    next_id = scene.hm_next_elem_id
+    paths = [str(tmp_path / f"{i}.json") for i in range(len(sets))]
+
+    for path, hide_set in zip(paths, sets):
+        _export(fmt, path, hide_set, scene)
+    _clear(scene)
+    for path in paths:
+        _import(fmt, path, scene)
+
+    assert [_snapshot(s) for s in _all_sets(scene)] == expected
+    assert scene.hm_next_elem_id == next_id
+
+
+def test_scene_archive_reuses_unchanged_sets(filled_scene, tmp_path):
+    scene = filled_scene
+    path = str(tmp_path / "scene.hmarc")
+
+    first = export_scene_archive(path, scene)
+    assert (first.written, first.reused) == (3, 0)
+    assert export_scene_archive(path, scene).unchanged
+
+    scene.hm_edit_sets[1].expand_rule = EXPAND_RINGS
+    second = export_scene_archive(path, scene)
+    assert (second.written, second.reused, second.unchanged) == (1, 2, False)
+    assert read_archive(path).sets[1].expand["expand_rule"] == EXPAND_RINGS
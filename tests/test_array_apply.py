@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from benchmarks import fake_blender
+from hide_set_manager.core.adjacency import get_bmesh_adjacency, get_mesh_adjacency
+from hide_set_manager.core.array_apply import compute_hide_masks, member_masks
+from hide_set_manager.core.bmesh_ops import bmesh_session, hide_members_on_bmesh
+from hide_set_manager.core.registry import add_members, split_items_by_object
+
+ATTRS = {"VERT": "hm_vid", "EDGE": "hm_eid", "FACE": "hm_fid"}
+
+
+def _random_group(scene, obj, etype: str, seed: int):
+    pids = obj.data.attributes[ATTRS[etype]].values
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(pids, size=max(1, len(pids) // 8), replace=False)
+    hs = scene.hm_edit_sets.add()
+    hs.name = etype
+    hs.mode = etype
+    add_members(hs, obj.name, etype, picked, np.zeros(len(picked), dtype=bool))
+    return split_items_by_object(hs)[obj.name]
+
+
+def _bmesh_result(obj, group, start, hide_flag: bool, warm_adjacency: bool):
+    fake_blender.set_edit_mode(obj, True)
+    bm = obj.data.edit_bmesh
+    for seq, hidden in zip((bm.verts, bm.edges, bm.faces), start):
+        seq.hide[:] = hidden
+    if warm_adjacency:
+        get_bmesh_adjacency(bm, obj.data, True)
+    with bmesh_session():
+        hide_members_on_bmesh(bm, obj, {obj}, group, hide_flag)
+    return tuple(seq.hide.copy() for seq in (bm.verts, bm.edges, bm.faces))
+
+
+def _assert_same(actual, expected) -> None:
+    for domain, a, e in zip(("vert", "edge", "face"), actual, expected):
+        assert np.array_equal(a, e), domain
+
+
+@pytest.mark.parametrize("warm_adjacency", [False, True])
+@pytest.mark.parametrize("etype", ["VERT", "EDGE", "FACE"])
+def test_hide_matches_bmesh(scene, make_grid, etype, warm_adjacency):
+    obj = make_grid(vert_target=144)
+    me = obj.data
+    group = _random_group(scene, obj, etype, seed=1)
+    adj = get_mesh_adjacency(me)
+    v_sel, e_sel, f_sel = member_masks(me, group)
+    start = (
+        np.zeros(len(me.vertices), dtype=bool),
+        np.zeros(len(me.edges), dtype=bool),
+        np.zeros(len(me.polygons), dtype=bool),
+    )
+
+    expected = compute_hide_masks(adj, *start, v_sel, e_sel, f_sel, True)
+
+    assert expected[2].any()
+    _assert_same(_bmesh_result(obj, group, start, True, warm_adjacency), expected)
+
+
+@pytest.mark.parametrize("warm_adjacency", [False, True])
+@pytest.mark.parametrize("etype", ["VERT", "EDGE", "FACE"])
+def test_show_matches_bmesh(scene, make_grid, etype, warm_adjacency):
+    obj = make_grid(vert_target=144)
+    me = obj.data
+    group = _random_group(scene, obj, etype, seed=2)
+    adj = get_mesh_adjacency(me)
+    v_sel, e_sel, f_sel = member_masks(me, group)
+    start = (
+        np.ones(len(me.vertices), dtype=bool),
+        np.ones(len(me.edges), dtype=bool),
+        np.ones(len(me.polygons), dtype=bool),
+    )
+
+    expected = compute_hide_masks(adj, *start, v_sel, e_sel, f_sel, False)
+
+    assert not expected[2].all()
+    _assert_same(_bmesh_result(obj, group, start, False, warm_adjacency), expected)
+
+
+def test_hide_keeps_shared_boundary_visible(scene, make_grid):
+    obj = make_grid(vert_target=16)
+    me = obj.data
+    adj = get_mesh_adjacency(me)
+    zeros = [np.zeros(n, dtype=bool) for n in (len(me.vertices), len(me.edges), len(me.polygons))]
+    f_sel = np.zeros(len(me.polygons), dtype=bool)
+    f_sel[0] = True
+
+    hide_v, hide_e, hide_f = compute_hide_masks(adj, *zeros, zeros[0], zeros[1], f_sel, True)
+
+    # 4 x 4 頂点の角の面：外周の2辺と角の頂点だけが隠れる
+    assert np.flatnonzero(hide_f).tolist() == [0]
+    assert hide_e.sum() == 2
+    assert np.flatnonzero(hide_v).tolist() == [0]
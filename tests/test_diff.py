@@ -0,0 +1,120 @@
+import numpy as np
+
+import bpy
+from benchmarks import fake_blender
+from hide_set_manager.core.array_apply import apply_hide_arrays
+from hide_set_manager.core.diff import compute_hide_set_diff, sync_hide_set_saved_hidden
+from hide_set_manager.core.registry import add_members, split_items_by_object
+
+MISSING_PID = 10 ** 9
+
+
+def _face_set(scene, obj, pids):
+    hs = scene.hm_edit_sets.add()
+    hs.name = "faces"
+    hs.mode = "FACE"
+    add_members(hs, obj.name, "FACE", pids, np.zeros(len(pids), dtype=bool))
+    return hs
+
+
+def _hide_faces(me, indices) -> None:
+    hide = np.zeros(len(me.polygons), dtype=bool)
+    hide[indices] = True
+    me.polygons.foreach_set("hide", hide)
+    me.update()
+    fake_blender.flush_updates()
+
+
+def test_diff_reports_updated_and_missing(scene, make_grid):
+    obj = make_grid()
+    fids = obj.data.attributes["hm_fid"].values.copy()
+    hs = _face_set(scene, obj, np.append(fids[:10], MISSING_PID))
+    _hide_faces(obj.data, [1, 3, 20])
+
+    result = compute_hide_set_diff(bpy.context, hs)
+
+    assert (result.updated, result.removed, result.added) == (2, 1, 0)
+    (diff,) = result.objects
+    assert diff.updated.tolist() == [1, 3]
+    assert diff.current_hidden.tolist() == [True, True]
+    assert diff.missing.tolist() == [10]
+
+
+def test_diff_for_unknown_object_marks_all_missing(scene, make_grid):
+    obj = make_grid()
+    fids = obj.data.attributes["hm_fid"].values[:4].copy()
+    hs = _face_set(scene, obj, fids)
+    add_members(hs, "NoSuchObject", "FACE", fids, np.zeros(4, dtype=bool))
+
+    result = compute_hide_set_diff(bpy.context, hs)
+
+    assert result.removed == 4
+    assert result.updated == 0
+
+
+def test_sync_updates_saved_bits_and_keeps_missing(scene, make_grid):
+    obj = make_grid()
+    fids = obj.data.attributes["hm_fid"].values.copy()
+    hs = _face_set(scene, obj, np.append(fids[:10], MISSING_PID))
+    _hide_faces(obj.data, [2, 5])
+
+    synced = sync_hide_set_saved_hidden(bpy.context, hs)
+
+    assert (synced.updated, synced.removed) == (2, 1)
+    group = split_items_by_object(hs)[obj.name]
+    # 欠落メンバーは数えるだけで消さない
+    assert group.pids.tolist() == fids[:10].tolist() + [MISSING_PID]
+    assert np.flatnonzero(group.saved).tolist() == [2, 5]
+    after = compute_hide_set_diff(bpy.context, hs)
+    assert (after.updated, after.removed) == (0, 1)
+
+
+def test_diff_in_edit_mode_matches_arrays(scene, make_grid):
+    obj = make_grid()
+    fids = obj.data.attributes["hm_fid"].values.copy()
+    hs = _face_set(scene, obj, fids[::3])
+    _hide_faces(obj.data, [0, 3, 4, 9, 30])
+    expected = compute_hide_set_diff(bpy.context, hs).objects[0]
+
+    fake_blender.set_edit_mode(obj, True)
+    fake_blender.flush_updates()
+    result = compute_hide_set_diff(bpy.context, hs)
+
+    (diff,) = result.objects
+    assert diff.updated.tolist() == expected.updated.tolist() == [0, 1, 3, 10]
+    assert diff.current_hidden.all()
+    assert len(diff.missing) == 0
+
+
+def test_sync_after_apply_before_update_flush(scene, make_grid):
+    obj = make_grid()
+    fids = obj.data.attributes["hm_fid"].values.copy()
+    hs = _face_set(scene, obj, fids[:3])
+    assert sync_hide_set_saved_hidden(bpy.context, hs).updated == 0
+
+    # 適用直後（depsgraph の更新通知が届く前）に同期しても、書き戻した非表示を拾う
+    assert apply_hide_arrays(obj.data, split_items_by_object(hs)[obj.name], True)
+    synced = sync_hide_set_saved_hidden(bpy.context, hs)
+
+    assert synced.updated == 3
+    assert split_items_by_object(hs)[obj.name].saved.all()
+
+
+def test_duplicate_pid_resolves_to_first_element_in_edit_mode(scene, make_grid):
+    obj = make_grid()
+    fids = obj.data.attributes["hm_fid"].values.copy()
+    hs = _face_set(scene, obj, fids[:1])
+
+    fake_blender.set_edit_mode(obj, True)
+    bm = obj.data.edit_bmesh
+    layer = bm.faces.layers.int["hm_fid"]
+    bm.faces.ensure_lookup_table()
+    # 面 50 に面 0 のPIDを複製する（配列パスと同じく、最初の面 0 を採る）
+    bm.faces[50][layer] = int(fids[0])
+    bm.faces[0].hide = True
+    fake_blender.flush_updates()
+
+    result = compute_hide_set_diff(bpy.context, hs)
+
+    assert result.updated == 1
+    assert result.objects[0].current_hidden.tolist() == [True]
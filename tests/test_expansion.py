@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from benchmarks import fake_blender
+from hide_set_manager.core.adjacency import get_bmesh_adjacency, get_mesh_adjacency
+from hide_set_manager.core.expansion import (
+    EXPAND_ISLAND,
+    EXPAND_RINGS,
+    ExpansionRule,
+    expanded_faces,
+)
+
+# make_grid() の既定（10 x 10 頂点 → 9 x 9 面）
+SIDE = 10
+QUADS = SIDE - 1
+CENTER_VERT = 4 + 4 * SIDE
+NONE = np.empty(0, dtype=np.int64)
+
+
+def _face_block(lo: int, hi: int) -> list:
+    """面 (i, j)（lo <= i, j < hi）のインデックス。"""
+    return sorted(i + j * QUADS for j in range(lo, hi) for i in range(lo, hi))
+
+
+def _two_islands():
+    """3 x 3 面のグリッドを2つ、頂点を共有せずに並べたメッシュ。"""
+    side = 4
+    base = np.array([i + j * side for j in range(side - 1) for i in range(side - 1)])
+    quad = np.stack([base, base + 1, base + side + 1, base + side], axis=1)
+    loops = np.concatenate([quad.ravel(), (quad + side * side).ravel()])
+    co = np.zeros((2 * side * side, 3), dtype=np.float32)
+    co[:, 0] = np.arange(2 * side * side)
+    return fake_blender.mesh_from_faces("Islands", co, loops, np.full(18, 4))
+
+
+@pytest.mark.parametrize("rings", [1, 2, 3])
+def test_rings_grow_square_block(make_grid, rings):
+    adj = get_mesh_adjacency(make_grid().data)
+    faces = expanded_faces(adj, [CENTER_VERT], NONE, NONE, ExpansionRule(EXPAND_RINGS, rings))
+    # リング0（接続面）が 2 x 2、1リングごとに一周ずつ広がる
+    assert faces.tolist() == _face_block(3 - rings, 5 + rings)
+
+
+def test_island_covers_connected_part_only(scene):
+    adj = get_mesh_adjacency(_two_islands())
+    island = ExpansionRule(EXPAND_ISLAND, 0)
+
+    assert expanded_faces(adj, NONE, NONE, [4], island).tolist() == list(range(9))
+    assert expanded_faces(adj, [16], NONE, NONE, island).tolist() == list(range(9, 18))
+
+
+def test_island_limit_matches_rings(make_grid):
+    adj = get_mesh_adjacency(make_grid().data)
+    for k in (1, 2):
+        limited = expanded_faces(adj, [CENTER_VERT], NONE, NONE, ExpansionRule(EXPAND_ISLAND, k))
+        rings = expanded_faces(adj, [CENTER_VERT], NONE, NONE, ExpansionRule(EXPAND_RINGS, k))
+        assert limited.tolist() == rings.tolist()
+    unlimited = expanded_faces(adj, [CENTER_VERT], NONE, NONE, ExpansionRule(EXPAND_ISLAND, 0))
+    assert len(unlimited) == QUADS * QUADS
+
+
+def test_edge_seed_and_bmesh_adjacency_agree(make_grid):
+    obj = make_grid()
+    rule = ExpansionRule(EXPAND_RINGS, 1)
+    edges = [0, 7]
+    expected = expanded_faces(get_mesh_adjacency(obj.data), NONE, edges, NONE, rule)
+
+    fake_blender.set_edit_mode(obj, True)
+    adj = get_bmesh_adjacency(obj.data.edit_bmesh, obj.data, True)
+    assert expanded_faces(adj, NONE, edges, NONE, rule).tolist() == expected.tolist()
@@ -0,0 +1,47 @@
+import bpy
+from benchmarks import fake_blender
+from hide_set_manager.core.object_index import (
+    OBJECT_UID_KEY,
+    ensure_object_uid,
+    find_object,
+    get_object_index,
+    object_uid,
+)
+
+
+def test_find_object_follows_rename(scene, make_grid):
+    obj = make_grid("Cube")
+    uid = ensure_object_uid(obj)
+
+    bpy.data.objects.rename(obj, "Renamed")
+    fake_blender.flush_updates()
+
+    assert find_object(uid, "Cube") is obj
+
+
+def test_removed_owner_is_not_resolved(scene, make_grid):
+    obj = make_grid("Cube")
+    uid = ensure_object_uid(obj)
+
+    # 同じ数のまま入れ替わる（索引は作り直されず、削除された持ち主が残る）
+    bpy.data.objects.remove(obj)
+    make_grid("Other")
+
+    assert find_object(uid, "Cube") is None
+
+
+def test_duplicate_uid_keeps_previous_owner(scene, make_grid):
+    original = make_grid("Cube")
+    uid = ensure_object_uid(original)
+    get_object_index()
+
+    # Shift+D 相当：カスタムプロパティごと複製される
+    copy = make_grid("Cube.001")
+    copy[OBJECT_UID_KEY] = uid
+    assert find_object(uid) is original
+
+    fake_blender.flush_updates()
+
+    assert object_uid(original) == uid
+    assert object_uid(copy) not in ("", uid)
+    assert find_object(object_uid(copy)) is copy
@@ -0,0 +1,117 @@
+import numpy as np
+
+from benchmarks import fake_blender
+from benchmarks.fake_blender import fake_bpy
+from hide_set_manager.core.mesh_arrays import read_int_attribute
+from hide_set_manager.core.pid import allocate_missing_pids, assign_missing_pids_bmesh, build_pid_maps
+from hide_set_manager.core.pid_cache import mark_hide_only_write, mesh_generation
+from hide_set_manager.core.pid_repair import duplicate_pid_copies, repair_mesh_pids, repair_object_pids
+
+
+def _vids(me) -> np.ndarray:
+    return read_int_attribute(me, "hm_vid", len(me.vertices)).astype(np.int64)
+
+
+def _write_vids(me, pids) -> None:
+    me.attributes["hm_vid"].data.foreach_set("value", np.asarray(pids, dtype=np.int32))
+
+
+def test_allocate_missing_pids_fills_only_masked_missing(scene):
+    scene.hm_next_elem_id = 100
+    pids = np.array([5, 0, -1, 0, 7, 0], dtype=np.int64)
+    mask = np.array([True, True, True, False, True, True])
+
+    missing = allocate_missing_pids(pids, mask, scene)
+
+    assert missing.tolist() == [1, 2, 5]
+    assert pids.tolist() == [5, 100, 101, 0, 7, 102]
+    assert scene.hm_next_elem_id == 103
+
+
+def test_allocate_missing_pids_without_missing_keeps_counter(scene):
+    scene.hm_next_elem_id = 10
+    pids = np.array([1, 2, 3], dtype=np.int64)
+
+    assert len(allocate_missing_pids(pids, np.ones(3, dtype=bool), scene)) == 0
+    assert scene.hm_next_elem_id == 10
+
+
+def test_assign_missing_pids_bmesh_writes_layer(scene, make_grid):
+    obj = make_grid()
+    vids = _vids(obj.data)
+    vids[[3, 8]] = 0
+    _write_vids(obj.data, vids)
+    start = scene.hm_next_elem_id
+
+    fake_blender.set_edit_mode(obj, True)
+    bm = obj.data.edit_bmesh
+    layer = bm.verts.layers.int.get("hm_vid")
+    bm.verts.ensure_lookup_table()
+    elems = [bm.verts[i] for i in (2, 3, 8)]
+
+    pids = assign_missing_pids_bmesh(elems, layer, scene)
+
+    assert pids.tolist() == [vids[2], start, start + 1]
+    assert [e[layer] for e in elems] == pids.tolist()
+    assert scene.hm_next_elem_id == start + 2
+
+
+def test_duplicate_pid_copies_keeps_smallest_index():
+    pids = np.array([4, 9, 4, 0, 0, 9, 4, 5])
+    # 0（PIDなし）は重複とみなさない
+    assert duplicate_pid_copies(pids).tolist() == [2, 5, 6]
+    assert len(duplicate_pid_copies(np.arange(1, 6))) == 0
+
+
+def test_repair_mesh_pids_renumbers_copies(scene, make_grid):
+    obj = make_grid()
+    me = obj.data
+    vids = _vids(me)
+    original = vids.copy()
+    vids[10] = vids[2]
+    vids[11] = vids[2]
+    _write_vids(me, vids)
+    counter = scene.hm_next_elem_id
+
+    assert repair_mesh_pids(me, scene) == 2
+
+    repaired = _vids(me)
+    assert len(np.unique(repaired)) == len(repaired)
+    # 元（最小インデックス）はそのまま、コピーはカウンタから振り直す
+    assert repaired[2] == original[2]
+    assert sorted(repaired[[10, 11]].tolist()) == [counter, counter + 1]
+    mask = np.ones(len(repaired), dtype=bool)
+    mask[[10, 11]] = False
+    assert np.array_equal(repaired[mask], original[mask])
+    assert repair_mesh_pids(me, scene) == 0
+
+
+def test_repair_object_pids_in_edit_mode(scene, make_grid):
+    obj = make_grid()
+    vids = _vids(obj.data)
+    vids[5] = vids[0]
+    _write_vids(obj.data, vids)
+
+    fake_blender.set_edit_mode(obj, True)
+    assert repair_object_pids(obj, scene) == 1
+
+    v_map, *_ = build_pid_maps(obj.data.edit_bmesh)
+    assert len(v_map) == len(obj.data.vertices)
+    assert v_map[int(vids[0])].index == 0
+
+
+def test_hide_only_write_survives_object_and_mesh_updates(scene, make_grid):
+    obj = make_grid()
+    me = obj.data
+    generation = mesh_generation(me)
+
+    # 非表示の書き戻しは オブジェクト と メッシュ の両方からジオメトリ更新として届く
+    mark_hide_only_write(me)
+    fake_bpy.tag_update(obj, geometry=True)
+    fake_bpy.tag_update(me, geometry=True)
+    fake_blender.flush_updates()
+    assert mesh_generation(me) == generation
+
+    me.update()
+    fake_blender.flush_updates()
+    assert mesh_generation(me) == generation + 1
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from hide_set_manager.core import pid_compact
+from hide_set_manager.core.mesh_arrays import read_int_attribute
+from hide_set_manager.core.packed_store import STORAGE_PACKED
+from hide_set_manager.core.pid_compact import CompactionError, compact_pids
+from hide_set_manager.core.registry import add_members, split_items_by_object
+
+
+def _fids(me) -> np.ndarray:
+    return read_int_attribute(me, "hm_fid", len(me.polygons)).astype(np.int64)
+
+
+def _sparse_grid(scene, make_grid):
+    """PIDを 1000 おきのまばらな値にしたグリッドと、面 0〜3 を持つセット2つ（ELEMENTS / PACKED）。"""
+    obj = make_grid()
+    me = obj.data
+    for name in ("hm_vid", "hm_eid", "hm_fid"):
+        values = me.attributes[name].values
+        me.attributes[name].data.foreach_set("value", (values * 1000).astype(np.int32))
+    fids = _fids(me)
+    for storage in ("ELEMENTS", STORAGE_PACKED):
+        hs = scene.hm_edit_sets.add()
+        hs.name = storage
+        hs.mode = "FACE"
+        hs.storage = storage
+        add_members(hs, obj.name, "FACE", fids[:4], np.array([True, False, True, False]))
+    return obj
+
+
+def test_compact_remaps_meshes_and_sets(scene, make_grid):
+    obj = _sparse_grid(scene, make_grid)
+    me = obj.data
+
+    result = compact_pids()
+
+    total = len(me.vertices) + len(me.edges) + len(me.polygons)
+    assert result.written
+    assert (result.meshes, result.elements, result.next_pid) == (1, total, total + 1)
+    assert scene.hm_next_elem_id == total + 1
+    fids = _fids(me)
+    assert fids.tolist() == list(range(total - len(fids) + 1, total + 1))
+    for hs in scene.hm_edit_sets:
+        group = split_items_by_object(hs)[obj.name]
+        assert group.pids.tolist() == fids[:4].tolist()
+        assert group.saved.tolist() == [True, False, True, False]
+
+
+def test_compact_failure_while_planning_writes_nothing(scene, make_grid, monkeypatch):
+    obj = _sparse_grid(scene, make_grid)
+    before = _fids(obj.data)
+    next_pid = scene.hm_next_elem_id
+    calls = []
+
+    def _fail_second(group, maps, result):
+        calls.append(group)
+        if len(calls) == 2:
+            raise RuntimeError("broken set")
+        return remap(group, maps, result)
+
+    remap = pid_compact._remap_group
+    monkeypatch.setattr(pid_compact, "_remap_group", _fail_second)
+    with pytest.raises(RuntimeError):
+        compact_pids()
+
+    assert _fids(obj.data).tolist() == before.tolist()
+    assert scene.hm_next_elem_id == next_pid
+    for hs in scene.hm_edit_sets:
+        assert split_items_by_object(hs)[obj.name].pids.tolist() == before[:4].tolist()
+
+
+def test_compact_failure_while_writing_reports_written(scene, make_grid, monkeypatch):
+    _sparse_grid(scene, make_grid)
+
+    def _fail(self):
+        raise RuntimeError("write failed")
+
+    monkeypatch.setattr(pid_compact._SetPlan, "write", _fail)
+    with pytest.raises(CompactionError) as info:
+        compact_pids()
+
+    assert info.value.result.written
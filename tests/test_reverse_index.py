@@ -0,0 +1,44 @@
+import numpy as np
+
+from hide_set_manager.core import reverse_index
+from hide_set_manager.core.registry import add_members
+from hide_set_manager.core.reverse_index import invalidate_reverse_index, sets_containing_elements
+from hide_set_manager.core.status_cache import invalidate_hide_set_status
+
+
+def _face_set(scene, obj, name, pids):
+    hs = scene.hm_edit_sets.add()
+    hs.name = name
+    hs.mode = "FACE"
+    add_members(hs, obj.name, "FACE", pids, np.zeros(len(pids), dtype=bool))
+    return hs
+
+
+def test_sets_containing_elements(scene, make_grid):
+    obj = make_grid()
+    fids = obj.data.attributes["hm_fid"].values.copy()
+    _face_set(scene, obj, "a", fids[:5])
+    _face_set(scene, obj, "b", fids[3:8])
+
+    assert sets_containing_elements(scene, obj.name, "FACE", fids[[0]]) == [("EDIT", 0)]
+    assert sets_containing_elements(scene, obj.name, "FACE", fids[[4]]) == [("EDIT", 0), ("EDIT", 1)]
+    assert sets_containing_elements(scene, obj.name, "FACE", fids[[20]]) == []
+
+
+def test_status_invalidation_keeps_reverse_index(scene, make_grid):
+    obj = make_grid()
+    fids = obj.data.attributes["hm_fid"].values.copy()
+    _face_set(scene, obj, "a", fids[:5])
+    sets_containing_elements(scene, obj.name, "FACE", fids[:1])
+    version = reverse_index._index.version
+
+    # パネル状態の全体無効化（シーン更新など）では検証し直さない
+    invalidate_hide_set_status()
+    sets_containing_elements(scene, obj.name, "FACE", fids[:1])
+    assert reverse_index._index.version == version
+
+    # メンバー構成を変えたオペレーターが dirty にしたときだけ作り直す
+    _face_set(scene, obj, "b", fids[:1])
+    invalidate_reverse_index()
+    assert sets_containing_elements(scene, obj.name, "FACE", fids[:1]) == [("EDIT", 0), ("EDIT", 1)]
+    assert reverse_index._index.version == version + 1